@@ -0,0 +1,49 @@
+"""add MEMORY_LIMIT_EXCEEDED to submissionstatus2
+
+Revision ID: 515588ec31de
+Revises: e022f403bd5e
+Create Date: 2025-05-03 12:10:04.118532
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "515588ec31de"
+down_revision: Union[str, None] = "e022f403bd5e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TYPE submissionstatus2 ADD VALUE IF NOT EXISTS 'MEMORY_LIMIT_EXCEEDED'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "UPDATE contest_submissions SET status = 'RUNTIME_ERROR' "
+        "WHERE status = 'MEMORY_LIMIT_EXCEEDED'"
+    )
+    op.execute("ALTER TYPE submissionstatus2 RENAME TO submissionstatus2_old")
+    sa.Enum(
+        "DRAFT",
+        "SUBMITTED",
+        "GRADED",
+        "WRONG_ANSWER",
+        "TIME_LIMIT_EXCEEDED",
+        "RUNTIME_ERROR",
+        name="submissionstatus2",
+    ).create(op.get_bind())
+    op.execute(
+        "ALTER TABLE contest_submissions ALTER COLUMN status "
+        "TYPE submissionstatus2 USING status::text::submissionstatus2"
+    )
+    op.execute("DROP TYPE submissionstatus2_old")
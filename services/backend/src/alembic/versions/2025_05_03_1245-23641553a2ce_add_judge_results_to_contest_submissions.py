@@ -0,0 +1,60 @@
+"""add judge results to contest_submissions
+
+Revision ID: 23641553a2ce
+Revises: 515588ec31de
+Create Date: 2025-05-03 12:45:41.502917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "23641553a2ce"
+down_revision: Union[str, None] = "515588ec31de"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "contest_submissions", sa.Column("failed_test", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "contest_submissions", sa.Column("max_time_ms", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "contest_submissions", sa.Column("max_memory_kb", sa.Integer(), nullable=True)
+    )
+    op.create_table(
+        "contest_submission_tests",
+        sa.Column("submission_id", sa.Integer(), nullable=False),
+        sa.Column("test_index", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("time_ms", sa.Integer(), nullable=False),
+        sa.Column("cpu_ms", sa.Integer(), nullable=False),
+        sa.Column("memory_kb", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["submission_id"],
+            ["contest_submissions.id"],
+            name=op.f("fk_contest_submission_tests_submission_id_contest_submissions"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_contest_submission_tests")),
+        sa.UniqueConstraint(
+            "submission_id", "test_index", name="uq_contest_submission_tests_index"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("contest_submission_tests")
+    op.drop_column("contest_submissions", "max_memory_kb")
+    op.drop_column("contest_submissions", "max_time_ms")
+    op.drop_column("contest_submissions", "failed_test")
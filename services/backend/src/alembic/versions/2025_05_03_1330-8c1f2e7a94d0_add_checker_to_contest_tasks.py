@@ -0,0 +1,42 @@
+"""add checker to contest_tasks
+
+Revision ID: 8c1f2e7a94d0
+Revises: 23641553a2ce
+Create Date: 2025-05-03 13:30:12.384521
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c1f2e7a94d0"
+down_revision: Union[str, None] = "23641553a2ce"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+checker_type = sa.Enum("EXACT", "TOKENS", "FLOAT", "CUSTOM", name="checkertype")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    checker_type.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        "contest_tasks",
+        sa.Column("checker", checker_type, server_default="EXACT", nullable=False),
+    )
+    op.add_column(
+        "contest_tasks", sa.Column("checker_tolerance", sa.Float(), nullable=True)
+    )
+    op.add_column("contest_tasks", sa.Column("checker_code", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("contest_tasks", "checker_code")
+    op.drop_column("contest_tasks", "checker_tolerance")
+    op.drop_column("contest_tasks", "checker")
+    checker_type.drop(op.get_bind(), checkfirst=True)
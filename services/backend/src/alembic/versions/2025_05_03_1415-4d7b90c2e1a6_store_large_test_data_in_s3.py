@@ -0,0 +1,91 @@
+"""store large test data in s3
+
+Revision ID: 4d7b90c2e1a6
+Revises: 8c1f2e7a94d0
+Create Date: 2025-05-03 14:15:47.920318
+
+"""
+
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.config import s3_client
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4d7b90c2e1a6"
+down_revision: Union[str, None] = "8c1f2e7a94d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Как tasks.judge.testdata.blob_key на момент этой ревизии
+BLOB_PREFIX = "tests/"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "test_cases", sa.Column("input_hash", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "test_cases", sa.Column("output_hash", sa.String(length=64), nullable=True)
+    )
+    op.alter_column("test_cases", "input", existing_type=sa.String(), nullable=True)
+    op.alter_column(
+        "test_cases", "expected_output", existing_type=sa.String(), nullable=True
+    )
+
+
+def read_blob(digest: str) -> str:
+    """Данные теста из S3; ошибка скачивания прерывает откат."""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, digest)
+        # Alembic исполняет миграцию внутри своего event loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(
+                asyncio.run, s3_client.download_file(BLOB_PREFIX + digest, path)
+            ).result()
+        return Path(path).read_text(encoding="utf-8")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Данные, которые лежат только в S3, возвращаются в строки таблицы
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text(
+            "SELECT id, input, expected_output, input_hash, output_hash "
+            "FROM test_cases WHERE input IS NULL OR expected_output IS NULL"
+        )
+    )
+    for row in rows.all():
+        connection.execute(
+            sa.text(
+                "UPDATE test_cases SET input = :input, "
+                "expected_output = :expected_output WHERE id = :id"
+            ),
+            {
+                "id": row.id,
+                "input": (
+                    row.input if row.input is not None else read_blob(row.input_hash)
+                ),
+                "expected_output": (
+                    row.expected_output
+                    if row.expected_output is not None
+                    else read_blob(row.output_hash)
+                ),
+            },
+        )
+    op.alter_column(
+        "test_cases", "expected_output", existing_type=sa.String(), nullable=False
+    )
+    op.alter_column("test_cases", "input", existing_type=sa.String(), nullable=False)
+    op.drop_column("test_cases", "output_hash")
+    op.drop_column("test_cases", "input_hash")
@@ -0,0 +1,60 @@
+"""add language and COMPILATION_ERROR to contest_submissions
+
+Revision ID: b62e0f9d3a71
+Revises: 4d7b90c2e1a6
+Create Date: 2025-05-03 15:10:26.713094
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b62e0f9d3a71"
+down_revision: Union[str, None] = "4d7b90c2e1a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TYPE submissionstatus2 ADD VALUE IF NOT EXISTS 'COMPILATION_ERROR'"
+    )
+    op.add_column(
+        "contest_submissions",
+        sa.Column(
+            "language",
+            sa.String(length=32),
+            server_default="python3.9",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("contest_submissions", "language")
+    op.execute(
+        "UPDATE contest_submissions SET status = 'RUNTIME_ERROR' "
+        "WHERE status = 'COMPILATION_ERROR'"
+    )
+    op.execute("ALTER TYPE submissionstatus2 RENAME TO submissionstatus2_old")
+    sa.Enum(
+        "DRAFT",
+        "SUBMITTED",
+        "GRADED",
+        "WRONG_ANSWER",
+        "TIME_LIMIT_EXCEEDED",
+        "RUNTIME_ERROR",
+        "MEMORY_LIMIT_EXCEEDED",
+        name="submissionstatus2",
+    ).create(op.get_bind())
+    op.execute(
+        "ALTER TABLE contest_submissions ALTER COLUMN status "
+        "TYPE submissionstatus2 USING status::text::submissionstatus2"
+    )
+    op.execute("DROP TYPE submissionstatus2_old")
@@ -0,0 +1,46 @@
+"""index hackathons and contests by status and times
+
+Revision ID: e3a9c4f17b52
+Revises: b62e0f9d3a71
+Create Date: 2025-05-03 16:00:41.508217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a9c4f17b52"
+down_revision: Union[str, None] = "b62e0f9d3a71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_hackathon_status_times",
+        "hackathons",
+        ["hackathon_status", "start_time", "end_time"],
+        unique=False,
+    )
+    op.drop_index("idx_hackathon_status", table_name="hackathons")
+    op.create_index(
+        "idx_contests_status_times",
+        "contests",
+        ["contest_status", "start_time", "end_time"],
+        unique=False,
+    )
+    op.drop_index("idx_contests_status", table_name="contests")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("idx_contests_status", "contests", ["contest_status"], unique=False)
+    op.drop_index("idx_contests_status_times", table_name="contests")
+    op.create_index(
+        "idx_hackathon_status", "hackathons", ["hackathon_status"], unique=False
+    )
+    op.drop_index("idx_hackathon_status_times", table_name="hackathons")
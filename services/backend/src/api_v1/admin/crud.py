@@ -9,6 +9,7 @@ from starlette import status
 from api_v1.auth.fastapi_users import current_active_user, current_active_superuser
 from api_v1.groups.dependencies2 import delete_group_in_hackathon
 from api_v1.hackathons.schemas import HackathonBaseSchema, HackathonSchema
+from core.entity_cache import entity_cache
 from core.models import User, Hackathon, Group, GroupUserAssociation, HackathonGroupAssociation, \
     HackathonUserAssociation, Contest, Jury
 from core.models.group import GroupStatus
@@ -55,7 +56,7 @@ async def del_all_my_hackathon(
     for hackathon in hackathons:
         await session.delete(hackathon)
 
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok': True}
 async def de_active_user(session : AsyncSession,user:User):
     user.is_active = False
@@ -125,7 +126,7 @@ async def del_all_my_contest(
     contests = result.scalars().all()
     for contest in contests:
         await session.delete(contest)
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok': True}
 async def get_jurys(session: AsyncSession)->List[Jury]:
     stmt = select(Jury).order_by(Jury.id)
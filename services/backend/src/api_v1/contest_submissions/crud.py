@@ -1,3 +1,5 @@
+import asyncio
+import time
 from datetime import datetime
 from typing import Dict, Any
 
@@ -6,16 +8,30 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from tasks.celery_app import check_code
+from core.config import settings
+from core.types.submission_status import SubmissionStatus2
+from tasks import rejudge
+from tasks.celery_app import celery_app, check_code, judge_task_id, plan_rejudge
+from tasks.judge.languages import available_languages
+from tasks.queues import (
+    REJUDGE_QUEUE,
+    claim_judge_slot,
+    queue_stats,
+    release_judge_slot,
+)
 from core.models import (
+    Contest,
     ContestSubmission,
+    ContestSubmissionTest,
     ContestTask,
     ContestUserAssociation,
+    User,
 )
 from .schemas import (
     ContestSubmissionCreate,
     ContestSubmissionRead,
     ContestSubmissionStatus,
+    LanguageRead,
 )
 
 
@@ -27,8 +43,8 @@ async def create_submission(
     session: AsyncSession, submission_data: ContestSubmissionCreate, user_id: int
 ) -> Dict[str, Any]:
     """
-    Create new submission and start code checking process.
-    Returns submission details with task information.
+    Create new submission and enqueue code checking.
+    Returns immediately; the verdict is written to the submission by the judge.
     """
     # Verify task exists
     task = await session.scalar(
@@ -52,9 +68,19 @@ async def create_submission(
             detail="User is not registered for this contest",
         )
 
+    language = submission_data.language or settings.judge.default_language
+    if language not in {
+        available.name for available in available_languages(settings.judge)
+    }:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown language: {language}",
+        )
+
     # Create new submission
     new_submission = ContestSubmission(
-        **submission_data.model_dump(exclude={"status"}),
+        **submission_data.model_dump(exclude={"status", "language"}),
+        language=language,
         user_id=user_id,
         status="SUBMITTED",
         submitted_at=datetime.utcnow(),
@@ -64,10 +90,140 @@ async def create_submission(
     await session.commit()
     await session.refresh(new_submission)
 
-    # Start async checking process
-    celery_task = check_code(new_submission.id)
+    # Ставим проверку в очередь Celery, не дожидаясь её выполнения
+    queue = claim_judge_slot(user_id)
+    try:
+        celery_task = check_code.apply_async(
+            args=[new_submission.id],
+            kwargs={"user_id": user_id, "enqueued_at": time.time()},
+            task_id=judge_task_id(new_submission.id),
+            queue=queue,
+        )
+    except Exception:
+        # Задача не дошла до брокера, и слот честной очереди не освободит никто
+        release_judge_slot(user_id)
+        raise
+
+    return {
+        "submission_id": new_submission.id,
+        "task_id": celery_task.id,
+        "status": new_submission.status,
+    }
+
+
+def get_languages() -> list[LanguageRead]:
+    """
+    Languages the judge accepts, in registry order. Languages without a
+    sandbox image (see judge.images) are hidden.
+    """
+    return [
+        LanguageRead(
+            name=language.name, title=language.title, compiled=language.compiled
+        )
+        for language in available_languages(settings.judge)
+    ]
+
+
+async def get_submission_status(
+    session: AsyncSession, submission: ContestSubmission
+) -> Dict[str, Any]:
+    """
+    Judging progress: QUEUED, JUDGING, DONE or ERROR.
+    The verdict persisted on the submission row wins; the Celery backend is
+    only asked while the row is still SUBMITTED. A finished judge task on a
+    submission that is still SUBMITTED means the judge gave up without a
+    verdict (retries included), so it is reported as ERROR.
+    """
+    await session.refresh(submission)
+    progress = "DONE"
+    if submission.status == SubmissionStatus2.SUBMITTED:
+        state = await asyncio.to_thread(
+            lambda: celery_app.AsyncResult(judge_task_id(submission.id)).state
+        )
+        if state == "STARTED":
+            progress = "JUDGING"
+        elif state in ("SUCCESS", "FAILURE"):
+            # Вердикт коммитится до конца задачи: перечитываем строку, чтобы
+            # не принять только что сохранённый вердикт за сбой
+            await session.refresh(submission)
+            if submission.status == SubmissionStatus2.SUBMITTED:
+                progress = "ERROR"
+        else:
+            progress = "QUEUED"
+    return {
+        "submission_id": submission.id,
+        "progress": progress,
+        "status": submission.status,
+        "failed_test": submission.failed_test,
+        "graded_at": submission.graded_at,
+    }
+
+
+async def get_queue_stats():
+    return await asyncio.to_thread(queue_stats, celery_app)
+
+
+async def start_rejudge(
+    session: AsyncSession,
+    user: User,
+    task_id: int | None = None,
+    contest_id: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Schedule a bulk rejudge of every submission of a task or of a whole contest.
+    Verdicts are updated one by one on the low-priority rejudge queue.
+    """
+    if task_id is not None:
+        task = await session.get(ContestTask, task_id)
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+            )
+        contest_id = task.contest_id
+        task_ids = [task_id]
+    elif contest_id is not None:
+        task_ids = list(
+            await session.scalars(
+                select(ContestTask.id).where(ContestTask.contest_id == contest_id)
+            )
+        )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="task_id or contest_id is required",
+        )
+
+    await check_rejudge_access(session, user, contest_id)
+
+    rejudge_id = rejudge.start_rejudge({"task_id": task_id, "contest_id": contest_id})
+    plan_rejudge.apply_async(args=[rejudge_id, task_ids], queue=REJUDGE_QUEUE)
+    return {"rejudge_id": rejudge_id}
+
+
+async def check_rejudge_access(session: AsyncSession, user: User, contest_id: int):
+    """Only the contest creator or a superuser may rejudge or watch a rejudge."""
+    contest = await session.get(Contest, contest_id)
+    if not contest:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Contest not found"
+        )
+    if user.id != contest.creator_id and not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"user {user.id} is not creator of this contest",
+        )
+
 
-    return celery_task
+async def get_rejudge_progress(
+    session: AsyncSession, user: User, rejudge_id: str
+) -> Dict[str, Any]:
+    progress = rejudge.get_progress(rejudge_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Rejudge not found"
+        )
+    await check_rejudge_access(session, user, progress["scope"]["contest_id"])
+    return progress
 
 
 async def get_my_submissions(session: AsyncSession, user_id: int):
@@ -90,6 +246,15 @@ async def get_submission_by_id_func(
     return submission if submission else await not_submissions()
 
 
+async def get_submission_tests(session: AsyncSession, submission_id: int):
+    result = await session.execute(
+        select(ContestSubmissionTest)
+        .where(ContestSubmissionTest.submission_id == submission_id)
+        .order_by(ContestSubmissionTest.test_index)
+    )
+    return result.scalars().all()
+
+
 async def get_submission_by_task_id_plus_user_id(
     session: AsyncSession, task_id: int, user_id: int
 ):
@@ -10,6 +10,11 @@ class ContestSubmissionStatus(str, Enum):
     SUBMITTED = "SUBMITTED"
     GRADED = "GRADED"
     DISQUALIFIED = "DISQUALIFIED"
+    WRONG_ANSWER = "WRONG_ANSWER"
+    TIME_LIMIT_EXCEEDED = "TIME_LIMIT_EXCEEDED"
+    RUNTIME_ERROR = "RUNTIME_ERROR"
+    MEMORY_LIMIT_EXCEEDED = "MEMORY_LIMIT_EXCEEDED"
+    COMPILATION_ERROR = "COMPILATION_ERROR"
 
 
 class ContestSubmissionBase(BaseModel):
@@ -20,14 +25,30 @@ class ContestSubmissionBase(BaseModel):
 class ContestSubmissionCreate(BaseModel):
     task_id: int
     code: str
+    language: Optional[str] = None
 
 
 class ContestSubmissionRead(ContestSubmissionBase):
     id: int
     task_id: int
     user_id: int
+    language: str
     submitted_at: Optional[datetime] = None
     graded_at: Optional[datetime] = None
+    failed_test: Optional[int] = None
+    max_time_ms: Optional[int] = None
+    max_memory_kb: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ContestSubmissionTestRead(BaseModel):
+    test_index: int
+    status: str
+    time_ms: int
+    cpu_ms: int
+    memory_kb: int
 
     class Config:
         from_attributes = True
@@ -43,3 +64,9 @@ class SimpleJuryEvaluation(BaseModel):
     score: float
     comment: str
     jury_name: str
+
+
+class LanguageRead(BaseModel):
+    name: str
+    title: str
+    compiled: bool
@@ -1,37 +1,104 @@
 from typing import List
 from .dependencies import user_is_participant_or_admin, check_submission_ownership
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, status
 from fastapi.params import Depends
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.models import ContestSubmission, User
 from . import crud
 from .schemas import ContestSubmissionCreate
 from api_v1.contest_submissions.schemas import (
     ContestSubmissionRead,
+    ContestSubmissionTestRead,
     ContestSubmissionUpdate,
+    LanguageRead,
 )
+from core.http_cache import json_response
 from core.models.db_helper import db_helper
-from ..auth.fastapi_users import current_active_user
+from ..auth.fastapi_users import current_active_user, current_active_superuser
+from ..users.dependencies import user_is_creator
 
 router = APIRouter(tags=["Решения Контестов"])
 
+submissions_adapter = TypeAdapter(List[ContestSubmissionRead])
+
 
 ######
-@router.post("/create")
+@router.post("/create", status_code=status.HTTP_202_ACCEPTED)
 async def submissions_create(
+    request: Request,
     submission_data: ContestSubmissionCreate,
     current_user: User = Depends(user_is_participant_or_admin),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    return await crud.create_submission(session, submission_data, current_user.id)
+    created = await crud.create_submission(session, submission_data, current_user.id)
+    created["status_url"] = str(
+        request.url_for(
+            "get_submission_status", submission_id=created["submission_id"]
+        )
+    )
+    return created
+
+
+@router.get("/{submission_id}/status", name="get_submission_status")
+async def get_submission_status(
+    submission: ContestSubmission = Depends(check_submission_ownership),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    return await crud.get_submission_status(session=session, submission=submission)
+
+
+@router.get("/queues", dependencies=[Depends(current_active_superuser)])
+async def get_judge_queues():
+    return await crud.get_queue_stats()
+
+
+@router.get("/languages", response_model=List[LanguageRead])
+async def get_languages():
+    return crud.get_languages()
+
+
+@router.post("/rejudge", status_code=status.HTTP_202_ACCEPTED)
+async def start_rejudge(
+    request: Request,
+    task_id: int | None = None,
+    contest_id: int | None = None,
+    user: User = Depends(user_is_creator),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    started = await crud.start_rejudge(
+        session=session, user=user, task_id=task_id, contest_id=contest_id
+    )
+    started["status_url"] = str(
+        request.url_for("get_rejudge_progress", rejudge_id=started["rejudge_id"])
+    )
+    return started
+
+
+@router.get("/rejudge/{rejudge_id}", name="get_rejudge_progress")
+async def get_rejudge_progress(
+    rejudge_id: str,
+    user: User = Depends(user_is_creator),
+    session: AsyncSession = Depends(db_helper.session_getter),
+):
+    return await crud.get_rejudge_progress(
+        session=session, user=user, rejudge_id=rejudge_id
+    )
 
 
 @router.get("/", response_model=List[ContestSubmissionRead])
 async def get_submission_endpoint(
+    request: Request,
     current_user: User = Depends(user_is_participant_or_admin),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    return await crud.get_my_submissions(session=session, user_id=current_user.id)
+    submissions = await crud.get_my_submissions(
+        session=session, user_id=current_user.id
+    )
+    body = submissions_adapter.dump_json(
+        submissions_adapter.validate_python(submissions, from_attributes=True)
+    )
+    return json_response(request, body)
 
 
 @router.get("/{submissions_id}", dependencies=[Depends(check_submission_ownership)])
@@ -42,6 +109,17 @@ async def get_submission_by_id(
     return submission
 
 
+@router.get(
+    "/{submission_id}/tests",
+    response_model=List[ContestSubmissionTestRead],
+    dependencies=[Depends(check_submission_ownership)],
+)
+async def get_submission_tests(
+    submission_id: int, session: AsyncSession = Depends(db_helper.session_getter)
+):
+    return await crud.get_submission_tests(session=session, submission_id=submission_id)
+
+
 @router.get(
     "/tasks/{task_id}",
 )
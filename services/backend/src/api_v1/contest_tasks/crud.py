@@ -5,24 +5,38 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from core.entity_cache import entity_cache
 from core.models import ContestTask, Contest, db_helper, TestCase
 from core.models.contest import ContestStatus
+from core.models.contest_task import CheckerType
 from .schemas import CreateContestTaskSchema, ContestTaskSchema
 from api_v1.contests.dependencies import get_contest
 
 
+def validate_checker(checker: CheckerType, checker_code: str | None):
+    if checker == CheckerType.CUSTOM and not checker_code:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="custom checker requires checker_code",
+        )
+
+
 async def create_task_for_contest(
     session: AsyncSession, task_data: CreateContestTaskSchema, contest_id: int
 ) -> ContestTaskSchema:
     contest = await get_contest(session, contest_id)
     if contest is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    validate_checker(task_data.checker, task_data.checker_code)
     task = ContestTask(
         title=task_data.title,
         time_limit=task_data.time_limit,
         memory_limit=task_data.memory_limit,
         description=task_data.description,
         contest_id=contest_id,
+        checker=task_data.checker,
+        checker_tolerance=task_data.checker_tolerance,
+        checker_code=task_data.checker_code,
     )
     if contest.status == ContestStatus.ACTIVE:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='contest already begin')
@@ -40,7 +54,7 @@ async def delete_task(task_id: int, session: AsyncSession):
             delete(TestCase).where(TestCase.task_id == task_id)
         )
         await session.delete(task)
-        await session.commit()
+        await entity_cache.commit(session)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="contest_tasks not found or constest status - active"
@@ -52,8 +66,7 @@ async def get_contest_task_by_id(
     task_id: int,
     session : AsyncSession = Depends(db_helper.session_getter)
 ):
-    result = await session.execute(select(ContestTask).where(ContestTask.id == task_id))
-    task = result.scalars().first()
+    task = await entity_cache.get(session, ContestTask, task_id)
     if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="contest_tasks not found"
@@ -98,7 +111,14 @@ async def update_task(
     if task is None:
         raise HTTPException(status_code=404, detail="contest_tasks not found")
 
-    allowed_fields = {"title", "description", "contest_id"}
+    allowed_fields = {
+        "title",
+        "description",
+        "contest_id",
+        "checker",
+        "checker_tolerance",
+        "checker_code",
+    }
     invalid_fields = set(update_data.keys()) - allowed_fields
     if invalid_fields:
         raise HTTPException(
@@ -112,11 +132,16 @@ async def update_task(
         if not contest_exists.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Contest not found")
 
+    validate_checker(
+        update_data.get("checker", task.checker),
+        update_data.get("checker_code", task.checker_code),
+    )
+
     for field, value in update_data.items():
         setattr(task, field, value)
 
     try:
-        await session.commit()
+        await entity_cache.commit(session)
         await session.refresh(task)
         return task
     except Exception as e:
@@ -126,9 +151,9 @@ async def archive(session:AsyncSession,task:ContestTask):
     if task.contest.status == ContestStatus.ACTIVE:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,detail=f'хакатон уже идет')
     task.is_archived = True
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok':f'task {task.id} is archived'}
 async def unarchive(session:AsyncSession,task:ContestTask):
     task.is_archived = False
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok':f'task {task.id} is unarchived'}
\ No newline at end of file
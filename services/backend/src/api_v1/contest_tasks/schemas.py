@@ -1,11 +1,16 @@
 from pydantic import BaseModel, ConfigDict
 
+from core.models.contest_task import CheckerType
+
 
 class CreateContestTaskSchema(BaseModel):
     title: str
     description: str
     time_limit: int
     memory_limit: int
+    checker: CheckerType = CheckerType.EXACT
+    checker_tolerance: float | None = None
+    checker_code: str | None = None
 
 
 class ContestTaskSchema(BaseModel):
@@ -15,6 +20,8 @@ class ContestTaskSchema(BaseModel):
     contest_id: int
     time_limit: int
     memory_limit: int
+    checker: CheckerType
+    checker_tolerance: float | None = None
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -24,3 +31,6 @@ class ContestTaskUpdateSchema(BaseModel):
     contest_id: int | None = None
     time_limit: int | None = None
     memory_limit: int | None = None
+    checker: CheckerType | None = None
+    checker_tolerance: float | None = None
+    checker_code: str | None = None
@@ -7,17 +7,20 @@ from typing import List
 from core.models.group import GroupStatus
 from .dependencies2 import act_group
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy import select, Result, func
 from sqlalchemy.orm import selectinload, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 from api_v1.contests.schemas import (
     ContestCreateSchema,
     ContestUpdatePartial,
     ContestSchema,
     ContestBaseSchema,
 )
-from core.config import redis_client, settings
+from core.cache import cache
+from core.config import settings
+from core.entity_cache import entity_cache
+from core.http_cache import CachedBody
 from core.models import (
     Contest,
     User,
@@ -31,52 +34,37 @@ from core.models.contest_group_association import TeamStatus2
 from core.models.contest_user_association import (
     ParticipationStatus2,
 )
+from tasks.celery_app import schedule_event
 
 
-def serialize_contests(contests):
-    return [
-        {
-            "id": contest.id,
-            "title": contest.title,
-            "description": contest.description,
-            "start_time": (
-                contest.start_time.isoformat() if contest.start_time else None
-            ),
-            "end_time": contest.end_time.isoformat() if contest.end_time else None,
-            "status": contest.status,
-            "max_participants": contest.max_participants,
-            "current_participants": contest.current_participants,
-            "created_at": (contest.created_at.isoformat()),
-            "creator_id": contest.creator_id,
-            "logo_url": contest.logo_url,
-            "allow_teams": contest.allow_teams,
-            "updated_at": contest.updated_at.isoformat(),
-        }
-        for contest in contests
-    ]
-
+contests_adapter = TypeAdapter(list[ContestSchema])
 
-# Ваша функция get_contests
-async def get_contests(session: AsyncSession) -> list[ContestSchema]:
-    cached_contests = redis_client.get("contests")
-
-    if cached_contests:
-        contests_data = json.loads(cached_contests)
-        return [ContestSchema(**contest) for contest in contests_data]
 
+async def load_contests(session: AsyncSession) -> str:
     stmt = select(Contest).where(Contest.is_archived == False).order_by(Contest.id)
     result: Result = await session.execute(stmt)
     contests = result.scalars().all()
 
     contest_schemas = [ContestSchema.model_validate(contest) for contest in contests]
+    return contests_adapter.dump_json(contest_schemas).decode()
+
 
-    redis_client.set("contests", json.dumps(serialize_contests(contest_schemas)), ex=50)
+async def get_contests_body(session: AsyncSession) -> CachedBody:
+    return await cache.get_or_compute(
+        "contests",
+        lambda: load_contests(session),
+        ex=50,
+        decode=CachedBody.from_text,
+    )
 
-    return contest_schemas
+
+async def get_contests(session: AsyncSession) -> list[ContestSchema]:
+    body = await get_contests_body(session)
+    return contests_adapter.validate_json(body.body)
 
 
 async def get_contest(session: AsyncSession, contest_id: int) -> Contest | None:
-    return await session.get(Contest, contest_id)
+    return await entity_cache.get(session, Contest, contest_id)
 
 
 async def get_contest_by_tittle(
@@ -113,6 +101,7 @@ async def create_contest(
         )
     session.add(contest)
     await session.commit()
+    schedule_event("contest", contest)
     return contest
 
 
@@ -179,8 +168,9 @@ async def update_contest(
                 )
         setattr(contest, field, value)
 
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(contest)
+    schedule_event("contest", contest)
 
     return ContestSchema.model_validate(contest)
 
@@ -191,7 +181,7 @@ async def update_contest_logo(
     logo_url: str,
 ) -> ContestSchema:
     contest.logo_url = logo_url
-    await session.commit()
+    await entity_cache.commit(session)
     return contest
 
 
@@ -209,8 +199,9 @@ async def activate_contest(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="contest completed"
         )
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(contest)
+    schedule_event("contest", contest)
 
     return {"success": f"contest {contest.title} activate"}
 
@@ -229,7 +220,7 @@ async def cancel_contest(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="contest completed"
         )
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(contest)
     return {"success": f"contest {contest.title} deactivate"}
 
@@ -276,7 +267,7 @@ async def add_user_in_contest(
     )
     contest.current_participants += 1
     session.add(association)
-    await session.commit()
+    await entity_cache.commit(session)
     return association
 
 
@@ -294,7 +285,7 @@ async def delete_user_in_contest(
     if association:
         contest.current_participants -= 1
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         return {"delete": True}
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -405,7 +396,7 @@ async def add_group_in_contest(
     await act_group(session=session, group=group)
     contest.current_participants += group.current_members
     session.add(association)
-    await session.commit()
+    await entity_cache.commit(session)
     result = await session.execute(
         select(GroupUserAssociation)
         .options(selectinload(GroupUserAssociation.user))
@@ -435,7 +426,7 @@ async def delete_group_in_contest(
 
     if association:
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         result = await session.execute(
             select(GroupUserAssociation)
             .options(selectinload(GroupUserAssociation.user))
@@ -474,7 +465,7 @@ async def delete_contest(contest_id: int, session: AsyncSession):
         )
 
     await session.delete(contest)
-    await session.commit()
+    await entity_cache.commit(session)
 
     return {
         "status": "success",
@@ -506,7 +497,7 @@ async def patch_max_users_in_contest(
         )
 
     contest.max_participants = max_participants
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(contest)
 
     return ContestSchema.model_validate(contest)
@@ -518,13 +509,13 @@ async def archive(session: AsyncSession, contest: Contest):
             status_code=status.HTTP_409_CONFLICT, detail="contest not completed"
         )
     contest.is_archived = True
-    await session.commit()
+    await entity_cache.commit(session)
     return [{"ok": f"contest {contest.id} is archived"}, contest]
 
 
 async def unarchive(session: AsyncSession, contest: Contest):
     contest.is_archived = False
-    await session.commit()
+    await entity_cache.commit(session)
     return [{"ok": f"contest {contest.id} is unarchived"}, contest]
 
 
@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.util import await_only
 
@@ -41,9 +41,12 @@ async def unarchived(contest : Contest = Depends(get_contest_by_id),
 
 @router.get("/", response_model=list[ContestSchema])
 async def get_contests(
+    request: Request,
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    return await crud.get_contests(session=session)
+    # Готовое тело из кеша, мимо валидации response_model
+    body = await crud.get_contests_body(session=session)
+    return body.response(request)
 
 
 @router.get(
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from starlette import status
 
+from core.entity_cache import entity_cache
 from core.models import Group, Hackathon, GroupUserAssociation, HackathonGroupAssociation, User, \
     HackathonUserAssociation
 
@@ -21,7 +22,7 @@ async def delete_group_in_hackathon(
 
     if association:
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         result = await session.execute(
             select(GroupUserAssociation)
             .options(selectinload(GroupUserAssociation.user))
@@ -61,7 +62,7 @@ async def delete_user_in_hackathon(
     if association:
         hackathon.current_participants -= 1
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         return {"delete": True}
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
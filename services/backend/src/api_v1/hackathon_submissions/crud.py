@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
+from core.entity_cache import entity_cache
 from core.models import (
     HackathonSubmission,
     HackathonTask,
@@ -82,7 +83,7 @@ async def create_submission(
 
     task.current_attempts += 1
 
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(new_submission)
 
     return {f'решение успешно отправлено':f'осталось попыток {task.max_attempts-task.current_attempts}'}
@@ -1,7 +1,8 @@
 from typing import List
 from .dependencies import user_is_participant_or_admin, check_submission_ownership
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.params import Depends
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.models import HackathonSubmission, User, Hackathon
 from . import crud
@@ -12,11 +13,14 @@ from api_v1.hackathon_submissions.schemas import (
 )
 from ..hackathons.crud import get_hackathon
 from ..hackathons.dependencies import get_hackathon_by_id
+from core.http_cache import json_response
 from core.models.db_helper import db_helper
 from ..auth.fastapi_users import current_active_user
 
 router = APIRouter(tags=["Решения Хакатонов"])
 
+submissions_adapter = TypeAdapter(List[HackathonSubmissionRead])
+
 
 ######
 @router.post("/create")
@@ -30,10 +34,17 @@ async def submissions_create(
 
 @router.get("/", response_model=List[HackathonSubmissionRead])
 async def get_submission_endpoint(
+    request: Request,
     current_user: User = Depends(user_is_participant_or_admin),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    return await crud.get_my_submissions(session=session, user_id=current_user.id)
+    submissions = await crud.get_my_submissions(
+        session=session, user_id=current_user.id
+    )
+    body = submissions_adapter.dump_json(
+        submissions_adapter.validate_python(submissions, from_attributes=True)
+    )
+    return json_response(request, body)
 
 
 @router.get("/{submissions_id}", dependencies=[Depends(check_submission_ownership)])
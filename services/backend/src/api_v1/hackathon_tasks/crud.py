@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from core.entity_cache import entity_cache
 from core.models import HackathonTask, Hackathon
 from core.models.hackathon import HackathonStatus
 from .schemas import CreateHackathonTaskSchema, HackathonTaskSchema
@@ -63,7 +64,7 @@ async def delete_task(task_id: int, session: AsyncSession):
                             detail='hackathon active')
     if task:
         await session.delete(task)
-        await session.commit()
+        await entity_cache.commit(session)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="hackathon_tasks not found"
@@ -75,7 +76,7 @@ async def get_task_by_id(
     session: AsyncSession,
     task_id: int,
 ):
-    task = await session.get(HackathonTask,task_id)
+    task = await entity_cache.get(session, HackathonTask, task_id)
     if task.is_archived :
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,detail='task archived')
     if task is None:
@@ -162,7 +163,7 @@ async def update_task(
         setattr(task, field, value)
 
     try:
-        await session.commit()
+        await entity_cache.commit(session)
         await session.refresh(task)
         return task
     except Exception as e:
@@ -172,9 +173,9 @@ async def archive(session:AsyncSession,task:HackathonTask):
     if task.hackathon.status == HackathonStatus.ACTIVE:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,detail=f'хакатон уже идет')
     task.is_archived = True
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok':f'task {task.id} is archived'}
 async def unarchive(session:AsyncSession,task:HackathonTask):
     task.is_archived = False
-    await session.commit()
+    await entity_cache.commit(session)
     return {'ok':f'task {task.id} is unarchived'}
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Request, status, HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.http_cache import json_response
 from core.models import User, HackathonTask, Hackathon
 from .dependencies import verify_user_is_creator_or_participant, verify_user_is_creator_or_participant_by_task
 from .schemas import (
@@ -15,6 +17,8 @@ from api_v1.auth.fastapi_users import current_active_user, current_active_superu
 
 router = APIRouter(tags=["Задачи Хакатонов"])
 
+tasks_adapter = TypeAdapter(list[HackathonTaskSchema])
+
 @router.post(
     "/create_task",
     response_model=HackathonTaskSchema,
@@ -37,6 +41,7 @@ async def create_task(
     response_model=list[HackathonTaskSchema]
 )
 async def get_tasks_in_hackathon(
+    request: Request,
     hackathon_id: int,
     user: User = Depends(verify_user_is_creator_or_participant),
     session: AsyncSession = Depends(db_helper.session_getter),
@@ -45,7 +50,10 @@ async def get_tasks_in_hackathon(
         session=session,
         hackathon_id=hackathon_id
     )
-    return [HackathonTaskSchema.model_validate(task) for task in tasks]
+    body = tasks_adapter.dump_json(
+        [HackathonTaskSchema.model_validate(task) for task in tasks]
+    )
+    return json_response(request, body)
 
 @router.get(
     "/{task_id}",
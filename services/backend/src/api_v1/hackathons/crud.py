@@ -6,17 +6,20 @@ from typing import List, Optional
 from core.models.group import GroupStatus
 from .dependencies2 import act_group
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy import select, Result, func
 from sqlalchemy.orm import selectinload, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 from api_v1.hackathons.schemas import (
     HackathonCreateSchema,
     HackathonUpdatePartial,
     HackathonSchema,
     HackathonBaseSchema,
 )
-from core.config import redis_client, settings
+from core.cache import cache
+from core.config import settings
+from core.entity_cache import entity_cache
+from core.http_cache import CachedBody
 from core.models import (
     Hackathon,
     User,
@@ -30,38 +33,13 @@ from core.models.hackathon_group_association import TeamStatus
 from core.models.hackathon_user_association import (
     ParticipationStatus,
 )
+from tasks.celery_app import schedule_event
 
 
-def serialize_hackathons(hackathons):
-    return [
-        {
-            "id": hackathon.id,
-            "title": hackathon.title,
-            "description": hackathon.description,
-            "start_time": (
-                hackathon.start_time.isoformat() if hackathon.start_time else None
-            ),
-            "end_time": hackathon.end_time.isoformat() if hackathon.end_time else None,
-            "status": hackathon.status,
-            "max_participants": hackathon.max_participants,
-            "current_participants": hackathon.current_participants,
-            "created_at": (hackathon.created_at.isoformat()),
-            "creator_id": hackathon.creator_id,
-            "logo_url": hackathon.logo_url,
-            "allow_teams": hackathon.allow_teams,
-            "updated_at": hackathon.updated_at.isoformat(),
-        }
-        for hackathon in hackathons
-    ]
-
+hackathons_adapter = TypeAdapter(list[HackathonSchema])
 
-async def get_hackathons(session: AsyncSession) -> list[HackathonSchema]:
-    cached_hackathons = redis_client.get("hackathons")
-
-    if cached_hackathons:
-        hackathons_data = json.loads(cached_hackathons)
-        return [HackathonSchema(**hackathon) for hackathon in hackathons_data]
 
+async def load_hackathons(session: AsyncSession) -> str:
     stmt = (
         select(Hackathon).where(Hackathon.is_archived == False).order_by(Hackathon.id)
     )
@@ -71,16 +49,25 @@ async def get_hackathons(session: AsyncSession) -> list[HackathonSchema]:
     hackathon_schemas = [
         HackathonSchema.model_validate(hackathon) for hackathon in hackathons
     ]
+    return hackathons_adapter.dump_json(hackathon_schemas).decode()
+
 
-    redis_client.set(
-        "hackathons", json.dumps(serialize_hackathons(hackathon_schemas)), ex=50
+async def get_hackathons_body(session: AsyncSession) -> CachedBody:
+    return await cache.get_or_compute(
+        "hackathons",
+        lambda: load_hackathons(session),
+        ex=50,
+        decode=CachedBody.from_text,
     )
 
-    return hackathon_schemas
+
+async def get_hackathons(session: AsyncSession) -> list[HackathonSchema]:
+    body = await get_hackathons_body(session)
+    return hackathons_adapter.validate_json(body.body)
 
 
 async def get_hackathon(session: AsyncSession, hackathon_id: int) -> Hackathon | None:
-    return await session.get(Hackathon, hackathon_id)
+    return await entity_cache.get(session, Hackathon, hackathon_id)
 
 
 async def get_hackathon_by_tittle(
@@ -117,6 +104,7 @@ async def create_hackathon(
         )
     session.add(hackathon)
     await session.commit()
+    schedule_event("hackathon", hackathon)
     return hackathon
 
 
@@ -146,7 +134,7 @@ async def update_hackathon_logo(
     logo_url: str,
 ) -> HackathonSchema:
     hackathon.logo_url = logo_url
-    await session.commit()
+    await entity_cache.commit(session)
     return hackathon
 
 
@@ -193,8 +181,9 @@ async def update_hack(
                 )
         setattr(hackathon, field, value)
 
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(hackathon)
+    schedule_event("hackathon", hackathon)
 
     return HackathonSchema.model_validate(hackathon)
 
@@ -213,8 +202,9 @@ async def activate_hackathon(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="hackathon completed"
         )
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(hackathon)
+    schedule_event("hackathon", hackathon)
 
     return {"success": f"hackathon {hackathon.title} activate"}
 
@@ -233,7 +223,7 @@ async def cancel_hackathon(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="hackathon completed"
         )
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(hackathon)
     return {"success": f"hackathon {hackathon.title} deactivate"}
 
@@ -280,7 +270,7 @@ async def add_user_in_hackathon(
     )
     hackathon.current_participants += 1
     session.add(association)
-    await session.commit()
+    await entity_cache.commit(session)
     return association
 
 
@@ -298,7 +288,7 @@ async def delete_user_in_hackathon(
     if association or user.is_superuser and hackathon.status != HackathonStatus.ACTIVE:
         hackathon.current_participants -= 1
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         return {"delete": True}
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -412,7 +402,7 @@ async def add_group_in_hackathon(
     await act_group(session=session, group=group)
     hackathon.current_participants += group.current_members
     session.add(association)
-    await session.commit()
+    await entity_cache.commit(session)
     result = await session.execute(
         select(GroupUserAssociation)
         .options(selectinload(GroupUserAssociation.user))
@@ -442,7 +432,7 @@ async def delete_group_in_hackathon(
 
     if association:
         await session.delete(association)
-        await session.commit()
+        await entity_cache.commit(session)
         result = await session.execute(
             select(GroupUserAssociation)
             .options(selectinload(GroupUserAssociation.user))
@@ -481,7 +471,7 @@ async def delete_hackathon(hackathon_id: int, session: AsyncSession):
         )
 
     await session.delete(hackathon)
-    await session.commit()
+    await entity_cache.commit(session)
 
     return {
         "status": "success",
@@ -513,7 +503,7 @@ async def patch_max_users_in_hack(
         )
 
     hackathon.max_participants = max_participants
-    await session.commit()
+    await entity_cache.commit(session)
     await session.refresh(hackathon)
 
     return HackathonSchema.model_validate(hackathon)
@@ -525,13 +515,13 @@ async def archive(session: AsyncSession, hackathon: Hackathon):
             status_code=status.HTTP_409_CONFLICT, detail="hackathon not completed"
         )
     hackathon.is_archived = True
-    await session.commit()
+    await entity_cache.commit(session)
     return {"ok": f"contest {hackathon.id} is archived"}
 
 
 async def unarchive(session: AsyncSession, hackathon: Hackathon):
     hackathon.is_archived = False
-    await session.commit()
+    await entity_cache.commit(session)
     return {"ok": f"hackathon {hackathon.id} is unarchived"}
 
 
@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.util import await_only
 
@@ -20,6 +20,7 @@ from api_v1.hackathons.schemas import (
     HackathonCreateSchema,
     HackathonUpdatePartial,
 )
+from core.http_cache import not_modified
 from core.models import db_helper, User, Hackathon, Group
 from ..groups.dependencies import (
     get_group_by_id,
@@ -33,9 +34,12 @@ router = APIRouter(tags=["Хакатоны"])
 
 @router.get("/", response_model=list[HackathonSchema])
 async def get_hackathons(
+    request: Request,
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    return await crud.get_hackathons(session=session)
+    # Готовое тело из кеша, мимо валидации response_model
+    body = await crud.get_hackathons_body(session=session)
+    return body.response(request)
 
 
 @router.get(
@@ -45,8 +49,15 @@ async def get_hackathons(
 )
 # ПУСТЬ ЭТО БУДЕТ ДЛЯ ВСЕХ ДАЖЕ НЕ ЗАРЕГАННЫХ
 async def get_hackathon(
+    request: Request,
+    response: Response,
     hackathon: HackathonSchema = Depends(get_hackathon_by_id),
 ):  # УБРАЛ ПЕРЕВОД В СХЕМУ HackathonSchema для celery
+    # updated_at меняется при любом UPDATE хакатона, в том числе из Celery
+    etag = f'W/"{hackathon.id}-{hackathon.updated_at.timestamp()}"'
+    cached = not_modified(request, response, etag, hackathon.updated_at)
+    if cached is not None:
+        return cached
     return hackathon
 
 
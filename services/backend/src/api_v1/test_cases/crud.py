@@ -1,13 +1,29 @@
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from api_v1.contests.crud import get_contests, get_contest
 from api_v1.test_cases.schemas import CreateTestSchema, TestSchema
-from core.models import TestCase, ContestTask
+from core.config import s3_client, settings
+from core.models import Contest, ContestTask, TestCase, User
 from api_v1.hackathons.dependencies import get_hackathon
+from tasks.judge.testdata import blob_digest, blob_key, normalize_input
+
+
+async def store_test_data(data: bytes) -> str | None:
+    """
+    Выносит крупные данные теста в S3 и возвращает их sha256.
+
+    Небольшие данные остаются в строке test_cases: для них хеш — None.
+    Одинаковые данные загружаются под одним ключом один раз.
+    """
+    if len(data) <= settings.judge.inline_test_size:
+        return None
+    digest = blob_digest(data)
+    await s3_client.upload_bytes(blob_key(digest), data)
+    return digest
 
 
 async def create_test_for_contest(
@@ -16,9 +32,14 @@ async def create_test_for_contest(
     contest_id: int,
     task_id: int,
 ) -> TestSchema:
+    # Вход хранится уже в том виде, в каком его получит решение
+    input_hash = await store_test_data(normalize_input(test_data.input))
+    output_hash = await store_test_data(test_data.expected_output.encode("utf-8"))
     test = TestCase(
-        input=test_data.input,
-        expected_output=test_data.expected_output,
+        input=None if input_hash else test_data.input,
+        expected_output=None if output_hash else test_data.expected_output,
+        input_hash=input_hash,
+        output_hash=output_hash,
         task_id=task_id,
         is_public=test_data.is_public,
     )
@@ -30,7 +51,19 @@ async def create_test_for_contest(
 
 async def get_tests(
     session: AsyncSession,
+    user: User,
 ):
-    result = await session.execute(select(TestCase))
+    """
+    Все тесты видны суперпользователю, тесты задачи — создателю её
+    контеста, остальным — только открытые тесты.
+    """
+    stmt = select(TestCase)
+    if not user.is_superuser:
+        stmt = (
+            stmt.join(ContestTask, TestCase.task_id == ContestTask.id)
+            .join(Contest, ContestTask.contest_id == Contest.id)
+            .where(or_(TestCase.is_public, Contest.creator_id == user.id))
+        )
+    result = await session.execute(stmt)
     result = result.scalars().all()
     return [test for test in result]
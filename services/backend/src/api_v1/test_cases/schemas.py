@@ -7,10 +7,14 @@ class CreateTestSchema(BaseModel):
     is_public: bool
 
 
+# Данные крупнее judge.inline_test_size лежат в S3: тогда `input` или
+# `expected_output` пусты, а хеш указывает на объект tests/<sha256>
 class TestSchema(BaseModel):
     id: int
-    input: str
-    expected_output: str
+    input: str | None = None
+    expected_output: str | None = None
+    input_hash: str | None = None
+    output_hash: str | None = None
     is_public: bool
     model_config = ConfigDict(from_attributes=True)
 
@@ -5,7 +5,8 @@ from core.models import User, Contest, ContestTask
 from . import crud
 from core.models.db_helper import db_helper
 from api_v1.hackathons.dependencies import user_is_creator_of_this_hackathon
-from .schemas import CreateTestSchema
+from .schemas import CreateTestSchema, TestSchema
+from ..auth.fastapi_users import current_active_user
 from ..contest_tasks.crud import get_contest_task_by_id
 from ..contests.dependencies import user_is_creator_of_this_contest, get_inactive_contest
 
@@ -30,15 +31,10 @@ async def create_test(
     )
 
 
-@router.get("/")
+@router.get("/", response_model=list[TestSchema])
 async def get_tests(
+    user: User = Depends(current_active_user),
     session: AsyncSession = Depends(db_helper.session_getter),
 ):
-    test = await crud.get_tests(session=session)
-    return [
-        {
-            "id": result.id,
-            "input": result.expected_output,
-        }
-        for result in test
-    ]
+    # Крупные данные лежат в S3: у таких тестов вместо текста отдаётся хеш
+    return await crud.get_tests(session=session, user=user)
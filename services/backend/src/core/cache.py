@@ -0,0 +1,336 @@
+import asyncio
+import contextlib
+import logging
+import math
+import random
+import secrets
+import time
+from collections import OrderedDict
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from core.config import RedisConfig, settings
+
+log = logging.getLogger(__name__)
+
+# Ключи через пробел, которые каждый процесс API выбрасывает из LocalCache
+INVALIDATE_CHANNEL = "cache:invalidate"
+LOCK_KEY = "lock:{key}"
+LOCK_POLL_INTERVAL = 0.05
+# Насколько заранее пересчитывать значение (XFetch): чем больше, тем раньше
+EARLY_REFRESH_BETA = 1.0
+
+# Снимает блокировку, только если она всё ещё наша
+UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LocalCache:
+    """
+    LRU-кеш в памяти процесса с TTL, ограниченный числом записей и
+    суммарным размером (размер записи — длина её строки в Redis).
+
+    Выключен (`enabled`), пока процесс не подписан на рассылку сбросов.
+    `epoch` растёт при каждом сбросе: значение, прочитанное из Redis до
+    сброса, не попадёт в кеш, если передать `epoch` на момент чтения.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = False
+        self.epoch = 0
+        self._entries: OrderedDict[str, tuple[float, int, object]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, _, value = entry
+        if expires < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, size: int, epoch: int):
+        if not self.enabled or epoch != self.epoch or size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def discard(self, *keys: str):
+        self.epoch += 1
+        for key in keys:
+            self._drop(key)
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+class RedisCache:
+    """
+    Асинхронный клиент Redis для кеша API.
+
+    Пул соединений открывается в lifespan приложения. Кеш — не источник
+    правды: любая ошибка или таймаут Redis превращается в промах, и
+    данные берутся из базы. После сбоя Redis пропускается на
+    `cache_retry_interval` секунд, чтобы медленный Redis не добавлял свой
+    таймаут к каждому запросу.
+
+    Перед Redis стоит `local` — кеш в памяти процесса. Изменения
+    рассылаются в канал `INVALIDATE_CHANNEL`, и каждый процесс выбрасывает
+    названные ключи из своего `local`.
+    """
+
+    def __init__(self, config: RedisConfig):
+        self.config = config
+        self.client: aioredis.Redis | None = None
+        self._down_until = 0.0
+        # Идущие пересчёты по ключу: остальные запросы процесса ждут их
+        self._flights: dict[str, asyncio.Future] = {}
+        self.local = LocalCache(
+            config.local_cache_max_entries,
+            config.local_cache_max_bytes,
+            config.local_cache_ttl,
+        )
+        self._listener: asyncio.Task | None = None
+
+    async def connect(self):
+        self.client = aioredis.Redis(
+            connection_pool=aioredis.ConnectionPool(
+                host=self.config.redis_host,
+                port=int(self.config.redis_port),
+                db=int(self.config.redis_db),
+                decode_responses=True,
+                socket_timeout=self.config.cache_timeout,
+                socket_connect_timeout=self.config.cache_timeout,
+                max_connections=self.config.cache_max_connections,
+            )
+        )
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        if self.client is not None:
+            await self.client.aclose(close_connection_pool=True)
+            self.client = None
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._down_until
+
+    def _failed(self, operation: str, e: Exception):
+        self._down_until = time.monotonic() + self.config.cache_retry_interval
+        log.warning("Redis недоступен (%s), кеш отключён: %s", operation, e)
+
+    async def _listen(self):
+        # Отдельное соединение без таймаута чтения: подписка почти всегда молчит
+        client = aioredis.Redis(
+            host=self.config.redis_host,
+            port=int(self.config.redis_port),
+            db=int(self.config.redis_db),
+            decode_responses=True,
+        )
+        try:
+            while True:
+                try:
+                    async with client.pubsub() as pubsub:
+                        await pubsub.subscribe(INVALIDATE_CHANNEL)
+                        self.local.clear()
+                        self.local.enabled = True
+                        async for message in pubsub.listen():
+                            if message["type"] == "message":
+                                self.local.discard(*message["data"].split())
+                except (RedisError, OSError) as e:
+                    log.warning("Подписка на сброс кеша прервана: %s", e)
+                self.local.enabled = False
+                self.local.clear()
+                await asyncio.sleep(self.config.cache_retry_interval)
+        finally:
+            self.local.enabled = False
+            await client.aclose()
+
+    async def invalidate(self, *keys: str):
+        """Удаляет ключи из Redis и из кеша в памяти всех процессов."""
+
+        async def delete(client):
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(INVALIDATE_CHANNEL, " ".join(keys))
+                await pipe.execute()
+
+        self.local.discard(*keys)
+        await self.run("invalidate", delete)
+
+    async def run(self, operation: str, command, default=None):
+        """
+        Выполняет `command(client)` с защитой кеша: при недоступном Redis
+        или ошибке отдаёт `default`.
+        """
+        if not self.available:
+            return default
+        try:
+            return await command(self.client)
+        except (RedisError, OSError) as e:
+            self._failed(operation, e)
+            return default
+
+    async def get(self, key: str) -> str | None:
+        return await self.run("get", lambda client: client.get(key))
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        return bool(
+            await self.run("set", lambda client: client.set(key, value, ex=ex), False)
+        )
+
+    async def delete(self, *keys: str) -> int:
+        return await self.run("delete", lambda client: client.delete(*keys), 0)
+
+    async def get_or_compute(self, key: str, compute, ex: int, decode=None):
+        """
+        Значение из кеша или результат `await compute()`, сохранённый на
+        `ex` секунд. `decode` превращает строку из Redis в то, что отдаётся
+        вызывающему; результат хранится в `local`, и повторные чтения не
+        ходят в Redis и не разбирают JSON.
+
+        Внутри процесса одновременные промахи по ключу объединяются: считает
+        один запрос, остальные ждут его результат. Между процессами
+        пересчёт идёт под блокировкой в Redis: пока один процесс считает,
+        другие отдают прежнее значение, которое хранится ещё
+        `cache_stale_ttl` секунд после истечения, а при пустом кеше ждут
+        до `cache_lock_timeout`. Пересчёт начинается заранее, с
+        вероятностью тем больше, чем ближе истечение и чем дольше считалось
+        значение в прошлый раз (XFetch), поэтому ключ обычно не истекает
+        совсем.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        while (flight := self._flights.get(key)) is not None:
+            value = await asyncio.shield(flight)
+            if value is not None:
+                return value
+            # Ведущий запрос упал или был отменён: считает первый из
+            # ждавших, остальные снова ждут уже его
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        epoch = self.local.epoch
+        value = None
+        try:
+            raw = await self._load(key, compute, ex)
+            value = decode(raw) if decode is not None else raw
+            self.local.set(key, value, len(raw), epoch)
+            return value
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.set_result(value)
+
+    async def _load(self, key: str, compute, ex: int) -> str:
+        entry = self._parse(await self.get(key))
+        if entry is not None:
+            expiry, delta, value = entry
+            refresh_at = expiry + delta * EARLY_REFRESH_BETA * math.log(
+                1 - random.random()
+            )
+            if time.time() < refresh_at:
+                return value
+            token = await self._lock(key)
+            if token is None:
+                # Пересчитывает другой процесс
+                return value
+            return await self._compute(key, compute, ex, token)
+
+        token = await self._lock(key)
+        if token is None:
+            value = await self._wait(key)
+            if value is not None:
+                return value
+        return await self._compute(key, compute, ex, token)
+
+    async def _compute(self, key: str, compute, ex: int, token: str | None) -> str:
+        started = time.monotonic()
+        try:
+            value = await compute()
+            delta = time.monotonic() - started
+            await self.set(
+                key,
+                f"{time.time() + ex:.3f} {delta:.3f} {value}",
+                ex=ex + self.config.cache_stale_ttl,
+            )
+            return value
+        finally:
+            if token:
+                await self.run(
+                    "unlock",
+                    lambda client: client.eval(
+                        UNLOCK_SCRIPT, 1, LOCK_KEY.format(key=key), token
+                    ),
+                )
+
+    async def _lock(self, key: str) -> str | None:
+        """Токен блокировки; пустой, если Redis недоступен и считать можно всем."""
+        token = secrets.token_hex(8)
+        acquired = await self.run(
+            "lock",
+            lambda client: client.set(
+                LOCK_KEY.format(key=key),
+                token,
+                nx=True,
+                px=int(self.config.cache_lock_timeout * 1000),
+            ),
+            "",
+        )
+        if acquired == "":
+            return ""
+        return token if acquired else None
+
+    async def _wait(self, key: str) -> str | None:
+        deadline = time.monotonic() + self.config.cache_lock_timeout
+        while time.monotonic() < deadline and self.available:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = self._parse(await self.get(key))
+            if entry is not None:
+                return entry[2]
+        return None
+
+    @staticmethod
+    def _parse(entry: str | None) -> tuple[float, float, str] | None:
+        """Запись get_or_compute: "<истечение> <время расчёта> <значение>"."""
+        if entry is None:
+            return None
+        try:
+            expiry, delta, value = entry.split(" ", 2)
+            return float(expiry), float(delta), value
+        except ValueError:
+            return None
+
+
+cache = RedisCache(settings.redis)
@@ -5,6 +5,8 @@ from aiobotocore.session import get_session
 from pydantic import BaseModel, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from core.judge_config import JudgeConfig
+
 
 class RunConfig(BaseModel):
     host: str
@@ -39,6 +41,22 @@ class RedisConfig(BaseModel):
     redis_host: str
     redis_port: str
     redis_db: str
+    # Кеш API: таймаут операции в секундах, размер пула и пауза после сбоя
+    cache_timeout: float = 0.2
+    cache_max_connections: int = 50
+    cache_retry_interval: int = 5
+    # Списки в кеше: сколько секунд после истечения отдавать прежнее
+    # значение, пока его пересчитывает один процесс, и срок блокировки
+    cache_stale_ttl: int = 60
+    cache_lock_timeout: float = 5
+    # Кеш в памяти процесса перед Redis: срок записи в секундах и пределы
+    local_cache_ttl: float = 5
+    local_cache_max_entries: int = 1024
+    local_cache_max_bytes: int = 16 * 1024 * 1024
+    # Кеш сущностей по id: сколько секунд запись свежая и сколько ещё её
+    # можно отдавать устаревшей, пока она обновляется в фоне
+    entity_cache_ttl: int = 60
+    entity_cache_stale_ttl: int = 300
 
 
 class CeleryConfig(BaseModel):
@@ -47,6 +65,14 @@ class CeleryConfig(BaseModel):
     celery_backend: str
 
 
+class SchedulerConfig(BaseModel):
+    # Периодический проход по статусам хакатонов и контестов, секунды
+    sweep_interval: int = 300
+    # Дальше этого ETA-задачи смены статуса не ставятся: с брокером Redis
+    # горизонт должен быть меньше visibility_timeout (по умолчанию час)
+    horizon: int = 900
+
+
 class S3Config(BaseModel):
     access_key: str
     secret_key: str
@@ -68,6 +94,8 @@ class Settings(BaseSettings):
     s3: S3Config
     db: DbSettings
     access_token: AccessToken
+    judge: JudgeConfig = JudgeConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
 
 
 class S3Client:
@@ -104,6 +132,25 @@ class S3Client:
                     Body=file,
                 )
 
+    async def upload_bytes(self, object_name: str, data: bytes):
+        async with self.get_client() as client:
+            await client.put_object(
+                Bucket=self.bucket_name,
+                Key=object_name,
+                Body=data,
+            )
+
+    async def download_file(self, object_name: str, file_path: str):
+        async with self.get_client() as client:
+            response = await client.get_object(
+                Bucket=self.bucket_name,
+                Key=object_name,
+            )
+            async with response["Body"] as body:
+                with open(file_path, "wb") as file:
+                    async for chunk in body.iter_chunks():
+                        file.write(chunk)
+
 
 settings = Settings()
 
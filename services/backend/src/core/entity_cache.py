@@ -0,0 +1,287 @@
+"""
+Кеш сущностей по id поверх Redis (read-through).
+
+Хакатон, контест и задачи читаются почти в каждом запросе через
+зависимости get_hackathon_by_id, get_contest_by_id и т.п. Запись сущности
+лежит под ключом с версией: `entity:{name}:{id}` хранит номер версии, а
+данные — `entity:{name}:{id}:{version}:{schema}`. Изменение сущности
+увеличивает версию (INCR), и старые данные сразу становятся недостижимы
+во всех процессах; удалять их не нужно, они истекают сами. `schema` —
+отпечаток набора колонок модели, чтобы после миграции не читать записи
+старого вида.
+
+Промах читает строку из базы и пишет её под той версией, что была до
+чтения: если сущность успели изменить, запись ляжет под старую версию и
+никому не достанется. Запись свежая `entity_cache_ttl` секунд, после
+этого ещё `entity_cache_stale_ttl` секунд отдаётся как есть, а в фоне
+перечитывается из базы (stale-while-revalidate).
+
+Сброс: при flush сессия запоминает изменённые и удалённые сущности, после
+commit их версии увеличиваются, а кешированные списки, где они видны (и
+куда попадают новые), удаляются. Сброс рассылается в канал
+INVALIDATE_CHANNEL, и каждый процесс API выбрасывает эти ключи из кеша в
+памяти (`RedisCache.local`), где лежат последние прочитанные сущности.
+CRUD, меняющий сущности, коммитит через `entity_cache.commit(session)` и
+дожидается сброса, так что следующий запрос уже видит новые данные;
+прочие коммиты сбрасывают кеш в фоне. Воркер Celery меняет статусы
+пакетным UPDATE мимо ORM и сбрасывает версии сам через `version_keys`.
+"""
+
+import asyncio
+import datetime
+import enum
+import json
+import logging
+import time
+import zlib
+from functools import cached_property
+from itertools import chain
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, lazyload, make_transient_to_detached
+
+from core.cache import INVALIDATE_CHANNEL, RedisCache, cache
+from core.config import redis_client, settings
+from core.models import Contest, ContestTask, Hackathon, HackathonTask, db_helper
+
+log = logging.getLogger(__name__)
+
+VERSION_KEY = "entity:{name}:{id}"
+# Ключи версий и списков, которые надо сбросить после commit сессии
+PENDING = "entity_cache_pending"
+# Незавершённые сбросы после commit, их ждёт EntityCache.commit
+INVALIDATIONS = "entity_cache_invalidations"
+
+# Версия и данные сущности за один запрос к Redis
+READ_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local data = redis.call('GET', KEYS[1] .. ':' .. version .. ':' .. ARGV[1])
+return {version, data}
+"""
+
+
+class CachedEntity:
+    """Модель, которую кеширует EntityCache: ключи и (де)сериализация колонок."""
+
+    def __init__(self, name: str, model: type, lists: tuple[str, ...]):
+        self.name = name
+        self.model = model
+        self.lists = lists
+
+    @cached_property
+    def columns(self) -> list[tuple[str, type | None]]:
+        columns = []
+        for attr in inspect(self.model).column_attrs:
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                python_type = None
+            columns.append((attr.key, python_type))
+        return columns
+
+    @cached_property
+    def schema(self) -> str:
+        keys = ",".join(key for key, _ in self.columns)
+        return format(zlib.crc32(keys.encode()), "x")
+
+    def version_key(self, entity_id: int) -> str:
+        return VERSION_KEY.format(name=self.name, id=entity_id)
+
+    def data_key(self, entity_id: int, version: str) -> str:
+        return f"{self.version_key(entity_id)}:{version}:{self.schema}"
+
+    def dump(self, obj) -> dict:
+        row = {}
+        for key, _ in self.columns:
+            value = getattr(obj, key)
+            if isinstance(value, enum.Enum):
+                value = value.value
+            elif isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            row[key] = value
+        return row
+
+    def load(self, row: dict):
+        values = {}
+        for key, python_type in self.columns:
+            value = row[key]
+            if value is not None and python_type is not None:
+                if issubclass(python_type, enum.Enum):
+                    value = python_type(value)
+                elif issubclass(python_type, datetime.datetime):
+                    value = datetime.datetime.fromisoformat(value)
+            values[key] = value
+        return self.model(**values)
+
+
+class EntityCache:
+    def __init__(self, redis: RedisCache, ttl: int, stale_ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.entities: dict[type, CachedEntity] = {}
+        # Фоновые обновления по ключу данных: одно на ключ в процессе
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._background: set[asyncio.Task] = set()
+
+    def register(self, name: str, model: type, lists: tuple[str, ...] = ()):
+        """`lists` — ключи кешированных списков, где видна сущность."""
+        self.entities[model] = CachedEntity(name, model, lists)
+
+    def version_keys(self, model: type, ids) -> list[str]:
+        entity = self.entities[model]
+        return [entity.version_key(entity_id) for entity_id in ids]
+
+    async def get(self, session: AsyncSession, model: type, entity_id: int):
+        """
+        Аналог `session.get(model, entity_id)`. Сущность из кеша
+        присоединяется к сессии без запроса к базе, поэтому её можно
+        менять и коммитить как обычно; связи при обращении не загружены.
+        """
+        entity = self.entities[model]
+        mapper = inspect(model)
+        identity = mapper.identity_key_from_primary_key([entity_id])
+        obj = session.identity_map.get(identity)
+        if obj is not None:
+            return obj
+
+        key = entity.version_key(entity_id)
+        payload = self.redis.local.get(key)
+        if payload is not None and payload["fresh_until"] >= time.time():
+            return await self._attach(session, entity, payload)
+
+        epoch = self.redis.local.epoch
+        cached = await self.redis.run(
+            "entity get",
+            lambda client: client.eval(READ_SCRIPT, 1, key, entity.schema),
+        )
+        if cached is None:
+            return await session.get(model, entity_id)
+        version, data = cached[0], cached[1] if len(cached) > 1 else None
+
+        if data:
+            payload = json.loads(data)
+            if payload["fresh_until"] < time.time():
+                self._revalidate(entity, entity_id, version)
+            else:
+                self.redis.local.set(key, payload, len(data), epoch)
+            return await self._attach(session, entity, payload)
+
+        obj = await session.get(model, entity_id)
+        if obj is not None:
+            await self._store(entity, obj, version, epoch)
+        return obj
+
+    @staticmethod
+    async def _attach(session: AsyncSession, entity: CachedEntity, payload: dict):
+        obj = entity.load(payload["row"])
+        make_transient_to_detached(obj)
+        return await session.merge(obj, load=False)
+
+    async def _store(self, entity: CachedEntity, obj, version: str, epoch: int):
+        payload = {"fresh_until": time.time() + self.ttl, "row": entity.dump(obj)}
+        data = json.dumps(payload)
+        key = entity.data_key(obj.id, version)
+        await self.redis.run(
+            "entity set",
+            lambda client: client.set(key, data, ex=self.ttl + self.stale_ttl),
+        )
+        self.redis.local.set(entity.version_key(obj.id), payload, len(data), epoch)
+
+    def _revalidate(self, entity: CachedEntity, entity_id: int, version: str):
+        key = entity.data_key(entity_id, version)
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(entity, entity_id, version))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, entity: CachedEntity, entity_id: int, version: str):
+        epoch = self.redis.local.epoch
+        try:
+            async with db_helper.session_factory() as session:
+                obj = await session.get(
+                    entity.model, entity_id, options=[lazyload("*")]
+                )
+                if obj is not None:
+                    await self._store(entity, obj, version, epoch)
+        except Exception:
+            log.exception("Не удалось обновить кеш %s %s", entity.name, entity_id)
+
+    async def invalidate(self, versions, lists):
+        """
+        Увеличивает версии сущностей, удаляет списки и рассылает сброс
+        кеша в памяти остальным процессам.
+        """
+        keys = [*versions, *lists]
+        self.redis.local.discard(*keys)
+
+        async def send(client):
+            async with client.pipeline(transaction=False) as pipe:
+                for key in versions:
+                    pipe.incr(key)
+                if lists:
+                    pipe.delete(*lists)
+                pipe.publish(INVALIDATE_CHANNEL, " ".join(keys))
+                await pipe.execute()
+
+        await self.redis.run("entity invalidate", send)
+
+    async def commit(self, session: AsyncSession):
+        """Commit сессии и сброс кеша изменённых в ней сущностей."""
+        await session.commit()
+        tasks = session.info.pop(INVALIDATIONS, [])
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def collect(self, session: Session, flush_context):
+        versions, lists = session.info.setdefault(PENDING, (set(), set()))
+        for obj in chain(session.new, session.dirty, session.deleted):
+            entity = self.entities.get(type(obj))
+            if entity is None:
+                continue
+            lists.update(entity.lists)
+            if obj not in session.new:
+                versions.add(entity.version_key(obj.id))
+
+    def discard(self, session: Session):
+        session.info.pop(PENDING, None)
+
+    def committed(self, session: Session):
+        versions, lists = session.info.pop(PENDING, ((), ()))
+        if not versions and not lists:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Синхронная сессия воркера Celery
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for key in versions:
+                    pipe.incr(key)
+                if lists:
+                    pipe.delete(*lists)
+                pipe.publish(INVALIDATE_CHANNEL, " ".join([*versions, *lists]))
+                pipe.execute()
+            except RedisError as e:
+                log.warning("Не удалось сбросить кеш сущностей: %s", e)
+            return
+        task = loop.create_task(self.invalidate(versions, lists))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        session.info.setdefault(INVALIDATIONS, []).append(task)
+
+
+entity_cache = EntityCache(
+    cache, settings.redis.entity_cache_ttl, settings.redis.entity_cache_stale_ttl
+)
+entity_cache.register("hackathon", Hackathon, lists=("hackathons",))
+entity_cache.register("contest", Contest, lists=("contests",))
+entity_cache.register("contest_task", ContestTask)
+entity_cache.register("hackathon_task", HackathonTask)
+
+event.listen(Session, "after_flush", entity_cache.collect)
+event.listen(Session, "after_commit", entity_cache.committed)
+event.listen(Session, "after_rollback", entity_cache.discard)
@@ -0,0 +1,127 @@
+"""
+HTTP-кеширование ответов: ETag, Last-Modified и 304 Not Modified.
+
+Фронтенд часто опрашивает одни и те же списки. С валидаторами в ответе
+браузер сам шлёт If-None-Match / If-Modified-Since, и неизменившиеся данные
+возвращаются пустым 304 вместо полного тела. `no-cache` разрешает хранить
+ответ, но требует сверяться с сервером перед каждым использованием, так
+что свежесть данных не страдает; ответы, зависящие от пользователя,
+помечаются `private`, чтобы их не кешировали общие прокси.
+"""
+
+import datetime
+import email.utils
+import gzip
+import hashlib
+from dataclasses import dataclass
+
+from fastapi import Request, Response, status
+
+PUBLIC = "public, no-cache"
+PRIVATE = "private, no-cache"
+
+# Меньшие тела сжатие почти не уменьшает
+GZIP_MIN_SIZE = 1024
+
+
+def body_etag(body: bytes) -> str:
+    """Слабый ETag по содержимому: сжатое и несжатое тело равнозначны."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def is_fresh(
+    request: Request, etag: str, last_modified: datetime.datetime | None = None
+) -> bool:
+    """Копия клиента актуальна. If-Modified-Since смотрится без If-None-Match."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.UTC)
+    # В заголовке время с точностью до секунды
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validators(
+    etag: str,
+    last_modified: datetime.datetime | None = None,
+    cache_control: str = PRIVATE,
+) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = email.utils.format_datetime(
+            last_modified.astimezone(datetime.UTC), usegmt=True
+        )
+    return headers
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: datetime.datetime | None = None,
+    cache_control: str = PRIVATE,
+) -> Response | None:
+    """
+    Ответ 304, если копия клиента актуальна. Иначе ставит валидаторы в
+    заголовки `response` (параметр эндпоинта) и возвращает None —
+    эндпоинт отдаёт данные как обычно.
+    """
+    headers = validators(etag, last_modified, cache_control)
+    if is_fresh(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def json_response(
+    request: Request, body: bytes, cache_control: str = PRIVATE
+) -> Response:
+    """Готовый JSON с ETag по содержимому или 304, если он не изменился."""
+    etag = body_etag(body)
+    headers = validators(etag, cache_control=cache_control)
+    if is_fresh(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    """
+    Готовое тело JSON-ответа из кеша: байты, их сжатая копия и ETag.
+
+    Хранится в кеше в памяти процесса, так что попадание отдаётся как есть,
+    без разбора JSON, валидации схем и повторной сериализации.
+    """
+
+    body: bytes
+    gzipped: bytes | None
+    etag: str
+
+    @classmethod
+    def from_text(cls, text: str) -> "CachedBody":
+        body = text.encode()
+        gzipped = gzip.compress(body) if len(body) >= GZIP_MIN_SIZE else None
+        return cls(body, gzipped, body_etag(body))
+
+    def response(self, request: Request, cache_control: str = PUBLIC) -> Response:
+        headers = validators(self.etag, cache_control=cache_control)
+        headers["Vary"] = "Accept-Encoding"
+        if is_fresh(request, self.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        body = self.body
+        if self.gzipped is not None and "gzip" in request.headers.get(
+            "accept-encoding", ""
+        ):
+            body = self.gzipped
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,40 @@
+"""
+Настройки судьи.
+
+Вынесены из core.config, чтобы судью можно было собрать без окружения
+сервиса: импорт core.config читает переменные APP_CONFIG__ и падает без
+базы, Redis и S3, а бенчмарк и тесты судьи работают офлайн.
+"""
+
+from pydantic import BaseModel
+
+
+class JudgeConfig(BaseModel):
+    backend: str = "docker"
+    default_language: str = "python3.9"
+    # Подмена образов языков из реестра: {"java17": "registry/judge-java:17"}
+    images: dict[str, str] = {}
+    warmup_languages: list[str] = ["python3.9"]
+    warmup_memory: str = "256m"
+    # Образ песочниц для чекеров авторов задач
+    checker_image: str = "python:3.12-slim"
+    mode: str = "batch"
+    output_limit: int = 16 * 1024 * 1024
+    parallel_tests: int = 4
+    # Одновременно занятые песочницы на весь хост воркера, по всем его
+    # процессам; слоты — файлы-замки в sandbox_slots_dir
+    max_sandboxes: int = 8
+    sandbox_slots_dir: str = "/var/cache/riddleflow/slots"
+    fair_share: int = 2
+    rejudge_concurrency: int = 4
+    rejudge_batch_size: int = 500
+    verdict_cache_ttl: int = 24 * 3600
+    process_max_file_size: int = 16 * 1024 * 1024
+    pool_size: int = 4
+    pool_idle_ttl: int = 300
+    # Тесты крупнее лежат в S3 по хешу, а на воркерах — в кеше на диске
+    inline_test_size: int = 64 * 1024
+    blob_cache_dir: str = "/var/cache/riddleflow/tests"
+    blob_cache_size: int = 2 * 1024**3
+    compile_cache_dir: str = "/var/cache/riddleflow/builds"
+    compile_cache_size: int = 512 * 1024**2
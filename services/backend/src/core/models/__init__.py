@@ -16,6 +16,7 @@ __all__ = {
     "Contest",
     "ContestTask",
     "ContestSubmission",
+    "ContestSubmissionTest",
     "TestCase",
     "JuryEvaluation",
     'JuryHackathonAssociation',
@@ -40,6 +41,7 @@ from .hackathon_task import HackathonTask
 from .hackathon_submission import HackathonSubmission
 from .contest_task import ContestTask
 from .contest_submission import ContestSubmission
+from .contest_submission_test import ContestSubmissionTest
 from .test_case import TestCase
 
 from .jury import Jury
@@ -24,7 +24,9 @@ class ContestStatus(enum.Enum):
 
 
 class Contest(Base, IdIntPkMixin):
-    __table_args__ = (Index("idx_contests_status", "contest_status"),)
+    __table_args__ = (
+        Index("idx_contests_status_times", "contest_status", "start_time", "end_time"),
+    )
     title: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     description: Mapped[str] = mapped_column(String(900), nullable=False)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,30 +1,26 @@
 from datetime import datetime
-from enum import Enum
 from sqlalchemy.sql import func
-from sqlalchemy import ForeignKey, Text, String, DateTime
+from sqlalchemy import ForeignKey, Text, String, DateTime, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 from typing import TYPE_CHECKING
 from .mixins.int_pk_id import IdIntPkMixin
+from core.types.submission_status import SubmissionStatus2
 
 
 if TYPE_CHECKING:
     from .user import User
     from .contest_task import ContestTask
-
-
-class SubmissionStatus2(str, Enum):
-    DRAFT = "DRAFT"  # Черновик
-    SUBMITTED = "SUBMITTED"  # Отправлено
-    GRADED = "GRADED"  # Проверено
-    WRONG_ANSWER = "WRONG_ANSWER"
-    TIME_LIMIT_EXCEEDED = "TIME_LIMIT_EXCEEDED"
-    RUNTIME_ERROR = "RUNTIME_ERROR"
+    from .contest_submission_test import ContestSubmissionTest
 
 
 class ContestSubmission(Base, IdIntPkMixin):
     __tablename__ = "contest_submissions"
     code: Mapped[str] = mapped_column(Text, nullable=False)
+    # Имя языка из реестра судьи (tasks.judge.languages)
+    language: Mapped[str] = mapped_column(
+        String(32), default="python3.9", server_default="python3.9"
+    )
     status: Mapped[SubmissionStatus2] = mapped_column(default=SubmissionStatus2.DRAFT)
     # score: Mapped[float] = mapped_column(nullable=True)  # Итоговый балл
     # feedback: Mapped[str] = mapped_column(Text, nullable=True)  # Комментарии жюри
@@ -34,7 +30,17 @@ class ContestSubmission(Base, IdIntPkMixin):
     graded_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), nullable=True
     )
+    # Итог проверки судьёй: номер первого упавшего теста и максимумы по тестам
+    failed_test: Mapped[int] = mapped_column(Integer, nullable=True)
+    max_time_ms: Mapped[int] = mapped_column(Integer, nullable=True)
+    max_memory_kb: Mapped[int] = mapped_column(Integer, nullable=True)
     task_id: Mapped[int] = mapped_column(ForeignKey("contest_tasks.id"))
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     task: Mapped["ContestTask"] = relationship(back_populates="submissions")
     user: Mapped["User"] = relationship(back_populates="contest_submissions")
+    tests: Mapped[list["ContestSubmissionTest"]] = relationship(
+        back_populates="submission",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ContestSubmissionTest.test_index",
+    )
@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from .base import Base
+from .mixins.int_pk_id import IdIntPkMixin
+
+if TYPE_CHECKING:
+    from .contest_submission import ContestSubmission
+
+
+class ContestSubmissionTest(Base, IdIntPkMixin):
+    """Замеры судьи по одному проверенному тесту посылки."""
+
+    __tablename__ = "contest_submission_tests"
+    __table_args__ = (
+        UniqueConstraint(
+            "submission_id", "test_index", name="uq_contest_submission_tests_index"
+        ),
+    )
+    submission_id: Mapped[int] = mapped_column(
+        ForeignKey("contest_submissions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    test_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    time_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    cpu_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    memory_kb: Mapped[int] = mapped_column(Integer, nullable=False)
+    submission: Mapped["ContestSubmission"] = relationship(back_populates="tests")
@@ -23,6 +23,13 @@ if TYPE_CHECKING:
     from .contest_submission import ContestSubmission
 
 
+class CheckerType(str, enum.Enum):
+    EXACT = "EXACT"  # Построчно, без учёта пробелов в концах строк
+    TOKENS = "TOKENS"  # По токенам через любые пробельные символы
+    FLOAT = "FLOAT"  # По токенам, числа с точностью checker_tolerance
+    CUSTOM = "CUSTOM"  # Программа-чекер автора задачи в checker_code
+
+
 class ContestTask(Base, IdIntPkMixin):
     __tablename__ = "contest_tasks"
     __table_args__ = (Index("idx_task_contest", "contest_id"),)
@@ -36,6 +43,11 @@ class ContestTask(Base, IdIntPkMixin):
     current_attempts: Mapped[int] = mapped_column(default=0, nullable=False)  # Текущее количество решений
     time_limit: Mapped[int] = mapped_column(Integer, nullable=False)
     memory_limit: Mapped[int] = mapped_column(Integer, nullable=False)
+    checker: Mapped[CheckerType] = mapped_column(
+        default=CheckerType.EXACT, server_default=CheckerType.EXACT.value
+    )
+    checker_tolerance: Mapped[float] = mapped_column(Float, nullable=True)
+    checker_code: Mapped[str] = mapped_column(Text, nullable=True)
     # creator: Mapped["User"] = relationship(back_populates="created_tasks")
     contest: Mapped["Contest"] = relationship(back_populates="tasks")
     submissions: Mapped[list["ContestSubmission"]] = relationship(
@@ -26,7 +26,11 @@ class HackathonStatus(enum.Enum):
 
 
 class Hackathon(Base, IdIntPkMixin):
-    __table_args__ = (Index("idx_hackathon_status", "hackathon_status"),)
+    __table_args__ = (
+        Index(
+            "idx_hackathon_status_times", "hackathon_status", "start_time", "end_time"
+        ),
+    )
     title: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     description: Mapped[str] = mapped_column(String(900), nullable=False)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
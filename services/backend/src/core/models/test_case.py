@@ -14,6 +14,9 @@ class TestCase(Base, IdIntPkMixin):
         ForeignKey("contest_tasks.id"),
         nullable=False,
     )
-    input: Mapped[str] = mapped_column(String, nullable=False)
-    expected_output: Mapped[str] = mapped_column(String, nullable=False)
+    # Крупные данные хранятся в S3 по sha256, тогда в строке только хеш
+    input: Mapped[str] = mapped_column(String, nullable=True)
+    expected_output: Mapped[str] = mapped_column(String, nullable=True)
+    input_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    output_hash: Mapped[str] = mapped_column(String(64), nullable=True)
     is_public: Mapped[bool] = mapped_column(Boolean, nullable=False)
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class SubmissionStatus2(str, Enum):
+    DRAFT = "DRAFT"  # Черновик
+    SUBMITTED = "SUBMITTED"  # Отправлено
+    GRADED = "GRADED"  # Проверено
+    WRONG_ANSWER = "WRONG_ANSWER"
+    TIME_LIMIT_EXCEEDED = "TIME_LIMIT_EXCEEDED"
+    RUNTIME_ERROR = "RUNTIME_ERROR"
+    MEMORY_LIMIT_EXCEEDED = "MEMORY_LIMIT_EXCEEDED"
+    COMPILATION_ERROR = "COMPILATION_ERROR"
@@ -1,15 +1,42 @@
+import asyncio
 import datetime
-import enum
 import logging
+import threading
 
-import docker
 from celery import Celery
-from celery.schedules import crontab
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import sessionmaker
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from sqlalchemy import delete, insert, select
 
-from core.config import settings
-from core.models import Hackathon, ContestSubmission, ContestTask, TestCase, Contest
+from core.config import s3_client, settings
+from core.models import (
+    ContestSubmission,
+    ContestSubmissionTest,
+    ContestTask,
+    TestCase,
+)
+from core.models.contest_submission import SubmissionStatus2
+from tasks.judge import (
+    BlobCache,
+    CheckerSpec,
+    CompileCache,
+    HostSlots,
+    SandboxBackend,
+    create_backend,
+    execution_error,
+    get_language,
+    judge_code,
+    load_test,
+    pull_images,
+)
+from tasks import rejudge, transitions
+from tasks.db import worker_db
+from tasks.verdict_cache import cache_verdict, get_cached_verdict, tests_version
+from tasks.queues import (
+    REJUDGE_QUEUE,
+    configure_queues,
+    record_wait,
+    release_judge_slot,
+)
 
 celery_app = Celery(
     main=settings.celery.celery_main,
@@ -17,119 +44,253 @@ celery_app = Celery(
     backend=settings.celery.celery_backend,
 )
 
-DATABASE_URL = "postgresql://user:password@pg:5432/RiddleFlowDB"
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(bind=engine)
-
-
-class HackathonStatus(enum.Enum):
-    PLANNED = "PLANNED"
-    ACTIVE = "ACTIVE"
-    COMPLETED = "COMPLETED"
-    CANCELED = "CANCELED"
+# Состояние STARTED нужно, чтобы отличать очередь от идущей проверки
+celery_app.conf.task_track_started = True
+configure_queues(celery_app)
 
+SessionLocal = worker_db.session
 
-class ContestStatus(enum.Enum):
-    PLANNED = "PLANNED"
-    ACTIVE = "ACTIVE"
-    COMPLETED = "COMPLETED"
-    CANCELED = "CANCELED"
+# Повторы проверки, не давшей вердикта, и пауза перед первым из них, секунды
+JUDGE_RETRIES = 3
+JUDGE_RETRY_DELAY = 5
 
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
-docker_client = docker.from_env()
 
 
-def run_code_safely(code: str, timeout: int, memory: str, test_case: list):
-    """Запускает каждый тест в новом контейнере и удаляет его сразу после проверки."""
-    for test in test_case:
-        container = None
-        try:
-            # Создаём контейнер для текущего теста
-            container = docker_client.containers.run(
-                image="python:3.9-slim",
-                command=["python", "-c", code],
-                mem_limit=memory,
-                network_mode="none",
-                stdin_open=True,
-                detach=True,
-                tty=True,
+_sandbox_backend: SandboxBackend | None = None
+_sandbox_backend_lock = threading.Lock()
+# Лимит песочниц общий для всех процессов воркера на хосте: семафор в
+# памяти при prefork делился бы на каждый процесс отдельно
+_sandbox_slots = HostSlots(
+    settings.judge.sandbox_slots_dir, settings.judge.max_sandboxes
+)
+
+
+def get_sandbox_backend() -> SandboxBackend:
+    """
+    Бэкенд создаётся лениво, уже внутри дочернего процесса воркера:
+    импорт модуля из API не требует ни сокета Docker, ни пула контейнеров.
+    """
+    global _sandbox_backend
+    with _sandbox_backend_lock:
+        if _sandbox_backend is None:
+            _sandbox_backend = create_backend(settings.judge)
+    return _sandbox_backend
+
+
+_blob_cache: BlobCache | None = None
+
+
+def fetch_blob(key: str, path: str):
+    asyncio.run(s3_client.download_file(key, path))
+
+
+def get_blob_cache() -> BlobCache:
+    """Кеш данных тестов из S3 на локальном диске воркера, общий для его процессов."""
+    global _blob_cache
+    with _sandbox_backend_lock:
+        if _blob_cache is None:
+            _blob_cache = BlobCache(
+                root=settings.judge.blob_cache_dir,
+                max_bytes=settings.judge.blob_cache_size,
+                fetch=fetch_blob,
             )
+    return _blob_cache
 
-            # Отправляем входные данные
-            socket = container.attach_socket(params={"stdin": 1, "stream": 1})
-            input_data = f"{test.input.strip()}\n".encode("utf-8")
-            socket._sock.send(input_data)
-
-            # Ждём завершения (с таймаутом)
-            container.wait(timeout=timeout / 1000 + 1)
-
-            # Получаем логи и берём последнюю непустую строку
-            logs = container.logs().decode("utf-8").splitlines()
-            output = next((line for line in reversed(logs) if line.strip()), "")
-
-            # Проверяем результат
-            if str(output) != test.expected_output:
-                return {
-                    "test_input": test.input,
-                    "success": False,
-                    "user_output": output,
-                    "expected_output": test.expected_output,
-                }
-        except docker.errors.ContainerError as e:
-            return {
-                "success": False,
-                "output": e.stderr.decode().strip() if e.stderr else str(e),
-                "exit_code": 1,
-                "error": "Container error",
-            }
+
+_compile_cache: CompileCache | None = None
+
+
+def get_compile_cache() -> CompileCache:
+    global _compile_cache
+    with _sandbox_backend_lock:
+        if _compile_cache is None:
+            _compile_cache = CompileCache(
+                root=settings.judge.compile_cache_dir,
+                max_bytes=settings.judge.compile_cache_size,
+            )
+    return _compile_cache
+
+
+@worker_init.connect
+def pull_sandbox_images(**kwargs):
+    """Образы всех прогреваемых языков скачиваются один раз, до форка процессов."""
+    if settings.judge.backend not in ("docker", "docker-async"):
+        return
+    images = {
+        get_language(name, settings.judge).image
+        for name in settings.judge.warmup_languages
+    }
+    images.add(settings.judge.checker_image)
+    try:
+        pull_images(images)
+    except Exception as e:
+        logging.warning(f"Не удалось скачать образы песочниц: {e}")
+
+
+@worker_process_init.connect
+def warmup_sandbox_backend(**kwargs):
+    """Каждый процесс воркера заранее поднимает по песочнице на язык."""
+    backend = get_sandbox_backend()
+    for name in settings.judge.warmup_languages:
+        try:
+            backend.warmup(
+                get_language(name, settings.judge), settings.judge.warmup_memory
+            )
         except Exception as e:
-            return {
-                "success": False,
-                "output": str(e),
-                "exit_code": 1,
-                "error": "Execution error",
-            }
-        finally:
-            # Удаляем контейнер сразу после проверки теста
-            if container is not None:
-                try:
-                    container.remove(force=True)
-                except Exception as e:
-                    logging.error(f"Ошибка при удалении контейнера: {e}")
+            logging.warning(f"Не удалось прогреть песочницу {name}: {e}")
+
+
+@worker_process_shutdown.connect
+def close_sandbox_backend(**kwargs):
+    if _sandbox_backend is not None:
+        _sandbox_backend.close()
+
+
+@worker_process_shutdown.connect
+def close_database(**kwargs):
+    worker_db.dispose()
+
+
+def run_code_safely(
+    code: str,
+    timeout: int,
+    memory: str,
+    test_case: list,
+    checker: CheckerSpec | None = None,
+    language: str | None = None,
+):
+    """
+    Раздаёт тесты по не более чем `judge.parallel_tests` песочницам.
+
+    `timeout` — ContestTask.time_limit в миллисекундах: по его истечении
+    процесс теста убивается, а превышение времени или памяти даёт вердикт
+    TIME_LIMIT_EXCEEDED или MEMORY_LIMIT_EXCEEDED вместо Execution error.
+
+    Песочница выбирается настройкой `judge.backend`: docker (контейнеры из
+    пула, по умолчанию), docker-async (тот же пул на асинхронном клиенте
+    Docker) или process (локальные процессы с rlimit'ами).
+    Вывод проверяется чекером задачи `checker`, по умолчанию построчно.
 
-    # Все тесты пройдены успешно
-    return {"success": True}
+    Компилируемые языки собираются один раз до раздачи тестов; сборка
+    берётся из кеша, если этот исходник уже собирался на воркере.
+    """
+    try:
+        backend = get_sandbox_backend()
+        language = get_language(
+            language or settings.judge.default_language, settings.judge
+        )
+    except Exception as e:
+        return execution_error(e)
+    return judge_code(
+        backend,
+        get_compile_cache(),
+        language,
+        code,
+        timeout,
+        memory,
+        test_case,
+        checker=checker,
+        parallel=settings.judge.parallel_tests,
+        slots=_sandbox_slots,
+    )
 
 
-@celery_app.task(bind=True, name="evaluate_submission")
-def check_code(self, submission_id):
+def judge_task_id(submission_id: int) -> str:
+    """Предсказуемый id задачи проверки: по нему API узнаёт её состояние."""
+    return f"evaluate-submission-{submission_id}"
+
+
+def save_verdict(session, submission: ContestSubmission, exec_result: dict):
+    """
+    Записывает итог проверки одной транзакцией: статус и сводку в
+    contest_submissions, замеры по тестам — пачкой в contest_submission_tests.
+    Результаты прошлой проверки той же посылки заменяются.
+    """
+    tests = exec_result.get("tests", [])
+    submission.status = SubmissionStatus2(exec_result["verdict"])
+    submission.graded_at = datetime.datetime.utcnow()
+    submission.failed_test = exec_result.get("failed_test")
+    submission.max_time_ms = max((test["time_ms"] for test in tests), default=None)
+    submission.max_memory_kb = max((test["memory_kb"] for test in tests), default=None)
+
+    session.execute(
+        delete(ContestSubmissionTest).where(
+            ContestSubmissionTest.submission_id == submission.id
+        )
+    )
+    if tests:
+        session.execute(
+            insert(ContestSubmissionTest),
+            [
+                {"submission_id": submission.id, "test_index": index, **test}
+                for index, test in enumerate(tests)
+            ],
+        )
+    session.commit()
+
+
+def judge_submission(submission_id: int, use_cache: bool = True) -> dict:
+    """
+    Проверяет посылку и сохраняет вердикт; общий код check_code и перепроверки.
+
+    С `use_cache=False` посылка проверяется заново, даже если её вердикт
+    есть в кеше; свежий вердикт заменяет закешированный.
+    """
     with SessionLocal() as session:
         try:
             # Получаем submission и задачу
             submission = session.execute(
                 select(ContestSubmission).where(ContestSubmission.id == submission_id)
             ).scalar_one()
+            previous_verdict = submission.status.value
 
             task = session.execute(
                 select(ContestTask).where(ContestTask.id == submission.task_id)
             ).scalar_one()
-            tests = session.execute(
-                select(TestCase).where(TestCase.task_id == submission.task_id)
-            )
-            test_case = [test for test in tests.scalars().all()]
-            exec_result = run_code_safely(
-                code=submission.code,
-                timeout=task.time_limit,
-                memory=f"{task.memory_limit}m",
-                test_case=test_case,
+
+            # Повторная отправка того же кода на те же тесты — ответ из кеша
+            version = tests_version(session, task)
+            exec_result = (
+                get_cached_verdict(submission.language, submission.code, version)
+                if use_cache
+                else None
             )
+            if exec_result is not None:
+                exec_result["cached"] = True
+            else:
+                tests = session.execute(
+                    select(TestCase)
+                    .where(TestCase.task_id == submission.task_id)
+                    .order_by(TestCase.id)
+                )
+                blob_cache = get_blob_cache()
+                test_case = [load_test(test, blob_cache) for test in tests.scalars()]
+                exec_result = run_code_safely(
+                    code=submission.code,
+                    timeout=task.time_limit,
+                    memory=f"{task.memory_limit}m",
+                    test_case=test_case,
+                    checker=CheckerSpec.from_task(task),
+                    language=submission.language,
+                )
+                if "verdict" in exec_result:
+                    cache_verdict(
+                        submission.language, submission.code, version, exec_result
+                    )
+
+            # Без вердикта (сбой песочницы) посылка остаётся SUBMITTED
+            if "verdict" in exec_result:
+                save_verdict(session, submission, exec_result)
             return {
                 "submission_id": submission_id,
                 "task_id": task.id,
                 "status": "COMPLETED" if exec_result["success"] else "FAILED",
+                "verdict": exec_result.get("verdict"),
+                "previous_verdict": previous_verdict,
                 "result": exec_result,
                 "timestamp": datetime.datetime.now().isoformat(),
             }
@@ -143,58 +304,183 @@ def check_code(self, submission_id):
             }
 
 
-@celery_app.task
-def check_hackathon_times():
-    with SessionLocal() as session:
-        stmt1 = select(Hackathon)
-        stmt2 = select(Contest)
-        result1 = session.execute(stmt1)
-        result2 = session.execute(stmt2)
-        hackathons = result1.scalars().all()
-        contests = result2.scalars().all()
-        for hackathon in hackathons:
-            now = datetime.datetime.now(datetime.UTC)
-            logging.info(f"{hackathon.status}")
-            if str(hackathon.status) == str(HackathonStatus.PLANNED) and (
-                hackathon.start_time <= now < hackathon.end_time
-            ):
-                hackathon.status = "ACTIVE"
-                logging.info(
-                    f"id = {hackathon.id}, \n start = {hackathon.start_time}, \n now = {now}"
-                )
-            if (
-                str(hackathon.status) == str(HackathonStatus.ACTIVE)
-                or str(hackathon.status) == str(HackathonStatus.PLANNED)
-            ) and (now > hackathon.end_time):
-                hackathon.status = "COMPLETED"
-                logging.info(
-                    f"id = {hackathon.id}, \n start = {hackathon.end_time}, \n now = {now}"
-                )
+@celery_app.task(bind=True, name="evaluate_submission", max_retries=JUDGE_RETRIES)
+def check_code(self, submission_id, user_id=None, enqueued_at=None):
+    """
+    Посылка без вердикта (сбой песочницы, базы или брокера) проверяется
+    снова с растущей паузой. Если судья так и не вынес вердикт, посылка
+    остаётся SUBMITTED, а завершённая задача даёт прогресс ERROR.
+    """
+    if enqueued_at is not None and not self.request.retries:
+        record_wait(self.request.delivery_info.get("routing_key"), enqueued_at)
+    retrying = False
+    try:
+        result = judge_submission(submission_id)
+        if result.get("verdict") is None and self.request.retries < self.max_retries:
+            # Слот честной очереди остаётся за посылкой до последней попытки
+            retrying = True
+            raise self.retry(countdown=JUDGE_RETRY_DELAY * 2**self.request.retries)
+        if result.get("verdict") is None:
+            logging.error(
+                f"Посылка {submission_id} осталась без вердикта: "
+                f"{result.get('error') or result['result'].get('output')}"
+            )
+        return result
+    finally:
+        if user_id is not None and not retrying:
+            release_judge_slot(user_id)
 
-        for contest in contests:
-            now = datetime.datetime.now(datetime.UTC)
-            logging.info(f"{contest.status}")
-            if str(contest.status) == str(ContestStatus.PLANNED) and (
-                contest.start_time <= now < contest.end_time
-            ):
-                contest.status = "ACTIVE"
-                logging.info(
-                    f"id = {contest.id}, \n start = {contest.start_time}, \n now = {now}"
-                )
-            if (
-                str(contest.status) == str(ContestStatus.ACTIVE)
-                or str(contest.status) == str(ContestStatus.PLANNED)
-            ) and (now > contest.end_time):
-                contest.status = "COMPLETED"
-                logging.info(
-                    f"id = {contest.id}, \n start = {contest.end_time}, \n now = {now}"
-                )
+
+@celery_app.task(name="plan_rejudge")
+def plan_rejudge(rejudge_id: str, task_ids: list[int]):
+    """
+    Перебирает посылки задач пачками по id и складывает их в очередь
+    перепроверки; дорожки запускаются сразу после первой пачки. Если
+    планирование падает, перепроверка становится FAILED и дорожки
+    останавливаются.
+    """
+    last_id = 0
+    lanes_started = False
+    try:
+        with SessionLocal() as session:
+            while True:
+                submission_ids = session.scalars(
+                    select(ContestSubmission.id)
+                    .where(ContestSubmission.task_id.in_(task_ids))
+                    .where(ContestSubmission.status != SubmissionStatus2.DRAFT)
+                    .where(ContestSubmission.id > last_id)
+                    .order_by(ContestSubmission.id)
+                    .limit(settings.judge.rejudge_batch_size)
+                ).all()
+                if not submission_ids:
+                    break
+                rejudge.push_batch(rejudge_id, submission_ids)
+                last_id = submission_ids[-1]
+                if not lanes_started:
+                    for _ in range(settings.judge.rejudge_concurrency):
+                        rejudge_lane.apply_async(
+                            args=[rejudge_id], queue=REJUDGE_QUEUE
+                        )
+                    lanes_started = True
+    except Exception as e:
+        logging.exception(f"Планирование перепроверки {rejudge_id} упало")
+        rejudge.fail_planning(rejudge_id, str(e))
+        raise
+    rejudge.finish_planning(rejudge_id)
+
+
+@celery_app.task(name="rejudge_lane")
+def rejudge_lane(rejudge_id: str):
+    """
+    Одна дорожка перепроверки: берёт следующую посылку, проверяет её и
+    ставит себя в очередь снова. Число дорожек ограничивает, сколько
+    посылок перепроверки одновременно занимают судей. Дорожка ждёт
+    новых посылок, только пока идёт планирование.
+    """
+    state = rejudge.get_state(rejudge_id)
+    if state not in (rejudge.PLANNING, rejudge.RUNNING):
+        return
+    submission_id = rejudge.next_submission(rejudge_id)
+    if submission_id is None:
+        if state == rejudge.PLANNING:
+            rejudge_lane.apply_async(
+                args=[rejudge_id], queue=REJUDGE_QUEUE, countdown=1
+            )
+        return
+    # Перепроверка затем и нужна, чтобы не верить прежним вердиктам
+    result = judge_submission(submission_id, use_cache=False)
+    rejudge.mark_done(
+        rejudge_id,
+        changed=result.get("verdict") not in (None, result.get("previous_verdict")),
+    )
+    rejudge_lane.apply_async(args=[rejudge_id], queue=REJUDGE_QUEUE)
+
+
+def schedule_status_transition(
+    kind: str, event_id: int, at: datetime.datetime | None
+) -> bool:
+    """
+    Ставит ETA-задачу на смену статуса в `at`, если она в пределах
+    `scheduler.horizon`; иначе её поставит ближайший проход.
+    """
+    if at is None:
+        return False
+    if at > transitions.now() + datetime.timedelta(
+        seconds=settings.scheduler.horizon
+    ):
+        return False
+    if not transitions.claim_schedule(kind, event_id, at):
+        return False
+    apply_status_transition.apply_async(args=[kind, event_id], eta=at)
+    return True
+
+
+def schedule_event(kind: str, event) -> bool:
+    """Для API: вызывается после создания или изменения хакатона и контеста."""
+    try:
+        return schedule_status_transition(
+            kind,
+            event.id,
+            transitions.next_transition(
+                kind, event.status, event.start_time, event.end_time
+            ),
+        )
+    except Exception as e:
+        # Не страшно: смену статуса всё равно сделает периодический проход
+        logging.warning(f"Не удалось запланировать смену статуса {kind}: {e}")
+        return False
+
+
+def apply_transitions(kind: str, event_id: int | None = None) -> int:
+    with SessionLocal() as session:
+        changed = transitions.apply_due_transitions(
+            session, kind, transitions.now(), event_id
+        )
         session.commit()
+    transitions.on_transitions(kind, changed)
+    for event in changed:
+        schedule_status_transition(
+            kind,
+            event.id,
+            transitions.next_transition(
+                kind, event.status, event.start_time, event.end_time
+            ),
+        )
+    return len(changed)
+
+
+@celery_app.task(name="apply_status_transition")
+def apply_status_transition(kind: str, event_id: int):
+    apply_transitions(kind, event_id)
+
+
+@celery_app.task
+def check_hackathon_times():
+    """
+    Страховочный проход по статусам: доводит до нужного статуса всё, что
+    пропустили ETA-задачи, и ставит задачи на смены в ближайший горизонт.
+    """
+    for kind in transitions.EVENTS:
+        changed = apply_transitions(kind)
+        if changed:
+            logging.info(f"Проход обновил статус {changed} событий {kind}")
+        moment = transitions.now()
+        until = moment + datetime.timedelta(seconds=settings.scheduler.horizon)
+        with SessionLocal() as session:
+            upcoming = transitions.upcoming_events(session, kind, moment, until)
+        for event in upcoming:
+            schedule_status_transition(
+                kind,
+                event.id,
+                transitions.next_transition(
+                    kind, event.status, event.start_time, event.end_time
+                ),
+            )
 
 
 celery_app.conf.beat_schedule = {
-    "check-hackathon-times-every-minute": {
+    "sweep-status-transitions": {
         "task": "tasks.celery_app.check_hackathon_times",
-        "schedule": crontab(),
+        "schedule": settings.scheduler.sweep_interval,
     },
 }
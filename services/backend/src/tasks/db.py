@@ -0,0 +1,70 @@
+import os
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.config import DbSettings, settings
+
+SYNC_DRIVER = "postgresql+psycopg2"
+
+
+def sync_url(url) -> URL:
+    """URL базы из settings.db (для asyncpg) с синхронным драйвером воркера."""
+    return make_url(str(url)).set(drivername=SYNC_DRIVER)
+
+
+class WorkerDatabase:
+    """
+    Пул соединений воркера Celery с теми же настройками, что у
+    DatabaseHelper API: размер пула, overflow, таймаут, recycle и echo.
+
+    Движок создаётся лениво и заново в каждом процессе: соединения,
+    унаследованные через fork от родителя, дочерний процесс не трогает.
+    Так число соединений воркера — процессы × (pool_size + max_overflow),
+    и его можно сверять с max_connections Postgres.
+    """
+
+    def __init__(self, config: DbSettings):
+        self.config = config
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._engine: Engine | None = None
+        self._session_factory: sessionmaker[Session] | None = None
+
+    @property
+    def engine(self) -> Engine:
+        with self._lock:
+            if self._pid != os.getpid():
+                if self._engine is not None:
+                    # Пул достался от родителя: бросаем его, не закрывая сокеты
+                    self._engine.dispose(close=False)
+                self._engine = create_engine(
+                    sync_url(self.config.url),
+                    echo=self.config.echo,
+                    echo_pool=self.config.echo_pool,
+                    pool_size=self.config.pool_size,
+                    max_overflow=self.config.max_overflow,
+                    pool_timeout=self.config.pool_timeout,
+                    pool_recycle=self.config.pool_recycle,
+                    pool_pre_ping=True,
+                )
+                self._session_factory = sessionmaker(bind=self._engine)
+                self._pid = os.getpid()
+            return self._engine
+
+    def session(self) -> Session:
+        self.engine
+        return self._session_factory()
+
+    def dispose(self):
+        with self._lock:
+            if self._engine is not None and self._pid == os.getpid():
+                self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+            self._pid = None
+
+
+worker_db = WorkerDatabase(settings.db)
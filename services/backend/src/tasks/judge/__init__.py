@@ -0,0 +1,48 @@
+__all__ = {
+    "ContainerPool",
+    "put_files",
+    "run_tests_batch",
+    "run_in_parallel",
+    "HostSlots",
+    "CANCELLED",
+    "SandboxBackend",
+    "DockerBackend",
+    "ProcessBackend",
+    "AsyncDockerBackend",
+    "create_backend",
+    "CheckerSpec",
+    "CheckerError",
+    "BlobCache",
+    "JudgeTest",
+    "load_test",
+    "Language",
+    "LANGUAGES",
+    "get_language",
+    "available_languages",
+    "CompileCache",
+    "CompileError",
+    "Program",
+    "build_program",
+    "compilation_error",
+    "pull_images",
+    "judge_code",
+    "execution_error",
+}
+
+
+from .pool import ContainerPool, put_files
+from .batch import compilation_error, run_tests_batch
+from .parallel import run_in_parallel, CANCELLED, HostSlots
+from .backends import (
+    SandboxBackend,
+    DockerBackend,
+    ProcessBackend,
+    create_backend,
+    pull_images,
+)
+from .aio import AsyncDockerBackend
+from .checkers import CheckerSpec, CheckerError
+from .testdata import BlobCache, JudgeTest, load_test
+from .languages import Language, LANGUAGES, available_languages, get_language
+from .compile import CompileCache, CompileError, Program, build_program
+from .runner import execution_error, judge_code
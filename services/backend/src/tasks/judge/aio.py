@@ -0,0 +1,386 @@
+"""
+Асинхронный Docker-бэкенд судьи.
+
+Все обращения к демону Docker (запуск контейнеров, exec, архивы, чтение
+вывода) идут через aiodocker в одном event loop, который крутится в
+отдельном потоке процесса воркера. Там же разбираются кадры стенда и
+проверяется вывод: чекер получает куски по мере их прихода. Синхронный
+вызов бэкенда из потока судьи ставит в loop одну корутину на всю
+операцию и один раз ждёт её итога, поэтому ожидание ввода-вывода сотен
+песочниц не держит по потоку на каждое соединение с демоном и не гоняет
+каждый кусок вывода между потоками.
+
+Противодавление — те же слоты HostSlots на `judge.max_sandboxes`, что и
+у остальных бэкендов, но занимаемые в самом loop: сверх них аренда
+контейнера ждёт, пока освободится песочница где-либо на хосте.
+Чтобы один процесс вёл много посылок сразу, воркер запускается с пулом
+потоков, например `celery worker --pool threads --concurrency 16`.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import replace
+from functools import partial
+from typing import AsyncIterator, Coroutine, TypeVar
+
+import aiodocker
+from aiodocker.containers import DockerContainer
+from aiodocker.exceptions import DockerError
+from aiodocker.stream import Stream
+
+from core.judge_config import JudgeConfig
+from .backends import (
+    BACKENDS,
+    CHECKER_CONTAINER_MEMORY,
+    SandboxBackend,
+    compile_command,
+    container_memory,
+    parse_memory,
+)
+from .batch import (
+    check_verdicts_async,
+    checker_sandbox,
+    checker_verdict,
+    harness_command,
+    sandbox_files,
+)
+from .checkers import CheckerSandbox, CheckerSpec
+from .compile import CompileError, append_artifact
+from .parallel import HostSlots
+from .languages import BUILD_DIR
+from .pool import POOL_LABEL, SANDBOX_DIR, build_archive
+from .streams import aiter_frames
+
+log = logging.getLogger(__name__)
+
+STDOUT = 1
+
+T = TypeVar("T")
+
+
+async def oom_killed(container: DockerContainer) -> bool:
+    """Как batch.oom_killed: срабатывал ли OOM killer в контейнере."""
+    return bool((await container.show())["State"].get("OOMKilled"))
+
+
+async def put_files(container: DockerContainer, files: dict, path: str = SANDBOX_DIR):
+    """Как pool.put_files: tar собирается во временном файле и уходит потоком."""
+    with build_archive(files) as archive:
+        await container.put_archive(path, archive)
+
+
+async def exec_output(
+    container: DockerContainer,
+    command: list[str],
+    environment: dict[str, str] | None = None,
+) -> tuple[int, bytes]:
+    """Выполняет команду до конца; отдаёт код возврата и stdout со stderr."""
+    execute = await container.exec(
+        command, environment=environment, workdir=SANDBOX_DIR
+    )
+    output = bytearray()
+    async with execute.start(detach=False) as stream:
+        while (message := await stream.read_out()) is not None:
+            output += message.data
+    return (await execute.inspect())["ExitCode"], bytes(output)
+
+
+@asynccontextmanager
+async def exec_stream(
+    container: DockerContainer,
+    command: list[str],
+    environment: dict[str, str] | None = None,
+) -> AsyncIterator[AsyncIterator[bytes]]:
+    """Запускает команду и отдаёт её stdout кусками по мере поступления."""
+    execute = await container.exec(
+        command, environment=environment, workdir=SANDBOX_DIR
+    )
+
+    async def stdout(stream: Stream) -> AsyncIterator[bytes]:
+        while (message := await stream.read_out()) is not None:
+            if message.stream == STDOUT:
+                yield message.data
+
+    async with execute.start(detach=False) as stream:
+        yield stdout(stream)
+
+
+class AsyncContainerPool:
+    """
+    Асинхронный аналог ContainerPool с теми же правилами: контейнеры без
+    сети с `sleep infinity`, сброс после аренды, выселение простаивающих
+    дольше `idle_ttl`. Работает только внутри своего event loop, поэтому
+    обходится без блокировок.
+    """
+
+    def __init__(self, docker: aiodocker.Docker, size: int = 4, idle_ttl: int = 300):
+        self.docker = docker
+        self.size = size
+        self.idle_ttl = idle_ttl
+        self._idle: dict[tuple[str, str], deque[tuple[DockerContainer, float]]] = (
+            defaultdict(deque)
+        )
+        self._closed = False
+        self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def acquire(self, image: str, memory: str) -> DockerContainer:
+        idle = self._idle[(image, memory)]
+        while idle:
+            # Берём самый свежий контейнер, старые остаются на выселение
+            container = idle.pop()[0]
+            try:
+                if (await container.show())["State"]["Running"]:
+                    return container
+            except DockerError:
+                pass
+            await self._remove(container)
+        return await self._start(image, memory)
+
+    async def release(
+        self, image: str, memory: str, container: DockerContainer, healthy: bool
+    ):
+        if healthy and not self._closed and await self._reset(container):
+            idle = self._idle[(image, memory)]
+            if len(idle) < self.size:
+                idle.append((container, time.monotonic()))
+                return
+        await self._remove(container)
+
+    @asynccontextmanager
+    async def lease(self, image: str, memory: str) -> AsyncIterator[DockerContainer]:
+        """Выдаёт контейнер из пула; при исключении контейнер уничтожается."""
+        container = await self.acquire(image, memory)
+        healthy = False
+        try:
+            yield container
+            healthy = True
+        finally:
+            await self.release(image, memory, container, healthy)
+
+    async def warmup(self, image: str, memory: str, count: int | None = None):
+        count = self.size if count is None else min(count, self.size)
+        idle = self._idle[(image, memory)]
+        while len(idle) < count:
+            container = await self._start(image, memory)
+            idle.append((container, time.monotonic()))
+
+    async def evict_idle(self):
+        deadline = time.monotonic() - self.idle_ttl
+        expired = []
+        for idle in self._idle.values():
+            while idle and idle[0][1] < deadline:
+                expired.append(idle.popleft()[0])
+        await asyncio.gather(*(self._remove(container) for container in expired))
+
+    async def close(self):
+        self._closed = True
+        self._reaper.cancel()
+        containers = [c for idle in self._idle.values() for c, _ in idle]
+        self._idle.clear()
+        await asyncio.gather(*(self._remove(container) for container in containers))
+
+    async def _start(self, image: str, memory: str) -> DockerContainer:
+        limit = parse_memory(memory)
+        return await self.docker.containers.run(
+            config={
+                "Image": image,
+                "Cmd": ["sleep", "infinity"],
+                "WorkingDir": SANDBOX_DIR,
+                "Labels": {POOL_LABEL: "1"},
+                "HostConfig": {
+                    "Memory": limit,
+                    "MemorySwap": limit,
+                    "NetworkMode": "none",
+                },
+            }
+        )
+
+    @staticmethod
+    async def _reset(container: DockerContainer) -> bool:
+        try:
+            if await oom_killed(container):
+                return False
+            exit_code, _ = await exec_output(
+                container, ["sh", "-c", f"kill -9 -1; rm -rf {SANDBOX_DIR}/* /tmp/*"]
+            )
+        except DockerError as e:
+            log.warning("Не удалось сбросить контейнер %s: %s", container.id, e)
+            return False
+        return exit_code == 0
+
+    @staticmethod
+    async def _remove(container: DockerContainer):
+        try:
+            await container.delete(force=True)
+        except Exception as e:
+            logging.error(f"Ошибка при удалении контейнера: {e}")
+
+    async def _reap_loop(self):
+        interval = max(1, min(self.idle_ttl, 30))
+        while not self._closed:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+
+class AsyncCheckerContainer(CheckerSandbox):
+    """
+    CheckerContainer асинхронного бэкенда: контейнер чекера берётся из пула
+    при первой проверке куска и держится до его конца, под тем же слотом
+    хоста, что и песочница решения.
+    """
+
+    def __init__(self, backend: "AsyncDockerBackend"):
+        self.backend = backend
+        self._stack = AsyncExitStack()
+        self._container: DockerContainer | None = None
+
+    async def __aenter__(self) -> "AsyncCheckerContainer":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._stack.__aexit__(*exc_info)
+
+    async def run_checker_async(self, files, args):
+        if self._container is None:
+            self._container = await self._stack.enter_async_context(
+                self.backend.pool.lease(
+                    self.backend.config.checker_image, CHECKER_CONTAINER_MEMORY
+                )
+            )
+        files, command = checker_sandbox(files, args)
+        await put_files(self._container, files)
+        async with exec_stream(self._container, command) as chunks:
+            return checker_verdict([chunk async for chunk in chunks])
+
+    def run_checker(self, files, args):
+        return self.backend._call(self.run_checker_async(files, args))
+
+
+class AsyncDockerBackend(SandboxBackend):
+    """
+    Пул песочниц на aiodocker за синхронным интерфейсом SandboxBackend.
+
+    Каждый вызов бэкенда — одна корутина в loop: аренда, подготовка,
+    запуск стенда, разбор кадров и проверка вывода идут внутри loop, а
+    поток судьи блокируется один раз, ожидая итог.
+    """
+
+    name = "docker-async"
+    limits_sandboxes = True
+
+    def __init__(self, config: JudgeConfig):
+        self.config = config
+        self.slots = HostSlots(config.sandbox_slots_dir, config.max_sandboxes)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="judge-docker-loop", daemon=True
+        )
+        self._thread.start()
+        self._call(self._open())
+
+    async def _open(self):
+        self.docker = aiodocker.Docker()
+        self.pool = AsyncContainerPool(
+            self.docker, size=self.config.pool_size, idle_ttl=self.config.pool_idle_ttl
+        )
+
+    def _call(self, coroutine: Coroutine[None, None, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    @asynccontextmanager
+    async def lease(self, image: str, memory: str) -> AsyncIterator[DockerContainer]:
+        """Выдаёт контейнер, дождавшись свободного слота песочницы на хосте."""
+        fd = await self.slots.acquire_async()
+        try:
+            async with self.pool.lease(image, memory) as container:
+                yield container
+        finally:
+            self.slots.release(fd)
+
+    def compile(self, language, source, memory):
+        return self._call(self._compile(language, source, memory))
+
+    async def _compile(self, language, source, memory) -> bytes:
+        async with self.lease(language.image, container_memory(memory)) as container:
+            await put_files(container, {language.source_file: source.encode()})
+            exit_code, output = await exec_output(
+                container, compile_command(language), language.env or None
+            )
+            if exit_code != 0:
+                raise CompileError(output.decode("utf-8", errors="replace"))
+            # Вместо get_archive: tar каталога сборки читается потоком из exec
+            artifact = bytearray()
+            async with exec_stream(container, ["tar", "-cf", "-", BUILD_DIR]) as chunks:
+                async for chunk in chunks:
+                    append_artifact(artifact, chunk)
+            return bytes(artifact)
+
+    def run(self, program, timeout, memory, test_case, cancelled, checker=None):
+        """
+        Все тесты куска одним запуском стенда, как run_tests_batch; режим
+        `judge.mode` на этот бэкенд не влияет.
+        """
+        return self._call(
+            self._run(program, timeout, memory, test_case, cancelled, checker)
+        )
+
+    async def _run(self, program, timeout, memory, test_case, cancelled, checker):
+        async with self.lease(
+            program.language.image, container_memory(memory)
+        ) as container, self.chunk_checker(checker) as checker:
+            await put_files(container, sandbox_files(program, test_case))
+            if program.artifact is not None:
+                await container.put_archive(SANDBOX_DIR, program.artifact)
+            command = harness_command(
+                program, timeout, parse_memory(memory), self.config.output_limit
+            )
+            async with exec_stream(
+                container, command, program.language.env or None
+            ) as chunks:
+                return await check_verdicts_async(
+                    aiter_frames(chunks),
+                    test_case,
+                    cancelled,
+                    checker,
+                    partial(oom_killed, container),
+                )
+
+    @asynccontextmanager
+    async def chunk_checker(self, checker: CheckerSpec | None):
+        """Как DockerBackend.chunk_checker, внутри loop."""
+        if checker is None or checker.kind != "CUSTOM":
+            yield checker
+            return
+        async with AsyncCheckerContainer(self) as sandbox:
+            yield replace(checker, sandbox=sandbox)
+
+    async def run_checker_async(self, files, args):
+        async with AsyncCheckerContainer(self) as sandbox:
+            return await sandbox.run_checker_async(files, args)
+
+    def run_checker(self, files, args):
+        return self._call(self.run_checker_async(files, args))
+
+    def warmup(self, language, memory):
+        self._call(
+            self.pool.warmup(language.image, container_memory(memory), count=1)
+        )
+
+    def close(self):
+        async def shutdown():
+            await self.pool.close()
+            await self.docker.close()
+
+        try:
+            self._call(shutdown())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+
+
+BACKENDS[AsyncDockerBackend.name] = AsyncDockerBackend
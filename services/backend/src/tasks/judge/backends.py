@@ -0,0 +1,401 @@
+import io
+import logging
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+from abc import abstractmethod
+from contextlib import ExitStack, contextmanager
+from dataclasses import replace
+from pathlib import Path
+
+import docker
+from docker.models.containers import Container
+
+from core.judge_config import JudgeConfig
+from . import confine
+from .batch import (
+    VERDICTS,
+    check_verdicts,
+    checker_sandbox,
+    checker_verdict,
+    run_tests_batch,
+)
+from .checkers import (
+    CHECKER_FILE_SIZE,
+    CHECKER_MEMORY,
+    CHECKER_SANDBOX_OVERHEAD,
+    CHECKER_TIME_LIMIT,
+    OUTPUT_PREVIEW,
+    CheckerSandbox,
+    CheckerSpec,
+)
+from .compile import CompileError, Program, read_artifact
+from .harness import run_test
+from .languages import BUILD_DIR, Language
+from .parallel import CANCELLED
+from .pool import SANDBOX_DIR, ContainerPool, put_files
+
+log = logging.getLogger(__name__)
+
+MEMORY_UNITS = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+# Лимит памяти контейнера чекера: сам чекер и стенд рядом с ним
+CHECKER_CONTAINER_MEMORY = str(CHECKER_MEMORY + CHECKER_SANDBOX_OVERHEAD)
+# Память контейнера решения сверх лимита задачи: на стенд, который
+# работает в том же контейнере и не должен отнимать память у решения
+HARNESS_OVERHEAD = 64 * 1024 * 1024
+
+
+def parse_memory(memory: str) -> int:
+    """'256m' -> 268435456, в формате mem_limit докера."""
+    memory = memory.strip().lower()
+    if memory[-1] in MEMORY_UNITS:
+        return int(memory[:-1]) * MEMORY_UNITS[memory[-1]]
+    return int(memory)
+
+
+def container_memory(memory: str) -> str:
+    """Лимит памяти контейнера песочницы для решения с лимитом `memory`."""
+    return str(parse_memory(memory) + HARNESS_OVERHEAD)
+
+
+class SandboxBackend(CheckerSandbox):
+    """Способ собрать посылку и исполнить кусок её тестов в изолированном окружении."""
+
+    name: str
+    # Бэкенд сам занимает слот HostSlots на каждую песочницу, и judge_code
+    # не должен занимать второй
+    limits_sandboxes: bool = False
+
+    @abstractmethod
+    def compile(self, language: Language, source: str, memory: str) -> bytes:
+        """
+        Собирает исходник и возвращает tar каталога build/.
+
+        При ошибке сборки бросает CompileError с выводом компилятора.
+        """
+
+    @abstractmethod
+    def run(
+        self,
+        program: Program,
+        timeout: int,
+        memory: str,
+        test_case: list,
+        cancelled: threading.Event,
+        checker: CheckerSpec | None = None,
+    ) -> dict:
+        """Возвращает результат в формате run_code_safely."""
+
+    def warmup(self, language: Language, memory: str):
+        pass
+
+    def close(self):
+        pass
+
+
+def run_tests_one_by_one(
+    container: Container,
+    program: Program,
+    timeout: int,
+    memory: int,
+    test_case: list,
+    cancelled: threading.Event | None = None,
+    output_limit: int = 16 * 1024 * 1024,
+    checker: CheckerSpec | None = None,
+):
+    """Запускает стенд отдельным exec на каждый тест в арендованном контейнере."""
+    tests = []
+    for index, test in enumerate(test_case):
+        if cancelled is not None and cancelled.is_set():
+            return CANCELLED
+        result = run_tests_batch(
+            container,
+            program,
+            timeout,
+            memory,
+            [test],
+            output_limit=output_limit,
+            checker=checker,
+        )
+        tests.extend(result.get("tests", []))
+        if not result["success"]:
+            if "failed_test" in result:
+                result["failed_test"] = index
+            result["tests"] = tests
+            return result
+    return {"success": True, "verdict": VERDICTS["OK"].value, "tests": tests}
+
+
+def compile_command(language: Language) -> list[str]:
+    """Сборка в песочнице: каталог build/ и жёсткий лимит времени через timeout."""
+    return [
+        "sh",
+        "-c",
+        f'mkdir -p {BUILD_DIR} && exec "$@"',
+        "sh",
+        "timeout",
+        "-s",
+        "KILL",
+        str(language.compile_timeout),
+        *language.compile,
+    ]
+
+
+def pull_images(images: set[str], client: docker.DockerClient | None = None):
+    """Заранее скачивает образы песочниц, которых ещё нет на хосте."""
+    client = client or docker.from_env()
+    for image in images:
+        try:
+            client.images.get(image)
+        except docker.errors.ImageNotFound:
+            log.info("Скачиваем образ песочницы %s", image)
+            client.images.pull(image)
+
+
+class CheckerContainer(CheckerSandbox):
+    """
+    Песочница чекера автора на один кусок тестов.
+
+    Контейнер берётся из пула при первой проверке и держится до конца
+    куска: чекер работает под тем же слотом хоста, что и песочница
+    решения, и не заводит по свежему контейнеру на каждый тест. Каждый
+    тест проверяется отдельным запуском стенда в этом контейнере.
+    """
+
+    def __init__(self, pool: ContainerPool, image: str):
+        self.pool = pool
+        self.image = image
+        self._stack = ExitStack()
+        self._container: Container | None = None
+
+    def __enter__(self) -> "CheckerContainer":
+        return self
+
+    def __exit__(self, *exc_info):
+        # С исключением пул не вернёт контейнер в оборот, а уничтожит
+        return self._stack.__exit__(*exc_info)
+
+    def run_checker(self, files, args):
+        if self._container is None:
+            self._container = self._stack.enter_context(
+                self.pool.lease(self.image, CHECKER_CONTAINER_MEMORY)
+            )
+        files, command = checker_sandbox(files, args)
+        put_files(self._container, files)
+        _, (stdout, _) = self._container.exec_run(command, demux=True)
+        return checker_verdict([stdout or b""])
+
+
+class DockerBackend(SandboxBackend):
+    """Контейнеры из пула прогретых песочниц; нужен доступ к демону Docker."""
+
+    name = "docker"
+
+    def __init__(self, config: JudgeConfig, client: docker.DockerClient | None = None):
+        self.config = config
+        self.pool = ContainerPool(
+            client=client or docker.from_env(),
+            size=config.pool_size,
+            idle_ttl=config.pool_idle_ttl,
+        )
+
+    def compile(self, language, source, memory):
+        with self.pool.lease(language.image, container_memory(memory)) as container:
+            put_files(container, {language.source_file: source.encode("utf-8")})
+            exit_code, output = container.exec_run(
+                compile_command(language), environment=language.env or None
+            )
+            if exit_code != 0:
+                raise CompileError(output.decode("utf-8", errors="replace"))
+            chunks, _ = container.get_archive(f"{SANDBOX_DIR}/{BUILD_DIR}")
+            return read_artifact(chunks)
+
+    def run(self, program, timeout, memory, test_case, cancelled, checker=None):
+        with self.pool.lease(
+            program.language.image, container_memory(memory)
+        ) as container, self.chunk_checker(checker) as checker:
+            run_tests = (
+                run_tests_batch
+                if self.config.mode == "batch"
+                else run_tests_one_by_one
+            )
+            return run_tests(
+                container,
+                program,
+                timeout,
+                parse_memory(memory),
+                test_case,
+                cancelled,
+                output_limit=self.config.output_limit,
+                checker=checker,
+            )
+
+    @contextmanager
+    def chunk_checker(self, checker: CheckerSpec | None):
+        """Чекер автора проверяет весь кусок в одном контейнере из пула."""
+        if checker is None or checker.kind != "CUSTOM":
+            yield checker
+            return
+        with CheckerContainer(self.pool, self.config.checker_image) as sandbox:
+            yield replace(checker, sandbox=sandbox)
+
+    def run_checker(self, files, args):
+        with CheckerContainer(self.pool, self.config.checker_image) as sandbox:
+            return sandbox.run_checker(files, args)
+
+    def warmup(self, language, memory):
+        self.pool.warmup(language.image, container_memory(memory), count=1)
+
+    def close(self):
+        self.pool.close()
+
+
+class ProcessBackend(SandboxBackend):
+    """
+    Локальные процессы во временной директории, без Docker.
+
+    Каждый тест запускается свежим процессом через confine.py, который
+    выставляет rlimit'ы (CPU, адресное пространство, размер файлов, запрет
+    fork для однопоточных рантаймов) и по возможности изолирует сеть через
+    namespace. Изоляция слабее контейнерной: бэкенд предназначен для
+    доверенных хостов, разработки и бенчмарков.
+
+    Python-посылки исполняются интерпретатором воркера независимо от
+    выбранной версии, компиляторы берутся из PATH хоста. Сборка идёт без
+    confine.py: компилятору нужны fork и память.
+    """
+
+    name = "process"
+
+    def __init__(self, config: JudgeConfig, python: str = sys.executable):
+        self.config = config
+        self.python = python
+
+    def command(self, language: Language) -> list[str]:
+        if language.run[0] == "python3":
+            return [self.python, "-I", *language.run[1:]]
+        executable = shutil.which(language.run[0]) or language.run[0]
+        return [executable, *language.run[1:]]
+
+    def compile(self, language, source, memory):
+        workdir = tempfile.mkdtemp(prefix="judge-build-")
+        try:
+            Path(workdir, language.source_file).write_text(source, encoding="utf-8")
+            Path(workdir, BUILD_DIR).mkdir()
+            try:
+                result = subprocess.run(
+                    language.compile,
+                    cwd=workdir,
+                    env={"PATH": os.environ.get("PATH", os.defpath), **language.env},
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    timeout=language.compile_timeout,
+                )
+            except subprocess.TimeoutExpired:
+                raise CompileError("compilation timed out")
+            if result.returncode != 0:
+                raise CompileError(result.stdout.decode("utf-8", errors="replace"))
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w") as tar:
+                tar.add(Path(workdir, BUILD_DIR), arcname=BUILD_DIR)
+            return read_artifact([buffer.getvalue()])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run(self, program, timeout, memory, test_case, cancelled, checker=None):
+        language = program.language
+        memory = parse_memory(memory)
+        output_limit = min(self.config.output_limit, self.config.process_max_file_size)
+        workdir = tempfile.mkdtemp(prefix="judge-")
+        try:
+            Path(workdir, language.source_file).write_text(
+                program.source, encoding="utf-8"
+            )
+            if program.artifact is not None:
+                with tarfile.open(fileobj=io.BytesIO(program.artifact)) as tar:
+                    tar.extractall(workdir)
+            command = confine.command(
+                self.python,
+                math.ceil(timeout / 1000) + 1,
+                memory if language.limit_address_space else 0,
+                self.config.process_max_file_size,
+                self.command(language),
+                forbid_fork=language.forbid_fork,
+            )
+
+            def frames():
+                for index, test in enumerate(test_case):
+                    with tempfile.TemporaryFile() as stdin, (
+                        tempfile.TemporaryFile()
+                    ) as stdout:
+                        stdin.write(test.input)
+                        stdin.seek(0)
+                        verdict = run_test(
+                            index,
+                            stdin,
+                            stdout,
+                            timeout / 1000,
+                            memory,
+                            output_limit,
+                            command=command,
+                            cwd=workdir,
+                            env={
+                                "PATH": os.defpath,
+                                "PYTHONIOENCODING": "utf-8",
+                                **language.env,
+                            },
+                        )
+                        stdout.seek(0)
+                        yield verdict, stdout
+
+            return check_verdicts(frames(), test_case, cancelled, checker)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_checker(self, files, args):
+        workdir = tempfile.mkdtemp(prefix="checker-")
+        try:
+            for name, data in files.items():
+                Path(workdir, name).write_bytes(data)
+            command = confine.command(
+                self.python,
+                CHECKER_TIME_LIMIT + 1,
+                CHECKER_MEMORY,
+                CHECKER_FILE_SIZE,
+                [self.python, *args[1:]],
+            )
+            with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stdout:
+                verdict = run_test(
+                    0,
+                    stdin,
+                    stdout,
+                    CHECKER_TIME_LIMIT,
+                    CHECKER_MEMORY,
+                    CHECKER_FILE_SIZE,
+                    command=command,
+                    cwd=workdir,
+                    env={"PATH": os.defpath, "PYTHONIOENCODING": "utf-8"},
+                )
+                stdout.seek(0)
+                return verdict, stdout.read(OUTPUT_PREVIEW)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+BACKENDS: dict[str, type[SandboxBackend]] = {
+    DockerBackend.name: DockerBackend,
+    ProcessBackend.name: ProcessBackend,
+}
+
+
+def create_backend(config: JudgeConfig) -> SandboxBackend:
+    try:
+        backend = BACKENDS[config.backend]
+    except KeyError:
+        raise ValueError(f"Unknown judge backend: {config.backend}")
+    return backend(config)
@@ -0,0 +1,284 @@
+import threading
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterable, Awaitable, BinaryIO, Callable, Iterable
+
+from docker.models.containers import Container
+
+from core.types.submission_status import SubmissionStatus2
+from .compile import CompileError, Program
+from .harness import input_file
+from .parallel import CANCELLED
+from .pool import SANDBOX_DIR, put_files
+from .checkers import (
+    CHECKER_FILE_SIZE,
+    CHECKER_MEMORY,
+    CHECKER_TIME_LIMIT,
+    OUTPUT_PREVIEW,
+    CheckerError,
+    CheckerSpec,
+    check_output,
+    check_output_async,
+)
+from .streams import AsyncFrameBody, iter_frames
+from .testdata import preview
+
+HARNESS_FILE = "harness.py"
+HARNESS_SOURCE = Path(__file__).with_name(HARNESS_FILE).read_bytes()
+
+VERDICTS = {
+    "OK": SubmissionStatus2.GRADED,
+    "WA": SubmissionStatus2.WRONG_ANSWER,
+    "TLE": SubmissionStatus2.TIME_LIMIT_EXCEEDED,
+    "RE": SubmissionStatus2.RUNTIME_ERROR,
+    "MLE": SubmissionStatus2.MEMORY_LIMIT_EXCEEDED,
+    "OLE": SubmissionStatus2.RUNTIME_ERROR,
+    "CE": SubmissionStatus2.COMPILATION_ERROR,
+}
+
+VERDICT_ERRORS = {
+    "TLE": "Time limit exceeded",
+    "RE": "Runtime error",
+    "MLE": "Memory limit exceeded",
+    "OLE": "Output limit exceeded",
+    "CE": "Compilation error",
+}
+
+OOM_KILLED = "killed by the container OOM killer"
+
+
+def compilation_error(error: CompileError) -> dict:
+    return {
+        "success": False,
+        "verdict": VERDICTS["CE"].value,
+        "error": VERDICT_ERRORS["CE"],
+        "output": error.output,
+        "tests": [],
+    }
+
+
+def test_metrics(verdict: dict, status: str) -> dict:
+    return {
+        "status": VERDICTS[status].value,
+        "time_ms": verdict["time_ms"],
+        "cpu_ms": verdict["cpu_ms"],
+        "memory_kb": verdict["memory_kb"],
+    }
+
+
+def sandbox_files(program: Program, test_case: list) -> dict:
+    """Стенд, исходник и входы тестов — всё, что кладётся в песочницу."""
+    files = {
+        HARNESS_FILE: HARNESS_SOURCE,
+        program.language.source_file: program.source.encode("utf-8"),
+    }
+    for index, test in enumerate(test_case):
+        files[input_file(index)] = test.input
+    return files
+
+
+def harness_command(
+    program: Program, timeout: int, memory: int, output_limit: int
+) -> list[str]:
+    language = program.language
+    address_space = memory if language.limit_address_space else 0
+    return [
+        "python3",
+        HARNESS_FILE,
+        str(timeout),
+        str(memory),
+        str(address_space),
+        str(output_limit),
+        *language.run,
+    ]
+
+
+def checker_sandbox(
+    files: dict, args: tuple[str, ...]
+) -> tuple[dict, list[str]]:
+    """
+    Файлы и команда запуска чекера в его песочнице.
+
+    Чекер запускается стендом как единственный тест с пустым stdin: стенд
+    выставляет лимиты, отбирает права root и отдаёт кадр с вердиктом и
+    выводом чекера.
+    """
+    command = [
+        "python3",
+        HARNESS_FILE,
+        str(CHECKER_TIME_LIMIT * 1000),
+        str(CHECKER_MEMORY),
+        str(CHECKER_MEMORY),
+        str(CHECKER_FILE_SIZE),
+        *args,
+    ]
+    return {HARNESS_FILE: HARNESS_SOURCE, input_file(0): b"", **files}, command
+
+
+def checker_verdict(chunks: Iterable[bytes]) -> tuple[dict, bytes]:
+    """Вердикт стенда и начало вывода чекера из stdout его песочницы."""
+    for verdict, output in iter_frames(chunks):
+        return verdict, output.read(OUTPUT_PREVIEW)
+    raise CheckerError("checker sandbox returned no verdict")
+
+
+def oom_killed(container: Container) -> bool:
+    """Срабатывал ли OOM killer в контейнере за время его аренды."""
+    container.reload()
+    return bool(container.attrs["State"].get("OOMKilled"))
+
+
+def run_tests_batch(
+    container: Container,
+    program: Program,
+    timeout: int,
+    memory: int,
+    test_case: list,
+    cancelled: threading.Event | None = None,
+    output_limit: int = 16 * 1024 * 1024,
+    checker: CheckerSpec | None = None,
+):
+    """
+    Прогоняет все тесты одним запуском стенда внутри контейнера.
+
+    `timeout` — лимит времени на тест в миллисекундах, `memory` — лимит
+    памяти на тест в байтах, `output_limit` — предельный размер вывода;
+    все три соблюдаются стендом. Собранный артефакт программы
+    распаковывается рядом с исходником.
+
+    Эталонные ответы в песочницу не передаются: вывод приходит кадрами и
+    сравнивается здесь по мере чтения. На первом расхождении чтение
+    прекращается, а оставшиеся процессы убиваются при возврате контейнера
+    в пул.
+    """
+    put_files(container, sandbox_files(program, test_case))
+    if program.artifact is not None:
+        container.put_archive(SANDBOX_DIR, program.artifact)
+    _, chunks = container.exec_run(
+        harness_command(program, timeout, memory, output_limit),
+        environment=program.language.env or None,
+        stream=True,
+        demux=True,
+    )
+
+    frames = iter_frames(stdout for stdout, _ in chunks if stdout)
+    return check_verdicts(
+        frames, test_case, cancelled, checker, partial(oom_killed, container)
+    )
+
+
+def check_verdicts(
+    frames: Iterable[tuple[dict, BinaryIO]],
+    test_case: list,
+    cancelled: threading.Event | None = None,
+    checker: CheckerSpec | None = None,
+    oom_killed: Callable[[], bool] | None = None,
+):
+    """
+    Сверяет поток кадров стенда с эталонами до первого расхождения.
+
+    Каждый кадр — вердикт стенда и файлоподобный вывод решения, который
+    проверяется чекером задачи (по умолчанию построчно). Вердикт
+    посылки выражается через SubmissionStatus2, замеры по каждому
+    проверенному тесту собираются в `tests`. Если кадры кончились раньше
+    тестов, `oom_killed` говорит, не убил ли стенд OOM killer контейнера.
+    """
+    tests = []
+    for verdict, output in frames:
+        if cancelled is not None and cancelled.is_set():
+            return CANCELLED
+        test = test_case[verdict["index"]]
+        if verdict["status"] == "OK":
+            matches, user_output = check_output(output, test, checker)
+        else:
+            matches, user_output = False, output.read(OUTPUT_PREVIEW)
+        result = record_test(tests, verdict, test, matches, user_output)
+        if result is not None:
+            return result
+    if len(tests) < len(test_case) and oom_killed is not None and oom_killed():
+        return out_of_memory(tests, test_case)
+    return final_result(tests, test_case)
+
+
+async def check_verdicts_async(
+    frames: AsyncIterable[tuple[dict, AsyncFrameBody]],
+    test_case: list,
+    cancelled: threading.Event | None = None,
+    checker: CheckerSpec | None = None,
+    oom_killed: Callable[[], Awaitable[bool]] | None = None,
+):
+    """check_verdicts для кадров, читаемых в event loop асинхронного бэкенда."""
+    tests = []
+    async for verdict, output in frames:
+        if cancelled is not None and cancelled.is_set():
+            return CANCELLED
+        test = test_case[verdict["index"]]
+        if verdict["status"] == "OK":
+            matches, user_output = await check_output_async(output, test, checker)
+        else:
+            matches, user_output = False, await output.read(OUTPUT_PREVIEW)
+        result = record_test(tests, verdict, test, matches, user_output)
+        if result is not None:
+            return result
+    if len(tests) < len(test_case) and oom_killed is not None and await oom_killed():
+        return out_of_memory(tests, test_case)
+    return final_result(tests, test_case)
+
+
+def record_test(
+    tests: list, verdict: dict, test, matches: bool, user_output: str | bytes
+) -> dict | None:
+    """
+    Добавляет замеры теста в `tests`; для не прошедшего теста отдаёт итог
+    посылки. `user_output` — превью от чекера или сырое начало вывода.
+    """
+    status = verdict["status"]
+    if status == "OK" and not matches:
+        status = "WA"
+    tests.append(test_metrics(verdict, status))
+    if status == "OK":
+        return None
+    if isinstance(user_output, bytes):
+        user_output = user_output.decode("utf-8", errors="replace")
+    result = {
+        "test_input": preview(test.input),
+        "success": False,
+        "user_output": user_output,
+        "expected_output": preview(test.expected_output),
+        "verdict": VERDICTS[status].value,
+        "failed_test": verdict["index"],
+        "tests": tests,
+    }
+    if status in VERDICT_ERRORS:
+        result["error"] = VERDICT_ERRORS[status]
+        result["output"] = verdict["stderr"]
+    return result
+
+
+def out_of_memory(tests: list, test_case: list) -> dict:
+    """
+    Итог куска, стенд которого убит OOM killer'ом контейнера вместе с
+    решением: тест, на котором это случилось, получает MLE. Замеров у
+    него нет — их снимал стенд.
+    """
+    index = len(tests)
+    verdict = {
+        "index": index,
+        "status": "MLE",
+        "stderr": OOM_KILLED,
+        "time_ms": 0,
+        "cpu_ms": 0,
+        "memory_kb": 0,
+    }
+    return record_test(tests, verdict, test_case[index], False, b"")
+
+
+def final_result(tests: list, test_case: list) -> dict:
+    if len(tests) != len(test_case):
+        return {
+            "success": False,
+            "output": f"harness stopped after {len(tests)} of {len(test_case)} tests",
+            "exit_code": 1,
+            "error": "Execution error",
+        }
+    return {"success": True, "verdict": VERDICTS["OK"].value, "tests": tests}
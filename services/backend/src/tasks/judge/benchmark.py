@@ -0,0 +1,319 @@
+"""
+Бенчмарк пропускной способности судьи.
+
+    python -m tasks.judge.benchmark --backend process --backend docker \\
+        --tests 20 --numbers 1000 --submissions 20 --concurrency 4 --json out.json
+
+Генерирует синтетическую задачу (тест — строка случайных чисел, ответ —
+их сумма) и прогоняет через judge_code, тот же путь, что у воркера,
+посылки с заданным поведением: AC, WA, TLE, MLE и RE (падение). Для
+каждого бэкенда и поведения печатает пропускную способность в посылках в
+секунду, перцентили задержки вердикта и накладные расходы песочницы на
+тест — время посылки сверх работы самого решения на критическом пути.
+Накладные расходы считаются только по принятым посылкам, где прогнаны
+все тесты.
+
+Сеть не нужна: база, Redis и S3 не используются, тесты генерируются в
+памяти с фиксированным seed. Настройки судьи берутся из окружения
+сервиса, если оно задано, иначе из значений по умолчанию, и
+переопределяются флагами. Для docker-бэкендов образ языка должен уже
+быть на хосте, иначе Docker попытается его скачать.
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from pydantic import ValidationError
+
+from core.judge_config import JudgeConfig
+from core.types.submission_status import SubmissionStatus2
+from .backends import SandboxBackend, create_backend
+from .compile import CompileCache
+from .languages import get_language
+from .parallel import split_tests
+from .runner import judge_code
+from .testdata import JudgeTest, normalize_input
+
+SOLUTIONS = {
+    "AC": "import sys\nprint(sum(map(int, sys.stdin.buffer.read().split())))\n",
+    "WA": "import sys\nprint(sum(map(int, sys.stdin.buffer.read().split())) + 1)\n",
+    "TLE": "while True:\n    pass\n",
+    "MLE": (
+        "blocks = []\n"
+        "while True:\n"
+        "    blocks.append(bytearray(64 * 1024 * 1024))\n"
+    ),
+    "RE": "raise RuntimeError('benchmark crash')\n",
+}
+
+EXPECTED = {
+    "AC": SubmissionStatus2.GRADED,
+    "WA": SubmissionStatus2.WRONG_ANSWER,
+    "TLE": SubmissionStatus2.TIME_LIMIT_EXCEEDED,
+    "MLE": SubmissionStatus2.MEMORY_LIMIT_EXCEEDED,
+    "RE": SubmissionStatus2.RUNTIME_ERROR,
+}
+
+
+@dataclass
+class SyntheticTask:
+    """Аналог ContestTask с тестами в памяти."""
+
+    time_limit: int
+    memory_limit: str
+    tests: list[JudgeTest]
+
+
+def generate_task(
+    tests: int, numbers: int, time_limit: int, memory_limit: str, seed: int = 0
+) -> SyntheticTask:
+    rng = random.Random(seed)
+    test_case = []
+    for index in range(tests):
+        values = [rng.randint(-(10**9), 10**9) for _ in range(numbers)]
+        test_case.append(
+            JudgeTest(
+                id=index,
+                input=normalize_input(" ".join(map(str, values))),
+                expected_output=f"{sum(values)}\n".encode(),
+            )
+        )
+    return SyntheticTask(time_limit, memory_limit, test_case)
+
+
+@dataclass
+class Report:
+    backend: str
+    behaviour: str
+    submissions: int
+    # Посылки, получившие не тот вердикт, что задумывался: бенчмарк сломан
+    unexpected: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    overhead_per_test_ms: float | None
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def verdict_of(result: dict) -> str:
+    return result.get("verdict") or result.get("error", "")
+
+
+def solution_time_ms(result: dict, parallel: int) -> float:
+    """Самый долгий кусок по времени самого решения: куски идут параллельно."""
+    chunks = split_tests(result["tests"], parallel)
+    return max(sum(test["time_ms"] for test in chunk) for chunk in chunks)
+
+
+class Benchmark:
+    def __init__(
+        self,
+        config: JudgeConfig,
+        task: SyntheticTask,
+        language: str,
+        submissions: int,
+        concurrency: int,
+    ):
+        self.config = config
+        self.task = task
+        self.language = get_language(language, config)
+        self.submissions = submissions
+        self.concurrency = concurrency
+
+    def judge(self, backend, cache, slots, behaviour: str) -> tuple[float, dict]:
+        started = time.perf_counter()
+        result = judge_code(
+            backend,
+            cache,
+            self.language,
+            SOLUTIONS[behaviour],
+            self.task.time_limit,
+            self.task.memory_limit,
+            self.task.tests,
+            parallel=self.config.parallel_tests,
+            slots=slots,
+        )
+        return (time.perf_counter() - started) * 1000, result
+
+    def run_backend(self, name: str, behaviours: list[str]) -> list[Report]:
+        with tempfile.TemporaryDirectory(prefix="judge-bench-slots-") as slots_dir:
+            # Свои слоты песочниц: замер не делит их с воркером на том же хосте
+            config = self.config.model_copy(
+                update={"backend": name, "sandbox_slots_dir": slots_dir}
+            )
+            backend: SandboxBackend = create_backend(config)
+            slots = threading.BoundedSemaphore(config.max_sandboxes)
+            reports = []
+            try:
+                with tempfile.TemporaryDirectory(prefix="judge-bench-") as cache_dir:
+                    cache = CompileCache(cache_dir, config.compile_cache_size)
+                    backend.warmup(self.language, self.task.memory_limit)
+                    # Первая посылка не в зачёт: прогрев пула, кешей и образа
+                    self.judge(backend, cache, slots, "AC")
+                    for behaviour in behaviours:
+                        reports.append(
+                            self.measure(name, backend, cache, slots, behaviour)
+                        )
+            finally:
+                backend.close()
+        return reports
+
+    def measure(self, name, backend, cache, slots, behaviour: str) -> Report:
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            started = time.perf_counter()
+            runs = list(
+                executor.map(
+                    lambda _: self.judge(backend, cache, slots, behaviour),
+                    range(self.submissions),
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+        latencies = [latency for latency, _ in runs]
+        expected = EXPECTED[behaviour].value
+        overheads = [
+            (latency - solution_time_ms(result, self.config.parallel_tests))
+            / len(result["tests"])
+            for latency, result in runs
+            if result.get("success") and result.get("tests")
+        ]
+        return Report(
+            backend=name,
+            behaviour=behaviour,
+            submissions=len(runs),
+            unexpected=sum(verdict_of(result) != expected for _, result in runs),
+            throughput=len(runs) / elapsed,
+            p50_ms=percentile(latencies, 50),
+            p95_ms=percentile(latencies, 95),
+            p99_ms=percentile(latencies, 99),
+            overhead_per_test_ms=statistics.mean(overheads) if overheads else None,
+        )
+
+
+def load_config() -> JudgeConfig:
+    """`settings.judge`, если окружение сервиса задано, иначе значения по умолчанию."""
+    try:
+        from core.config import settings
+    except (ImportError, ValidationError):
+        return JudgeConfig()
+    return settings.judge
+
+
+def print_reports(reports: list[Report]):
+    header = (
+        f"{'backend':<14}{'case':<6}{'subs':>6}{'bad':>5}{'subs/s':>9}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ovh/test ms':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        overhead = (
+            f"{report.overhead_per_test_ms:.1f}"
+            if report.overhead_per_test_ms is not None
+            else "-"
+        )
+        print(
+            f"{report.backend:<14}{report.behaviour:<6}{report.submissions:>6}"
+            f"{report.unexpected:>5}{report.throughput:>9.2f}"
+            f"{report.p50_ms:>10.1f}{report.p95_ms:>10.1f}{report.p99_ms:>10.1f}"
+            f"{overhead:>13}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--backend", action="append", help="бэкенд судьи, можно несколько"
+    )
+    parser.add_argument(
+        "--behaviour",
+        action="append",
+        choices=list(SOLUTIONS),
+        help="поведение посылок, по умолчанию все",
+    )
+    parser.add_argument("--language", help="по умолчанию judge.default_language")
+    parser.add_argument("--tests", type=int, default=10)
+    parser.add_argument("--numbers", type=int, default=1000, help="чисел в тесте")
+    parser.add_argument("--time-limit", type=int, default=1000, help="мс на тест")
+    parser.add_argument("--memory", default="256m")
+    parser.add_argument("--submissions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--parallel-tests", type=int)
+    parser.add_argument("--max-sandboxes", type=int)
+    parser.add_argument("--pool-size", type=int)
+    parser.add_argument("--mode", help="как judge.mode")
+    parser.add_argument(
+        "--image",
+        action="append",
+        default=[],
+        metavar="LANGUAGE=IMAGE",
+        help="подмена образа языка, как judge.images",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    update = {
+        field: value
+        for field, value in (
+            ("parallel_tests", args.parallel_tests),
+            ("max_sandboxes", args.max_sandboxes),
+            ("pool_size", args.pool_size),
+            ("mode", args.mode),
+        )
+        if value is not None
+    }
+    if args.image:
+        images = dict(config.images)
+        for image in args.image:
+            name, sep, value = image.partition("=")
+            if not sep:
+                parser.error(f"--image expects LANGUAGE=IMAGE, got {image!r}")
+            images[name] = value
+        update["images"] = images
+    config = config.model_copy(update=update)
+    args.language = args.language or config.default_language
+    if get_language(args.language).run[0] != "python3":
+        parser.error("synthetic solutions are written in Python")
+    task = generate_task(
+        args.tests, args.numbers, args.time_limit, args.memory, seed=args.seed
+    )
+    benchmark = Benchmark(
+        config, task, args.language, args.submissions, args.concurrency
+    )
+
+    reports = []
+    for name in args.backend or ["process"]:
+        reports.extend(benchmark.run_backend(name, args.behaviour or list(SOLUTIONS)))
+    print_reports(reports)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "reports": [asdict(report) for report in reports],
+                },
+                file,
+                indent=2,
+            )
+    return 1 if any(report.unexpected for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
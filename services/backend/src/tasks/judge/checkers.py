@@ -0,0 +1,348 @@
+import asyncio
+import math
+import mmap
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator
+
+from .harness import CHUNK_SIZE
+from .testdata import Buffer
+
+OUTPUT_PREVIEW = 1000
+TOKEN = re.compile(rb"\S+")
+
+# Чекер пишет автор задачи, поэтому он исполняется в песочнице с лимитами
+CHECKER_FILE = "checker.py"
+CHECKER_ARGS = ("python3", "-I", CHECKER_FILE, "input.txt", "output.txt", "answer.txt")
+CHECKER_TIME_LIMIT = 10
+CHECKER_MEMORY = 512 * 1024 * 1024
+CHECKER_FILE_SIZE = 1024 * 1024
+# Память контейнера чекера сверх лимита самого чекера: на стенд
+CHECKER_SANDBOX_OVERHEAD = 64 * 1024 * 1024
+# Коды возврата как в testlib: 0 — принято, 1 и 2 — неверный ответ
+CHECKER_ACCEPTED = 0
+CHECKER_REJECTED = (1, 2)
+SPOOL_SIZE = 1024 * 1024
+
+
+def iter_lines(data: Buffer) -> Iterator[bytes]:
+    """Строки эталона без пробелов в конце; работает и поверх mmap."""
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = len(data)
+        yield bytes(data[start:end]).rstrip()
+        start = end + 1
+
+
+class CheckerError(Exception):
+    """Чекер задачи упал: это ошибка проверки, а не неверный ответ."""
+
+
+class CheckerSandbox(ABC):
+    """Где исполняется чекер автора: бэкенд судьи или песочница куска тестов."""
+
+    @abstractmethod
+    def run_checker(self, files: dict, args: tuple[str, ...]) -> tuple[dict, bytes]:
+        """
+        Запускает чекер автора задачи в песочнице без сети, куда попадают
+        только `files`. Возвращает вердикт в формате стенда и начало
+        stdout чекера.
+        """
+
+    async def run_checker_async(
+        self, files: dict, args: tuple[str, ...]
+    ) -> tuple[dict, bytes]:
+        return await asyncio.to_thread(self.run_checker, files, args)
+
+
+@dataclass(frozen=True)
+class CheckerSpec:
+    """Способ сравнения вывода, заданный в ContestTask."""
+
+    kind: str = "EXACT"
+    tolerance: float = 1e-6
+    code: str | None = None
+    # Где исполняется чекер автора: бэкенд подставляет judge_code, а
+    # Docker-бэкенды на время куска тестов заменяют его своим контейнером
+    sandbox: CheckerSandbox | None = field(default=None, compare=False)
+
+    @classmethod
+    def from_task(cls, task) -> "CheckerSpec":
+        return cls(
+            kind=task.checker.value,
+            tolerance=task.checker_tolerance or cls.tolerance,
+            code=task.checker_code,
+        )
+
+
+class StreamChecker(ABC):
+    """
+    Проверка вывода решения, получаемого кусками.
+
+    `feed` возвращает False на первом расхождении, после чего чтение вывода
+    можно прекращать; `finish` выносит окончательное решение. Начало вывода
+    сохраняется для отчёта о проверке.
+    """
+
+    def __init__(self, preview: int = OUTPUT_PREVIEW):
+        self._preview = bytearray()
+        self._preview_size = preview
+        self.mismatch = False
+
+    @property
+    def preview(self) -> str:
+        return self._preview.decode("utf-8", errors="replace")
+
+    def feed(self, chunk: bytes) -> bool:
+        if len(self._preview) < self._preview_size:
+            self._preview += chunk[: self._preview_size - len(self._preview)]
+        if not self.mismatch and not self._feed(chunk):
+            self.mismatch = True
+        return not self.mismatch
+
+    @abstractmethod
+    def _feed(self, chunk: bytes) -> bool:
+        pass
+
+    @abstractmethod
+    def finish(self) -> bool:
+        pass
+
+    async def finish_async(self) -> bool:
+        """`finish` для проверки внутри event loop асинхронного бэкенда."""
+        return self.finish()
+
+
+class ExactChecker(StreamChecker):
+    """
+    Построчное сравнение с эталоном.
+
+    Пробелы в конце строк и пустые строки в конце вывода не учитываются.
+    Эталон читается лениво, в памяти держится только текущая незаконченная
+    строка вывода, и та не длиннее ожидаемой.
+    """
+
+    def __init__(self, expected: Buffer, **kwargs):
+        super().__init__(**kwargs)
+        self._expected = iter_lines(expected)
+        self._next = next(self._expected, None)
+        # Пустые строки вывода без пары в эталоне допустимы только в конце
+        self._blank_lines = 0
+        self._line = bytearray()
+
+    def _feed(self, chunk: bytes) -> bool:
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            self._line += line
+            if not self._match_line(bytes(self._line)):
+                return False
+            self._line.clear()
+        self._line += rest
+        return len(self._line.rstrip()) <= self._expected_length()
+
+    def finish(self) -> bool:
+        if self._line and not self._match_line(bytes(self._line)):
+            self.mismatch = True
+        if self.mismatch:
+            return False
+        while self._next is not None:
+            if self._pop():
+                return False
+        return True
+
+    def _pop(self) -> bytes | None:
+        line, self._next = self._next, next(self._expected, None)
+        return line
+
+    def _expected_length(self) -> int:
+        if self._blank_lines or self._next is None:
+            return 0
+        return len(self._next)
+
+    def _match_line(self, line: bytes) -> bool:
+        line = line.rstrip()
+        if not line:
+            if not self._blank_lines and self._next == b"":
+                self._pop()
+            else:
+                self._blank_lines += 1
+            return True
+        return not self._blank_lines and self._pop() == line
+
+
+class TokenChecker(StreamChecker):
+    """Сравнение по токенам: любые пробельные символы считаются одним разделителем."""
+
+    def __init__(self, expected: Buffer, **kwargs):
+        super().__init__(**kwargs)
+        self._expected = (match.group() for match in TOKEN.finditer(expected))
+        self._next = next(self._expected, None)
+        self._token = bytearray()
+
+    def _feed(self, chunk: bytes) -> bool:
+        data = bytes(self._token) + chunk
+        self._token.clear()
+        tokens = data.split()
+        if tokens and not data[-1:].isspace():
+            self._token += tokens.pop()
+        for token in tokens:
+            if not self._match(token):
+                return False
+        return len(self._token) <= self._token_limit()
+
+    def finish(self) -> bool:
+        if self._token and not self._match(bytes(self._token)):
+            self.mismatch = True
+        return not self.mismatch and self._next is None
+
+    def _token_limit(self) -> int:
+        return len(self._next) if self._next is not None else 0
+
+    def _match(self, token: bytes) -> bool:
+        expected, self._next = self._next, next(self._expected, None)
+        return expected is not None and self.equal(token, expected)
+
+    def equal(self, token: bytes, expected: bytes) -> bool:
+        return token == expected
+
+
+class FloatChecker(TokenChecker):
+    """Как TokenChecker, но числа сравниваются с точностью `tolerance`."""
+
+    # Запас на запись числа длиннее эталона: 0.30000000000000004 против 0.3
+    TOKEN_SLACK = 64
+
+    def __init__(self, expected: Buffer, tolerance: float, **kwargs):
+        super().__init__(expected, **kwargs)
+        self.tolerance = tolerance
+
+    def _token_limit(self) -> int:
+        return super()._token_limit() + self.TOKEN_SLACK
+
+    def equal(self, token: bytes, expected: bytes) -> bool:
+        try:
+            value, expected_value = float(token), float(expected)
+        except ValueError:
+            return token == expected
+        return math.isclose(
+            value, expected_value, rel_tol=self.tolerance, abs_tol=self.tolerance
+        )
+
+
+class CustomChecker(StreamChecker):
+    """
+    Программа-чекер автора задачи.
+
+    Вывод решения копится во временном файле (на диске, если он крупный).
+    Код чекера чужой, поэтому на хосте воркера он не исполняется: бэкенд
+    запускает его в песочнице без сети и монтирований, куда попадают
+    только вход, эталон и вывод решения, как
+    `checker.py input.txt output.txt answer.txt`. Вердикт определяется
+    кодом возврата; любой другой исход считается сбоем чекера.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        test_input: Buffer,
+        expected: Buffer,
+        sandbox: CheckerSandbox,
+    ):
+        super().__init__()
+        self.code = code
+        self.test_input = test_input
+        self.expected = expected
+        self.sandbox = sandbox
+        self.comment = ""
+        self._output = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+    def _feed(self, chunk: bytes) -> bool:
+        self._output.write(chunk)
+        return True
+
+    def finish(self) -> bool:
+        with self._files() as files:
+            return self._verdict(*self.sandbox.run_checker(files, CHECKER_ARGS))
+
+    async def finish_async(self) -> bool:
+        with self._files() as files:
+            result = await self.sandbox.run_checker_async(files, CHECKER_ARGS)
+        return self._verdict(*result)
+
+    @contextmanager
+    def _files(self) -> Iterator[dict[str, Buffer]]:
+        """Файлы песочницы чекера; вывод решения отдаётся через mmap."""
+        size = self._output.tell()
+        output: Buffer = b""
+        try:
+            if size:
+                self._output.rollover()
+                output = mmap.mmap(self._output.fileno(), 0, access=mmap.ACCESS_READ)
+            yield {
+                CHECKER_FILE: self.code.encode("utf-8"),
+                "input.txt": self.test_input,
+                "output.txt": output,
+                "answer.txt": self.expected,
+            }
+        finally:
+            if isinstance(output, mmap.mmap):
+                output.close()
+            self._output.close()
+
+    def _verdict(self, verdict: dict, stdout: bytes) -> bool:
+        self.comment = stdout.decode("utf-8", errors="replace")
+        if verdict["exit_code"] == CHECKER_ACCEPTED and verdict["status"] == "OK":
+            return True
+        if verdict["exit_code"] in CHECKER_REJECTED:
+            return False
+        raise CheckerError(
+            f"checker failed with {verdict['status']} "
+            f"(exit code {verdict['exit_code']}): {verdict['stderr']}"
+        )
+
+
+def create_checker(
+    spec: CheckerSpec, test_input: Buffer, expected: Buffer
+) -> StreamChecker:
+    if spec.kind == "EXACT":
+        return ExactChecker(expected)
+    if spec.kind == "TOKENS":
+        return TokenChecker(expected)
+    if spec.kind == "FLOAT":
+        return FloatChecker(expected, spec.tolerance)
+    if spec.kind == "CUSTOM":
+        if not spec.code:
+            raise CheckerError("custom checker has no code")
+        if spec.sandbox is None:
+            raise CheckerError("custom checker needs a sandbox backend")
+        return CustomChecker(spec.code, test_input, expected, spec.sandbox)
+    raise CheckerError(f"unknown checker {spec.kind!r}")
+
+
+def check_output(
+    output: BinaryIO, test, spec: CheckerSpec | None = None
+) -> tuple[bool, str]:
+    """
+    Проверяет вывод решения на тесте; отдаёт результат и начало вывода.
+
+    Встроенные чекеры останавливают чтение на первом расхождении.
+    """
+    checker = create_checker(spec or CheckerSpec(), test.input, test.expected_output)
+    while chunk := output.read(CHUNK_SIZE):
+        if not checker.feed(chunk):
+            return False, checker.preview
+    return checker.finish(), checker.preview
+
+
+async def check_output_async(output, test, spec: CheckerSpec | None = None):
+    """check_output для вывода, который читается в event loop (AsyncFrameBody)."""
+    checker = create_checker(spec or CheckerSpec(), test.input, test.expected_output)
+    while chunk := await output.read(CHUNK_SIZE):
+        if not checker.feed(chunk):
+            return False, checker.preview
+    return await checker.finish_async(), checker.preview
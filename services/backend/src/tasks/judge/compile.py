@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .languages import Language
+from .testdata import evict_lru
+
+COMPILE_OUTPUT_TAIL = 4000
+ARTIFACT_LIMIT = 64 * 1024 * 1024
+
+
+class CompileError(Exception):
+    """Исходник не собрался; `output` — хвост вывода компилятора."""
+
+    def __init__(self, output: str):
+        super().__init__(output)
+        self.output = output[-COMPILE_OUTPUT_TAIL:]
+
+
+@dataclass(frozen=True)
+class Program:
+    """Посылка, готовая к запуску: исходник и, если язык собирается, tar build/."""
+
+    language: Language
+    source: str
+    artifact: bytes | None = None
+
+
+def source_hash(language: Language, source: str) -> str:
+    """Ключ сборки: язык, образ, команда сборки и исходник."""
+    digest = hashlib.sha256()
+    for part in (language.name, language.image or "", " ".join(language.compile)):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(source.replace("\r\n", "\n").encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_artifact(chunks: Iterable[bytes]) -> bytes:
+    artifact = bytearray()
+    for chunk in chunks:
+        append_artifact(artifact, chunk)
+    return bytes(artifact)
+
+
+def append_artifact(artifact: bytearray, chunk: bytes):
+    artifact += chunk
+    if len(artifact) > ARTIFACT_LIMIT:
+        raise CompileError("build output exceeds the artifact size limit")
+
+
+class CompileCache:
+    """
+    Собранные артефакты на локальном диске воркера, по ключу source_hash.
+
+    Запись атомарна, так что кеш делят все процессы воркера; при
+    превышении `max_bytes` удаляются самые давно использованные сборки.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        path = self.root / key
+        try:
+            os.utime(path)
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, artifact: bytes):
+        path = self.root / key
+        partial = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            partial.write_bytes(artifact)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        with self._lock:
+            evict_lru(self.root, self.max_bytes, keep=path)
+
+
+def build_program(
+    backend, cache: CompileCache | None, language: Language, source: str, memory: str
+) -> Program:
+    """
+    Собирает посылку один раз на все тесты.
+
+    Интерпретируемые языки не собираются. Повторная сборка того же
+    исходника (перепроверка, повторная отправка) берётся из кеша.
+    """
+    if not language.compiled:
+        return Program(language, source)
+    key = source_hash(language, source)
+    artifact = cache.get(key) if cache is not None else None
+    if artifact is None:
+        artifact = backend.compile(language, source, memory)
+        if cache is not None:
+            cache.put(key, artifact)
+    return Program(language, source, artifact)
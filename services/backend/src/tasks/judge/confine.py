@@ -0,0 +1,89 @@
+"""
+Запускалка с ограничениями для процессной песочницы.
+
+Запуск: python confine.py <cpu_seconds> <address_space_bytes> <file_size_bytes>
+    <forbid_fork> -- <command...>
+
+Выставляет rlimit'ы (процессорное время, адресное пространство, если
+оно не 0, размер файлов и, если forbid_fork равен 1, запрет fork; лимит
+считает и потоки, поэтому многопоточным рантаймам его не ставят), по
+возможности уводит процесс в отдельные user- и network-namespace и
+заменяет себя командой через execv. Сделано отдельным скриптом, а не
+через preexec_fn, потому что preexec_fn небезопасен в процессах с
+потоками, а судья запускает тесты из пула потоков.
+"""
+
+import ctypes
+import os
+import resource
+import sys
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+
+def command(
+    python: str,
+    cpu_seconds: int,
+    address_space: int,
+    file_size: int,
+    args: list,
+    forbid_fork: bool = True,
+) -> list:
+    """Командная строка, запускающая `args` через этот скрипт."""
+    return [
+        python,
+        os.path.abspath(__file__),
+        str(cpu_seconds),
+        str(address_space),
+        str(file_size),
+        str(int(forbid_fork)),
+        "--",
+        *args,
+    ]
+
+
+def set_limit(limit: int, value: int):
+    try:
+        resource.setrlimit(limit, (value, value))
+    except (ValueError, OSError):
+        pass
+
+
+def isolate():
+    """Отдельная сеть без интерфейсов; молча пропускается, если ядро не даёт."""
+    flags = CLONE_NEWUSER | CLONE_NEWNET
+    if hasattr(os, "unshare"):
+        try:
+            os.unshare(flags)
+        except OSError:
+            pass
+        return
+    try:
+        ctypes.CDLL(None, use_errno=True).unshare(flags)
+    except (OSError, AttributeError):
+        pass
+
+
+def main():
+    separator = sys.argv.index("--")
+    cpu_seconds, address_space, file_size, forbid_fork = map(
+        int, sys.argv[1:separator]
+    )
+    command = sys.argv[separator + 1 :]
+
+    isolate()
+    set_limit(resource.RLIMIT_CPU, cpu_seconds)
+    if address_space:
+        set_limit(resource.RLIMIT_AS, address_space)
+    set_limit(resource.RLIMIT_FSIZE, file_size)
+    set_limit(resource.RLIMIT_CORE, 0)
+    if forbid_fork:
+        # Для root ограничение на число процессов ядром не проверяется
+        set_limit(resource.RLIMIT_NPROC, 0)
+
+    os.execv(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
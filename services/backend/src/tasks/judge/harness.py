@@ -0,0 +1,249 @@
+"""
+Тестовый стенд, исполняемый внутри песочницы.
+
+Запуск: python3 harness.py <time_limit_ms> <memory_limit_bytes>
+        <address_space_bytes> <output_limit_bytes> [command...]
+
+Входные данные лежат по файлу на тест в tests/<index>.in. Стенд открывает
+их все и сразу удаляет с диска, затем для каждого теста запускает
+`command` (по умолчанию main.py в отдельном интерпретаторе), подавая файл
+прямо на stdin. Ограничение адресного пространства 0 означает, что память
+ограничивает только контейнер. Вывод решения
+пишется во временный файл, размер которого ограничен RLIMIT_FSIZE.
+
+Если стенд запущен от root (как exec в контейнере), решение исполняется
+от непривилегированного SANDBOX_UID без дополнительных групп. Иначе решение
+могло бы через /proc/<pid стенда>/fd читать входы других тестов или
+писать в stdout стенда поддельные кадры. Дескрипторы стенда, кроме
+stdin, stdout и stderr теста, закрываются перед exec. Решению выставляется
+наибольший oom_score_adj: когда у контейнера кончается память (у Go и
+Java нет RLIMIT_AS), OOM killer убивает решение, а не стенд.
+
+Результат каждого теста уходит в stdout кадром: JSON-строка с вердиктом
+(OK, RE, TLE, MLE, OLE), замерами и `output_bytes`, за которой следуют
+ровно `output_bytes` байт вывода решения. Так судья сравнивает вывод по
+мере чтения, не держа его целиком в памяти. Процесс убивается ровно по
+истечении лимита времени. Модуль не должен зависеть ни от чего, кроме
+стандартной библиотеки, и должен работать на Python 3.9: он копируется в
+образ песочницы как есть.
+"""
+
+import json
+import math
+import os
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, List, Optional
+
+TESTS_DIR = "tests"
+CODE_FILE = "main.py"
+STDERR_TAIL = 1000
+CHUNK_SIZE = 64 * 1024
+# nobody: есть почти в любом образе, а число годится и без записи в passwd
+SANDBOX_UID = 65534
+SANDBOX_GID = 65534
+OOM_SCORE_ADJ = 1000
+
+
+def input_file(index: int) -> str:
+    return f"{TESTS_DIR}/{index}.in"
+
+
+def tail(file: BinaryIO, size: int) -> bytes:
+    file.seek(0, os.SEEK_END)
+    file.seek(max(0, file.tell() - size))
+    return file.read()
+
+
+def prefer_oom_kill(pid: int):
+    """
+    Делает процесс первой жертвой OOM killer'а. Поднять oom_score_adj
+    можно без привилегий, поэтому неудача (нет /proc) не страшна.
+    """
+    try:
+        with open(f"/proc/{pid}/oom_score_adj", "w") as file:
+            file.write(str(OOM_SCORE_ADJ))
+    except OSError:
+        pass
+
+
+def limit_resources(
+    time_limit: float, address_space: int, output_limit: int
+) -> Callable[[], None]:
+    """rlimit'ы для дочернего процесса; CPU-лимит лишь страхует таймер."""
+
+    def apply():
+        cpu = math.ceil(time_limit) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+        if address_space:
+            resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_limit, output_limit))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    return apply
+
+
+def classify(
+    exit_code: int,
+    timed_out: bool,
+    cpu_time: float,
+    time_limit: float,
+    memory_kb: int,
+    memory: int,
+    output_bytes: int,
+    output_limit: int,
+    stderr: bytes,
+) -> str:
+    if timed_out or cpu_time > time_limit or exit_code == -signal.SIGXCPU:
+        return "TLE"
+    # Python игнорирует SIGXFSZ и падает с EFBIG, поэтому смотрим и на размер
+    if output_bytes >= output_limit or exit_code == -signal.SIGXFSZ:
+        return "OLE"
+    if memory_kb * 1024 >= memory or b"MemoryError" in stderr:
+        return "MLE"
+    if exit_code == -signal.SIGKILL:
+        # SIGKILL не от нас — это OOM killer контейнера
+        return "MLE"
+    if exit_code != 0:
+        return "RE"
+    return "OK"
+
+
+def run_test(
+    index: int,
+    stdin: BinaryIO,
+    stdout: BinaryIO,
+    time_limit: float,
+    memory: int,
+    output_limit: int,
+    command: Optional[List[str]] = None,
+    preexec_fn: Optional[Callable[[], None]] = None,
+    **kwargs,
+) -> dict:
+    """
+    Запускает один тест и меряет его через wait4.
+
+    Вход читается из `stdin`, вывод пишется в `stdout` — оба должны быть
+    настоящими файлами. `command`, `preexec_fn` и `kwargs` переопределяются
+    процессной песочницей, которая выставляет ограничения сама; `kwargs`
+    уходят в Popen (например, `user` и `group` для смены пользователя).
+    """
+    with tempfile.TemporaryFile() as stderr:
+        started = time.monotonic()
+        process = subprocess.Popen(
+            command or [sys.executable, CODE_FILE],
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            preexec_fn=preexec_fn,
+            start_new_session=True,
+            close_fds=True,
+            **kwargs,
+        )
+        prefer_oom_kill(process.pid)
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        timer = threading.Timer(time_limit, kill)
+        timer.start()
+        _, status, usage = os.wait4(process.pid, 0)
+        wall_time = time.monotonic() - started
+        timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        errors = tail(stderr, STDERR_TAIL)
+
+    output_bytes = os.fstat(stdout.fileno()).st_size
+    cpu_time = usage.ru_utime + usage.ru_stime
+    return {
+        "index": index,
+        "status": classify(
+            exit_code=process.returncode,
+            timed_out=timed_out.is_set(),
+            cpu_time=cpu_time,
+            time_limit=time_limit,
+            memory_kb=usage.ru_maxrss,
+            memory=memory,
+            output_bytes=output_bytes,
+            output_limit=output_limit,
+            stderr=errors,
+        ),
+        "exit_code": process.returncode,
+        "output_bytes": output_bytes,
+        "stderr": errors.decode("utf-8", errors="replace"),
+        "time_ms": int(wall_time * 1000),
+        "cpu_ms": int(cpu_time * 1000),
+        "memory_kb": usage.ru_maxrss,
+    }
+
+
+def open_inputs() -> List[BinaryIO]:
+    """
+    Открывает входы всех тестов и удаляет их с диска.
+
+    Открытые дескрипторы остаются у стенда, а решение, работающее в той же
+    директории, не видит входов других тестов.
+    """
+    count = len(os.listdir(TESTS_DIR))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < count + 64:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    inputs = []
+    for index in range(count):
+        inputs.append(open(input_file(index), "rb"))
+        os.remove(input_file(index))
+    os.rmdir(TESTS_DIR)
+    return inputs
+
+
+def write_frame(out: BinaryIO, verdict: dict, output: BinaryIO):
+    out.write(json.dumps(verdict).encode("utf-8") + b"\n")
+    output.seek(0)
+    shutil.copyfileobj(output, out, CHUNK_SIZE)
+    out.flush()
+
+
+def sandbox_user() -> dict:
+    """Аргументы Popen, отбирающие у решения права root, если они есть у стенда."""
+    if os.geteuid() != 0:
+        return {}
+    return {"user": SANDBOX_UID, "group": SANDBOX_GID, "extra_groups": []}
+
+
+def main():
+    time_limit = int(sys.argv[1]) / 1000
+    memory, address_space, output_limit = map(int, sys.argv[2:5])
+    command = sys.argv[5:] or None
+    out = sys.stdout.buffer
+    user = sandbox_user()
+
+    for index, stdin in enumerate(open_inputs()):
+        with stdin, tempfile.TemporaryFile() as stdout:
+            verdict = run_test(
+                index,
+                stdin,
+                stdout,
+                time_limit,
+                memory,
+                output_limit,
+                command=command,
+                preexec_fn=limit_resources(time_limit, address_space, output_limit),
+                **user,
+            )
+            write_frame(out, verdict, stdout)
+
+
+if __name__ == "__main__":
+    main()
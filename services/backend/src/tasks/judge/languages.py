@@ -0,0 +1,152 @@
+"""
+Реестр языков судьи.
+
+Язык описывает образ песочницы, имя файла с исходником, команду сборки и
+команду запуска. Сборка кладёт всё нужное для запуска в каталог build/,
+который судья упаковывает и переиспользует на всех тестах посылки.
+
+Стенд (harness.py) запускается в том же контейнере, поэтому в образе
+должен быть python3 не ниже 3.9. Образы по умолчанию это учитывают:
+полные python-образы содержат gcc и g++, golang-образы — python3. Для
+Java такого официального образа нет, поэтому у неё образа по умолчанию
+нет вовсе: язык доступен в docker-бэкендах, только если его образ задан
+в `judge.images` (например, собранный поверх eclipse-temurin с python3).
+`judge.images` позволяет подменить образ и любого другого языка.
+"""
+
+from dataclasses import dataclass, field, replace
+
+from core.judge_config import JudgeConfig
+
+BUILD_DIR = "build"
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    title: str
+    # None — образа по умолчанию нет, его нужно задать в judge.images
+    image: str | None
+    source_file: str
+    run: tuple[str, ...]
+    compile: tuple[str, ...] = ()
+    env: dict[str, str] = field(default_factory=dict)
+    compile_timeout: int = 30
+    # JVM и рантайм Go резервируют адресное пространство с запасом, поэтому
+    # для них память ограничивается только контейнером
+    limit_address_space: bool = True
+    # Запрет fork через RLIMIT_NPROC в процессной песочнице. Лимит считает
+    # и потоки, а JVM и рантайм Go без потоков не запускаются
+    forbid_fork: bool = True
+
+    @property
+    def compiled(self) -> bool:
+        return bool(self.compile)
+
+
+LANGUAGES: dict[str, Language] = {
+    language.name: language
+    for language in (
+        Language(
+            name="python3.9",
+            title="Python 3.9",
+            image="python:3.9-slim",
+            source_file="main.py",
+            run=("python3", "main.py"),
+        ),
+        Language(
+            name="python3.11",
+            title="Python 3.11",
+            image="python:3.11-slim",
+            source_file="main.py",
+            run=("python3", "main.py"),
+        ),
+        Language(
+            name="python3.12",
+            title="Python 3.12",
+            image="python:3.12-slim",
+            source_file="main.py",
+            run=("python3", "main.py"),
+        ),
+        Language(
+            name="c11",
+            title="C11 (GCC)",
+            image="python:3.12-bookworm",
+            source_file="main.c",
+            compile=("gcc", "-O2", "-std=c11", "-o", "build/main", "main.c", "-lm"),
+            run=("./build/main",),
+        ),
+        Language(
+            name="cpp17",
+            title="C++17 (G++)",
+            image="python:3.12-bookworm",
+            source_file="main.cpp",
+            compile=("g++", "-O2", "-std=c++17", "-o", "build/main", "main.cpp"),
+            run=("./build/main",),
+        ),
+        Language(
+            name="java17",
+            title="Java 17",
+            image=None,
+            source_file="Main.java",
+            compile=("javac", "-encoding", "UTF-8", "-d", "build", "Main.java"),
+            run=("java", "-Xss64m", "-XX:+UseSerialGC", "-cp", "build", "Main"),
+            limit_address_space=False,
+            forbid_fork=False,
+        ),
+        Language(
+            name="go1.22",
+            title="Go 1.22",
+            image="golang:1.22-bookworm",
+            source_file="main.go",
+            compile=("go", "build", "-o", "build/main", "main.go"),
+            run=("./build/main",),
+            env={
+                "HOME": "/tmp",
+                "GOCACHE": "/tmp/go-build",
+                "GOPATH": "/tmp/go",
+                "CGO_ENABLED": "0",
+                "GO111MODULE": "off",
+            },
+            compile_timeout=60,
+            limit_address_space=False,
+            forbid_fork=False,
+        ),
+    )
+}
+
+
+def get_language(name: str, config: JudgeConfig | None = None) -> Language:
+    """
+    Язык из реестра с учётом подмены образа в `judge.images`.
+
+    С настройками `config` язык, недоступный судье (см. `is_available`),
+    считается неизвестным.
+    """
+    try:
+        language = LANGUAGES[name]
+    except KeyError:
+        raise ValueError(f"Unknown language: {name}")
+    if config is None:
+        return language
+    if name in config.images:
+        language = replace(language, image=config.images[name])
+    if not is_available(language, config):
+        raise ValueError(f"Language {name} has no sandbox image in judge.images")
+    return language
+
+
+def is_available(language: Language, config: JudgeConfig) -> bool:
+    """Процессной песочнице образ не нужен, остальным — обязателен."""
+    return language.image is not None or config.backend == "process"
+
+
+def available_languages(config: JudgeConfig) -> list[Language]:
+    """Языки, которые судья может проверить с этими настройками, в порядке реестра."""
+    languages = []
+    for name in LANGUAGES:
+        try:
+            languages.append(get_language(name, config))
+        except ValueError:
+            continue
+    return languages
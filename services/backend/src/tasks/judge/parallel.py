@@ -0,0 +1,155 @@
+import asyncio
+import fcntl
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable
+
+CANCELLED = {"success": False, "error": "Cancelled"}
+
+RunChunk = Callable[[list, threading.Event], dict]
+
+
+class HostSlots:
+    """
+    Семафор на `size` песочниц, общий для всех процессов хоста.
+
+    Слот — файл в каталоге `root`, занятый через flock. Процессы
+    prefork-воркера (и воркеры в соседних контейнерах, если каталог
+    смонтирован в них) делят каталог, поэтому лимит действует на весь
+    хост, а не на процесс. Замок умершего процесса снимает ядро, так что
+    слоты не утекают. Каталог создаётся при первом захвате: импорт из API
+    его не требует. `acquire_async` ждёт слот внутри event loop
+    асинхронного бэкенда.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, root: str, size: int):
+        self.root = Path(root)
+        self.size = size
+        # Занятые потоком слоты: with может вкладываться в разных потоках
+        self._held = threading.local()
+
+    def acquire(self) -> int:
+        while (fd := self._try_acquire()) is None:
+            time.sleep(self.POLL_INTERVAL)
+        return fd
+
+    async def acquire_async(self) -> int:
+        while (fd := self._try_acquire()) is None:
+            await asyncio.sleep(self.POLL_INTERVAL)
+        return fd
+
+    def _try_acquire(self) -> int | None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Со случайного слота, чтобы процессы не толкались на первом
+        start = random.randrange(self.size)
+        for offset in range(self.size):
+            fd = self._try_lock((start + offset) % self.size)
+            if fd is not None:
+                return fd
+        return None
+
+    def _try_lock(self, slot: int) -> int | None:
+        fd = os.open(self.root / f"{slot}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    @staticmethod
+    def release(fd: int):
+        # Закрытие последнего дескриптора снимает flock
+        os.close(fd)
+
+    def __enter__(self):
+        held = self._held.__dict__.setdefault("fds", [])
+        held.append(self.acquire())
+        return self
+
+    def __exit__(self, *exc):
+        self.release(self._held.fds.pop())
+
+
+def split_tests(test_case: list, parts: int) -> list[list]:
+    """Делит тесты на не более чем `parts` непрерывных кусков почти равного размера."""
+    parts = max(1, min(parts, len(test_case)))
+    size, extra = divmod(len(test_case), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(test_case[start:end])
+        start = end
+    return chunks
+
+
+def run_in_parallel(run_chunk: RunChunk, test_case: list, parallel: int) -> dict:
+    """
+    Раздаёт куски тестов по параллельным песочницам.
+
+    Куски непрерывны и упорядочены, поэтому результатом остаётся первое по
+    порядку тестов падение, как и при последовательном прогоне. Как только
+    падает кусок, все куски после него отменяются: им выставляется событие,
+    которое `run_chunk` проверяет между тестами.
+    """
+    chunks = split_tests(test_case, parallel)
+    offsets = [0]
+    for chunk in chunks[:-1]:
+        offsets.append(offsets[-1] + len(chunk))
+    if len(chunks) <= 1:
+        return run_chunk(test_case, threading.Event())
+
+    events = [threading.Event() for _ in chunks]
+    results: list[dict | None] = [None] * len(chunks)
+    executor = ThreadPoolExecutor(
+        max_workers=len(chunks), thread_name_prefix="judge-chunk"
+    )
+    try:
+        pending = {
+            executor.submit(run_chunk, chunk, event): index
+            for index, (chunk, event) in enumerate(zip(chunks, events))
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                results[index] = future.result()
+                if not results[index]["success"]:
+                    for later in range(index + 1, len(chunks)):
+                        events[later].set()
+            for future, index in list(pending.items()):
+                if events[index].is_set() and future.cancel():
+                    results[index] = CANCELLED
+                    del pending[future]
+
+            # Ответ известен, когда все куски до первого упавшего завершились
+            for index, result in enumerate(results):
+                if result is None:
+                    break
+                if not result["success"]:
+                    return merge_results(results[: index + 1], offsets[index])
+    finally:
+        for event in events:
+            event.set()
+        # Не ждём отменённые куски: они сами вернут песочницы в пул
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return merge_results(results, 0)
+
+
+def merge_results(results: list[dict], offset: int) -> dict:
+    """
+    Склеивает результаты кусков: последний определяет итог, замеры тестов
+    идут подряд, а номер упавшего теста переводится в сквозную нумерацию.
+    """
+    merged = dict(results[-1])
+    merged["tests"] = [test for result in results for test in result.get("tests", [])]
+    if "failed_test" in merged:
+        merged["failed_test"] += offset
+    return merged
@@ -0,0 +1,189 @@
+import io
+import logging
+import mmap
+import tarfile
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import docker
+from docker.models.containers import Container
+
+log = logging.getLogger(__name__)
+
+SANDBOX_DIR = "/sandbox"
+POOL_LABEL = "riddleflow.judge.pool"
+# Архивы крупнее уходят на диск, а не копятся в памяти воркера
+SPOOL_SIZE = 1024 * 1024
+
+
+def build_archive(
+    files: dict[str, bytes | mmap.mmap],
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Собирает tar для put_archive во временном файле, перемотанном в начало.
+
+    Данные могут быть отображёнными в память файлами: они читаются прямо
+    из mmap, без копии в памяти.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name=name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            if isinstance(data, mmap.mmap):
+                data.seek(0)
+                tar.addfile(info, data)
+            else:
+                tar.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def put_files(
+    container: Container, files: dict[str, bytes | mmap.mmap], path: str = SANDBOX_DIR
+):
+    """Копирует файлы в контейнер одним tar-архивом, передаваемым потоком."""
+    with build_archive(files) as archive:
+        container.put_archive(path, archive)
+
+
+class ContainerPool:
+    """
+    Пул прогретых контейнеров-песочниц, сгруппированных по (image, memory_limit).
+
+    Контейнер запускается без сети с `sleep infinity` в качестве PID 1,
+    пользовательский код исполняется через `exec`. После каждой аренды
+    контейнер сбрасывается (убиваются все процессы, очищается рабочая
+    директория) и возвращается в пул. Простаивающие дольше `idle_ttl`
+    секунд контейнеры удаляются фоновым потоком.
+    """
+
+    def __init__(
+        self,
+        client: docker.DockerClient,
+        size: int = 4,
+        idle_ttl: int = 300,
+    ):
+        self.client = client
+        self.size = size
+        self.idle_ttl = idle_ttl
+        self._idle: dict[tuple[str, str], deque[tuple[Container, float]]] = (
+            defaultdict(deque)
+        )
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reaper = threading.Thread(
+            target=self._reap_loop,
+            name="judge-pool-reaper",
+            daemon=True,
+        )
+        self._reaper.start()
+
+    @contextmanager
+    def lease(self, image: str, memory: str):
+        """Выдаёт контейнер из пула; при исключении контейнер уничтожается."""
+        container = self._acquire(image, memory)
+        healthy = False
+        try:
+            yield container
+            healthy = True
+        finally:
+            self._release(image, memory, container, healthy)
+
+    def warmup(self, image: str, memory: str, count: int | None = None):
+        count = self.size if count is None else min(count, self.size)
+        key = (image, memory)
+        while True:
+            with self._lock:
+                if len(self._idle[key]) >= count:
+                    return
+            container = self._start(image, memory)
+            with self._lock:
+                self._idle[key].append((container, time.monotonic()))
+
+    def evict_idle(self):
+        deadline = time.monotonic() - self.idle_ttl
+        expired = []
+        with self._lock:
+            for idle in self._idle.values():
+                while idle and idle[0][1] < deadline:
+                    expired.append(idle.popleft()[0])
+        for container in expired:
+            self._remove(container)
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            containers = [c for idle in self._idle.values() for c, _ in idle]
+            self._idle.clear()
+        for container in containers:
+            self._remove(container)
+
+    def _start(self, image: str, memory: str) -> Container:
+        return self.client.containers.run(
+            image=image,
+            command=["sleep", "infinity"],
+            mem_limit=memory,
+            memswap_limit=memory,
+            network_mode="none",
+            working_dir=SANDBOX_DIR,
+            labels={POOL_LABEL: "1"},
+            detach=True,
+        )
+
+    def _acquire(self, image: str, memory: str) -> Container:
+        key = (image, memory)
+        while True:
+            with self._lock:
+                # Берём самый свежий контейнер, старые остаются на выселение
+                container = self._idle[key].pop()[0] if self._idle[key] else None
+            if container is None:
+                return self._start(image, memory)
+            try:
+                container.reload()
+                if container.status == "running":
+                    return container
+            except docker.errors.APIError:
+                pass
+            self._remove(container)
+
+    def _release(self, image: str, memory: str, container: Container, healthy: bool):
+        if healthy and not self._closed.is_set() and self._reset(container):
+            with self._lock:
+                idle = self._idle[(image, memory)]
+                if len(idle) < self.size:
+                    idle.append((container, time.monotonic()))
+                    return
+        self._remove(container)
+
+    @staticmethod
+    def _reset(container: Container) -> bool:
+        try:
+            # Флаг OOMKilled не сбрасывается: такой контейнер дальше не
+            # отличить от нового срабатывания OOM killer'а
+            container.reload()
+            if container.attrs["State"].get("OOMKilled"):
+                return False
+            result = container.exec_run(
+                ["sh", "-c", f"kill -9 -1; rm -rf {SANDBOX_DIR}/* /tmp/*"],
+            )
+        except docker.errors.APIError as e:
+            log.warning("Не удалось сбросить контейнер %s: %s", container.id, e)
+            return False
+        return result.exit_code == 0
+
+    @staticmethod
+    def _remove(container: Container):
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logging.error(f"Ошибка при удалении контейнера: {e}")
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_ttl, 30))
+        while not self._closed.wait(interval):
+            self.evict_idle()
@@ -0,0 +1,98 @@
+import threading
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import replace
+from functools import partial
+
+import docker
+
+from .backends import SandboxBackend
+from .batch import compilation_error
+from .checkers import CheckerError, CheckerSpec
+from .compile import CompileCache, CompileError, Program, build_program
+from .languages import Language
+from .parallel import CANCELLED, run_in_parallel
+
+
+def execution_error(e: Exception) -> dict:
+    return {
+        "success": False,
+        "output": str(e),
+        "exit_code": 1,
+        "error": "Execution error",
+    }
+
+
+def run_chunk(
+    backend: SandboxBackend,
+    slots: AbstractContextManager | None,
+    program: Program,
+    timeout: int,
+    memory: str,
+    test_case: list,
+    cancelled: threading.Event,
+    checker: CheckerSpec | None = None,
+):
+    """Прогоняет кусок тестов в одной песочнице бэкенда."""
+    try:
+        # Общий лимит песочниц: одна посылка не займёт весь воркер
+        with slots or nullcontext():
+            if cancelled.is_set():
+                return CANCELLED
+            return backend.run(program, timeout, memory, test_case, cancelled, checker)
+    except docker.errors.ContainerError as e:
+        return {
+            "success": False,
+            "output": e.stderr.decode().strip() if e.stderr else str(e),
+            "exit_code": 1,
+            "error": "Container error",
+        }
+    except CheckerError as e:
+        return {
+            "success": False,
+            "output": str(e),
+            "exit_code": 1,
+            "error": "Checker error",
+        }
+    except Exception as e:
+        return execution_error(e)
+
+
+def judge_code(
+    backend: SandboxBackend,
+    compile_cache: CompileCache | None,
+    language: Language,
+    code: str,
+    timeout: int,
+    memory: str,
+    test_case: list,
+    checker: CheckerSpec | None = None,
+    parallel: int = 4,
+    slots: AbstractContextManager | None = None,
+) -> dict:
+    """
+    Собирает посылку и раздаёт её тесты по не более чем `parallel`
+    песочницам `backend`; `slots` (семафор или HostSlots) ограничивает
+    число одновременно занятых песочниц на процесс или на весь хост, если
+    бэкенд не ограничивает их сам.
+
+    Это весь путь проверки без базы и очередей: им пользуются и
+    run_code_safely воркера, и бенчмарк судьи.
+    """
+    if checker is not None:
+        # Чекер автора исполняется в песочнице того же бэкенда
+        checker = replace(checker, sandbox=backend)
+    if backend.limits_sandboxes:
+        slots = None
+    try:
+        with slots or nullcontext():
+            program = build_program(backend, compile_cache, language, code, memory)
+    except CompileError as e:
+        return compilation_error(e)
+    except Exception as e:
+        return execution_error(e)
+
+    return run_in_parallel(
+        partial(run_chunk, backend, slots, program, timeout, memory, checker=checker),
+        test_case,
+        parallel=parallel,
+    )
@@ -0,0 +1,147 @@
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from .harness import CHUNK_SIZE
+
+
+class ChunkBuffer:
+    """Накопленные, но ещё не прочитанные байты потока кусков."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def _has_line(self) -> bool:
+        return b"\n" in self._buffer
+
+    def _take_line(self) -> bytes:
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        return self._take(end)
+
+    def _take(self, size: int) -> bytes:
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class ChunkReader(ChunkBuffer):
+    """Файлоподобное чтение поверх потока кусков (stdout exec'а докера)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        super().__init__()
+        self._chunks = iter(chunks)
+
+    def _fill(self) -> bool:
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    def readline(self) -> bytes:
+        while not self._has_line() and self._fill():
+            pass
+        return self._take_line()
+
+    def read(self, size: int) -> bytes:
+        """Отдаёт то, что уже пришло, но не больше `size` байт."""
+        if not self._buffer:
+            self._fill()
+        return self._take(size)
+
+
+class AsyncChunkReader(ChunkBuffer):
+    """ChunkReader поверх асинхронного потока кусков."""
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        super().__init__()
+        self._chunks = aiter(chunks)
+
+    async def _fill(self) -> bool:
+        async for chunk in self._chunks:
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    async def readline(self) -> bytes:
+        while not self._has_line() and await self._fill():
+            pass
+        return self._take_line()
+
+    async def read(self, size: int) -> bytes:
+        if not self._buffer:
+            await self._fill()
+        return self._take(size)
+
+
+class FrameBody:
+    """Вывод решения внутри кадра стенда: ровно `size` байт из потока."""
+
+    def __init__(self, reader: ChunkReader, size: int):
+        self._reader = reader
+        self._remaining = size
+
+    def read(self, size: int = CHUNK_SIZE) -> bytes:
+        data = self._reader.read(min(size, self._remaining)) if self._remaining else b""
+        self._remaining -= len(data)
+        return data
+
+    def drain(self):
+        while self.read():
+            pass
+
+
+class AsyncFrameBody:
+    """FrameBody для AsyncChunkReader."""
+
+    def __init__(self, reader: AsyncChunkReader, size: int):
+        self._reader = reader
+        self._remaining = size
+
+    async def read(self, size: int = CHUNK_SIZE) -> bytes:
+        if not self._remaining:
+            return b""
+        data = await self._reader.read(min(size, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    async def drain(self):
+        while await self.read():
+            pass
+
+
+def parse_header(header: bytes) -> dict | None:
+    """Вердикт из заголовка кадра; None для пустой строки между кадрами."""
+    if not header.strip():
+        return None
+    return json.loads(header)
+
+
+def iter_frames(chunks: Iterable[bytes]) -> Iterator[tuple[dict, FrameBody]]:
+    """
+    Разбирает stdout стенда на кадры (вердикт, вывод решения).
+
+    Непрочитанный потребителем вывод пропускается перед следующим кадром.
+    """
+    reader = ChunkReader(chunks)
+    while header := reader.readline():
+        verdict = parse_header(header)
+        if verdict is None:
+            continue
+        body = FrameBody(reader, verdict["output_bytes"])
+        yield verdict, body
+        body.drain()
+
+
+async def aiter_frames(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[dict, AsyncFrameBody]]:
+    """iter_frames для потока, читаемого в event loop."""
+    reader = AsyncChunkReader(chunks)
+    while header := await reader.readline():
+        verdict = parse_header(header)
+        if verdict is None:
+            continue
+        body = AsyncFrameBody(reader, verdict["output_bytes"])
+        yield verdict, body
+        await body.drain()
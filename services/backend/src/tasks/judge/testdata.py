@@ -0,0 +1,140 @@
+import hashlib
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+BLOB_PREFIX = "tests/"
+HASH_CHUNK = 1024 * 1024
+
+Buffer = bytes | mmap.mmap
+
+
+def blob_key(digest: str) -> str:
+    """Ключ объекта в S3: данные теста адресуются хешем содержимого."""
+    return f"{BLOB_PREFIX}{digest}"
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_input(test_input: str) -> bytes:
+    """Вход в том виде, в каком он подаётся на stdin решению."""
+    return f"{test_input.strip()}\n".encode("utf-8")
+
+
+@dataclass
+class JudgeTest:
+    """
+    Тест в виде, в котором его видит судья.
+
+    `input` уже нормализован для stdin; оба поля — байты из строки таблицы
+    test_cases или отображённый в память файл из BlobCache.
+    """
+
+    id: int
+    input: Buffer
+    expected_output: Buffer
+
+
+def preview(data: Buffer, size: int = 1000) -> str:
+    return bytes(data[:size]).decode("utf-8", errors="replace")
+
+
+class BlobCache:
+    """
+    Локальный кеш данных тестов на диске воркера.
+
+    Файлы лежат под именем своего sha256 и читаются через mmap, так что
+    мегабайтные тесты не копируются в память процесса. При промахе файл
+    скачивается функцией `fetch(key, path)` во временный файл, проверяется
+    по хешу и атомарно переименовывается, поэтому кеш можно делить между
+    процессами воркера. Чтение обновляет mtime, и при превышении
+    `max_bytes` удаляются самые давно читанные файлы. Удаление не мешает
+    тем, кто файл уже открыл.
+    """
+
+    def __init__(
+        self, root: str, max_bytes: int, fetch: Callable[[str, str], None]
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self._lock = threading.Lock()
+
+    def open(self, digest: str) -> Buffer:
+        path = self.root / digest
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._download(digest, path)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _download(self, digest: str, path: Path):
+        partial = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            self.fetch(blob_key(digest), str(partial))
+            if file_digest(partial) != digest:
+                raise ValueError(f"test blob {digest} is corrupted")
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        self.evict(keep=path)
+
+    def evict(self, keep: Path | None = None):
+        with self._lock:
+            evict_lru(self.root, self.max_bytes, keep)
+
+
+def evict_lru(root: Path, max_bytes: int, keep: Path | None = None):
+    """Удаляет самые давно читанные файлы каталога, пока он больше `max_bytes`."""
+    files = []
+    for entry in os.scandir(root):
+        if entry.name.endswith(".part") or not entry.is_file():
+            continue
+        stat = entry.stat()
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, file in sorted(files):
+        if total <= max_bytes:
+            break
+        if keep is not None and file == str(keep):
+            continue
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_test(row, cache: BlobCache | None) -> JudgeTest:
+    """
+    Собирает JudgeTest из строки test_cases.
+
+    Небольшие тесты хранятся прямо в строке, крупные — только хешем, а
+    данные берутся из кеша (и при необходимости из S3).
+    """
+    if row.input_hash is not None:
+        test_input = cache.open(row.input_hash)
+    else:
+        test_input = normalize_input(row.input)
+    if row.output_hash is not None:
+        expected_output = cache.open(row.output_hash)
+    else:
+        expected_output = row.expected_output.encode("utf-8")
+    return JudgeTest(id=row.id, input=test_input, expected_output=expected_output)
@@ -0,0 +1,125 @@
+import statistics
+import time
+from urllib.parse import urlparse
+
+import redis
+from celery import Celery
+from kombu import Queue
+
+from core.config import redis_client, settings
+
+# Порядок важен: при queue_order_strategy=priority воркер опрашивает
+# очереди именно в нём, так что проверки идущих контестов всегда первые.
+CONTEST_QUEUE = "judge.contest"
+OVERFLOW_QUEUE = "judge.overflow"
+REJUDGE_QUEUE = "judge.rejudge"
+BACKGROUND_QUEUE = "background"
+QUEUES = (CONTEST_QUEUE, OVERFLOW_QUEUE, REJUDGE_QUEUE, BACKGROUND_QUEUE)
+
+PENDING_KEY = "judge:pending:{user_id}"
+PENDING_TTL = 3600
+WAIT_KEY = "judge:wait:{queue}"
+WAIT_SAMPLES = 1000
+# Опции Redis-транспорта kombu (priority_steps и sep) задаются явно: по ним
+# же queue_depth строит имена списков, в которых лежит очередь
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_SEP = "\x06\x16"
+REDIS_SCHEMES = ("redis", "rediss")
+
+
+def configure_queues(app: Celery):
+    app.conf.task_queues = [Queue(name) for name in QUEUES]
+    app.conf.task_default_queue = BACKGROUND_QUEUE
+    app.conf.broker_transport_options = {
+        "queue_order_strategy": "priority",
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+    }
+    # Иначе воркер заранее разберёт фоновые задачи и придержит их у себя
+    app.conf.worker_prefetch_multiplier = 1
+
+
+def claim_judge_slot(user_id: int) -> str:
+    """
+    Выбирает очередь для новой посылки пользователя.
+
+    Пока у пользователя меньше `judge.fair_share` непроверенных посылок,
+    они идут в общую очередь контестов; всё сверх этого уходит в
+    overflow, которую воркер берёт только когда общая пуста. Так один
+    участник, заваливающий судью посылками, ждёт сам, а не задерживает
+    вердикты остальным.
+    """
+    key = PENDING_KEY.format(user_id=user_id)
+    pending = redis_client.incr(key)
+    redis_client.expire(key, PENDING_TTL)
+    return CONTEST_QUEUE if pending <= settings.judge.fair_share else OVERFLOW_QUEUE
+
+
+def release_judge_slot(user_id: int):
+    key = PENDING_KEY.format(user_id=user_id)
+    if redis_client.decr(key) <= 0:
+        redis_client.delete(key)
+
+
+def record_wait(queue: str, enqueued_at: float):
+    key = WAIT_KEY.format(queue=queue)
+    wait_ms = max(0, int((time.time() - enqueued_at) * 1000))
+    pipe = redis_client.pipeline()
+    pipe.lpush(key, wait_ms)
+    pipe.ltrim(key, 0, WAIT_SAMPLES - 1)
+    pipe.execute()
+
+
+def queue_keys(queue: str) -> list[str]:
+    """Списки Redis, в которых kombu держит очередь: по одному на шаг приоритета."""
+    return [
+        f"{queue}{PRIORITY_SEP}{priority}" if priority else queue
+        for priority in PRIORITY_STEPS
+    ]
+
+
+def queue_depth(broker: redis.Redis, queue: str) -> int:
+    """
+    Число задач в очереди Redis-брокера.
+
+    Пустой список в Redis просто не существует, поэтому длины читаются
+    напрямую, а не через passive queue_declare (тот падает на пустой
+    очереди).
+    """
+    pipe = broker.pipeline()
+    for key in queue_keys(queue):
+        pipe.llen(key)
+    return sum(pipe.execute())
+
+
+def queue_stats(app: Celery) -> list[dict]:
+    """
+    Глубина каждой очереди и время ожидания по последним WAIT_SAMPLES
+    задачам. Глубина известна только для Redis-брокера, для остальных она
+    None.
+    """
+    broker_url = app.conf.broker_url
+    broker = None
+    if urlparse(broker_url).scheme in REDIS_SCHEMES:
+        broker = redis.Redis.from_url(broker_url)
+    stats = []
+    try:
+        for queue in QUEUES:
+            waits = sorted(
+                int(wait)
+                for wait in redis_client.lrange(WAIT_KEY.format(queue=queue), 0, -1)
+            )
+            stats.append(
+                {
+                    "queue": queue,
+                    "depth": queue_depth(broker, queue) if broker else None,
+                    "wait_samples": len(waits),
+                    "wait_ms_avg": int(statistics.fmean(waits)) if waits else None,
+                    "wait_ms_p95": waits[int(len(waits) * 0.95)] if waits else None,
+                    "wait_ms_max": waits[-1] if waits else None,
+                }
+            )
+    finally:
+        if broker is not None:
+            broker.close()
+    return stats
@@ -0,0 +1,108 @@
+import json
+import uuid
+
+from core.config import redis_client
+
+REJUDGE_KEY = "rejudge:{rejudge_id}"
+PENDING_KEY = "rejudge:{rejudge_id}:pending"
+REJUDGE_TTL = 24 * 3600
+
+PLANNING = "PLANNING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+# RUNNING -> DONE, когда проверены все посылки. Одним скриптом, чтобы
+# дорожки и конец планирования не затирали состояние друг друга
+COMPLETE_SCRIPT = """
+local state, total, done = unpack(
+    redis.call('HMGET', KEYS[1], 'state', 'total', 'done')
+)
+if state == ARGV[1] and tonumber(done) >= tonumber(total) then
+    redis.call('HSET', KEYS[1], 'state', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def start_rejudge(scope: dict) -> str:
+    """Заводит прогресс перепроверки в Redis и возвращает её id."""
+    rejudge_id = uuid.uuid4().hex
+    key = REJUDGE_KEY.format(rejudge_id=rejudge_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(
+        key,
+        mapping={
+            "state": PLANNING,
+            "scope": json.dumps(scope),
+            "total": 0,
+            "done": 0,
+            "changed": 0,
+        },
+    )
+    pipe.expire(key, REJUDGE_TTL)
+    pipe.execute()
+    return rejudge_id
+
+
+def push_batch(rejudge_id: str, submission_ids: list[int]):
+    key = REJUDGE_KEY.format(rejudge_id=rejudge_id)
+    pending = PENDING_KEY.format(rejudge_id=rejudge_id)
+    pipe = redis_client.pipeline()
+    pipe.rpush(pending, *submission_ids)
+    pipe.hincrby(key, "total", len(submission_ids))
+    pipe.expire(pending, REJUDGE_TTL)
+    pipe.execute()
+
+
+def finish_planning(rejudge_id: str):
+    key = REJUDGE_KEY.format(rejudge_id=rejudge_id)
+    redis_client.hset(key, "state", RUNNING)
+    _complete_if_drained(key)
+
+
+def fail_planning(rejudge_id: str, error: str):
+    """Планирование упало: дорожки останавливаются, очередь выбрасывается."""
+    key = REJUDGE_KEY.format(rejudge_id=rejudge_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={"state": FAILED, "error": error})
+    pipe.delete(PENDING_KEY.format(rejudge_id=rejudge_id))
+    pipe.execute()
+
+
+def get_state(rejudge_id: str) -> str | None:
+    return redis_client.hget(REJUDGE_KEY.format(rejudge_id=rejudge_id), "state")
+
+
+def next_submission(rejudge_id: str) -> int | None:
+    submission_id = redis_client.lpop(PENDING_KEY.format(rejudge_id=rejudge_id))
+    return int(submission_id) if submission_id is not None else None
+
+
+def mark_done(rejudge_id: str, changed: bool):
+    key = REJUDGE_KEY.format(rejudge_id=rejudge_id)
+    pipe = redis_client.pipeline()
+    pipe.hincrby(key, "done", 1)
+    pipe.hincrby(key, "changed", int(changed))
+    pipe.execute()
+    _complete_if_drained(key)
+
+
+def _complete_if_drained(key: str):
+    redis_client.eval(COMPLETE_SCRIPT, 1, key, RUNNING, DONE)
+
+
+def get_progress(rejudge_id: str) -> dict | None:
+    progress = redis_client.hgetall(REJUDGE_KEY.format(rejudge_id=rejudge_id))
+    if not progress:
+        return None
+    return {
+        "rejudge_id": rejudge_id,
+        "state": progress["state"],
+        "scope": json.loads(progress["scope"]),
+        "total": int(progress["total"]),
+        "done": int(progress["done"]),
+        "changed": int(progress["changed"]),
+        "error": progress.get("error"),
+    }
@@ -0,0 +1,158 @@
+"""
+Смена статусов хакатонов и контестов по времени.
+
+PLANNED становится ACTIVE в start_time, PLANNED и ACTIVE становятся
+COMPLETED в end_time. Для каждого события считается ближайший момент
+смены, и на него ставится разовая ETA-задача Celery. ETA-задачи с
+брокером Redis держатся на воркере в памяти и переотправляются после
+visibility_timeout, поэтому ставятся только на ближайшие
+`scheduler.horizon` секунд; более дальние подхватывает периодический
+проход, который заодно доводит до нужного статуса всё, что пропущено.
+Статусы меняются пакетными UPDATE ... RETURNING по составному индексу
+(status, start_time, end_time): работа пропорциональна числу изменённых
+строк, а не всех событий. Возвращённые id сбрасывают кеш списков и
+кеш сущностей и рассылаются подписчикам.
+"""
+
+import datetime
+import json
+from enum import Enum
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from core.cache import INVALIDATE_CHANNEL
+from core.config import redis_client, settings
+from core.entity_cache import entity_cache
+from core.models import Contest, Hackathon
+from core.models.contest import ContestStatus
+from core.models.hackathon import HackathonStatus
+
+SCHEDULED_KEY = "transition:{kind}:{event_id}:{at}"
+STATUS_CHANNEL = "events:status"
+
+EVENTS = {"hackathon": Hackathon, "contest": Contest}
+STATUSES = {"hackathon": HackathonStatus, "contest": ContestStatus}
+# Списки, которые API кеширует в Redis (api_v1/hackathons, api_v1/contests)
+LIST_CACHE_KEYS = {"hackathon": "hackathons", "contest": "contests"}
+
+
+def now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
+
+
+def next_transition(
+    kind: str,
+    status: Enum,
+    start_time: datetime.datetime | None,
+    end_time: datetime.datetime | None,
+) -> datetime.datetime | None:
+    """Ближайший момент смены статуса; в прошлом, если смена пропущена."""
+    statuses = STATUSES[kind]
+    if status == statuses.PLANNED:
+        return start_time or end_time
+    if status == statuses.ACTIVE:
+        return end_time
+    return None
+
+
+def event_times(model):
+    return model.id, model.status, model.start_time, model.end_time
+
+
+def apply_due_transitions(
+    session: Session,
+    kind: str,
+    moment: datetime.datetime,
+    event_id: int | None = None,
+) -> list:
+    """
+    Переводит в нужный статус все события, которым пора, двумя
+    UPDATE ... RETURNING: сначала завершает, затем запускает. Отдаёт id,
+    новый статус и время изменённых событий; `event_id` ограничивает
+    переход одним событием (так работает ETA-задача).
+
+    Идемпотентна: лишние и устаревшие после переноса дат ETA-задачи
+    ничего не меняют.
+    """
+    model = EVENTS[kind]
+    statuses = STATUSES[kind]
+    only = [model.id == event_id] if event_id is not None else []
+    statements = [
+        update(model)
+        .where(
+            model.status.in_([statuses.PLANNED, statuses.ACTIVE]),
+            model.end_time <= moment,
+            *only,
+        )
+        .values(status=statuses.COMPLETED),
+        update(model)
+        .where(model.status == statuses.PLANNED, model.start_time <= moment, *only)
+        .values(status=statuses.ACTIVE),
+    ]
+    changed = []
+    for statement in statements:
+        changed.extend(
+            session.execute(
+                statement.returning(*event_times(model)),
+                execution_options={"synchronize_session": False},
+            )
+        )
+    return changed
+
+
+def on_transitions(kind: str, changed: list):
+    """
+    Сбрасывает закешированный список событий и сами события (UPDATE
+    прошёл мимо ORM, сессия их не отследила), в том числе в памяти
+    процессов API, и рассылает смены статусов в канал `STATUS_CHANNEL`
+    для тех, кто на них подписан.
+    """
+    if not changed:
+        return
+    versions = entity_cache.version_keys(EVENTS[kind], [e.id for e in changed])
+    pipe = redis_client.pipeline()
+    pipe.delete(LIST_CACHE_KEYS[kind])
+    for key in versions:
+        pipe.incr(key)
+    pipe.publish(INVALIDATE_CHANNEL, " ".join([LIST_CACHE_KEYS[kind], *versions]))
+    for event in changed:
+        pipe.publish(
+            STATUS_CHANNEL,
+            json.dumps({"kind": kind, "id": event.id, "status": event.status.value}),
+        )
+    pipe.execute()
+
+
+def upcoming_events(
+    session: Session,
+    kind: str,
+    moment: datetime.datetime,
+    until: datetime.datetime,
+) -> list:
+    """Id, статус и время событий со сменой статуса в промежутке (moment, until]."""
+    model = EVENTS[kind]
+    statuses = STATUSES[kind]
+    return list(
+        session.execute(
+            select(*event_times(model)).where(
+                model.status.in_([statuses.PLANNED, statuses.ACTIVE]),
+                or_(
+                    (model.status == statuses.PLANNED)
+                    & (model.start_time > moment)
+                    & (model.start_time <= until),
+                    (model.end_time > moment) & (model.end_time <= until),
+                ),
+            )
+        )
+    )
+
+
+def claim_schedule(kind: str, event_id: int, at: datetime.datetime) -> bool:
+    """
+    Не даёт поставить одну и ту же смену дважды: проходы пересекаются
+    по горизонту, а API ставит задачу при каждом изменении события.
+    """
+    key = SCHEDULED_KEY.format(kind=kind, event_id=event_id, at=int(at.timestamp()))
+    ttl = max(1, int((at - now()).total_seconds()) + settings.scheduler.horizon)
+    return bool(redis_client.set(key, 1, nx=True, ex=ttl))
@@ -0,0 +1,98 @@
+import hashlib
+import json
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from core.config import redis_client, settings
+from core.models import ContestTask, TestCase
+from core.models.contest_submission import SubmissionStatus2
+from tasks.judge.languages import get_language
+
+# Увеличивать при изменениях судьи, меняющих вердикты: старый кеш отпадёт сам
+JUDGE_VERSION = "1"
+
+VERDICT_KEY = "judge:verdict:{code_hash}:{version}"
+
+# Кешируются только вердикты, которые зависят лишь от кода и тестов. TLE и
+# MLE бывают и от загрузки воркера или шумного соседа: закешированный, такой
+# вердикт доставался бы каждой повторной отправке того же кода
+CACHEABLE_VERDICTS = {
+    SubmissionStatus2.GRADED.value,
+    SubmissionStatus2.WRONG_ANSWER.value,
+    SubmissionStatus2.RUNTIME_ERROR.value,
+    SubmissionStatus2.COMPILATION_ERROR.value,
+}
+
+
+def normalize_code(code: str) -> str:
+    """
+    Приводит переводы строк к \\n и убирает пробелы в конце файла.
+    Внутри строк код не трогается: там пробелы могут быть значимы.
+    """
+    return code.replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
+
+def code_hash(language: str, code: str) -> str:
+    """Хеш посылки вместе с языком и его образом."""
+    image = get_language(language, settings.judge).image
+    source = f"{language}\0{image}\0{normalize_code(code)}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def tests_version(session: Session, task: ContestTask) -> str:
+    """
+    Версия набора тестов, лимитов и чекера задачи.
+
+    Дайджест тестов считается в Postgres, так что для попадания в кеш сами
+    тесты не загружаются. Любое добавление, удаление или правка теста, как
+    и смена лимитов или чекера, даёт новую версию.
+    """
+    tests_digest = session.scalar(
+        select(
+            func.md5(
+                func.string_agg(
+                    func.concat(
+                        TestCase.id,
+                        ":",
+                        func.coalesce(TestCase.input_hash, func.md5(TestCase.input)),
+                        ":",
+                        func.coalesce(
+                            TestCase.output_hash, func.md5(TestCase.expected_output)
+                        ),
+                    ),
+                    aggregate_order_by(literal_column("','"), TestCase.id),
+                )
+            )
+        ).where(TestCase.task_id == task.id)
+    )
+    version = ":".join(
+        [
+            JUDGE_VERSION,
+            str(task.time_limit),
+            str(task.memory_limit),
+            task.checker.value,
+            str(task.checker_tolerance),
+            hashlib.sha256((task.checker_code or "").encode("utf-8")).hexdigest(),
+            tests_digest or "",
+        ]
+    )
+    return hashlib.sha256(version.encode("utf-8")).hexdigest()
+
+
+def get_cached_verdict(language: str, code: str, version: str) -> dict | None:
+    cached = redis_client.get(
+        VERDICT_KEY.format(code_hash=code_hash(language, code), version=version)
+    )
+    return json.loads(cached) if cached else None
+
+
+def cache_verdict(language: str, code: str, version: str, exec_result: dict):
+    if exec_result.get("verdict") not in CACHEABLE_VERDICTS:
+        return
+    redis_client.set(
+        VERDICT_KEY.format(code_hash=code_hash(language, code), version=version),
+        json.dumps(exec_result),
+        ex=settings.judge.verdict_cache_ttl,
+    )
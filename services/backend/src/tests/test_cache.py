@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from core import cache as cache_module
+from core.cache import LocalCache, RedisCache
+from core.config import settings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def local():
+    local = LocalCache(max_entries=3, max_bytes=100, ttl=5)
+    local.enabled = True
+    return local
+
+
+def test_disabled_cache_stores_nothing():
+    local = LocalCache(max_entries=3, max_bytes=100, ttl=5)
+    local.set("a", 1, 1, local.epoch)
+    assert local.get("a") is None
+
+
+def test_get_returns_stored_value(local):
+    local.set("a", {"x": 1}, 10, local.epoch)
+    assert local.get("a") == {"x": 1}
+    assert local.get("missing") is None
+
+
+def test_entries_expire(local, clock):
+    local.set("a", 1, 1, local.epoch)
+    clock.now += 4.9
+    assert local.get("a") == 1
+    clock.now += 0.2
+    assert local.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(local):
+    for key in "abc":
+        local.set(key, key, 1, local.epoch)
+    assert local.get("a") == "a"
+    local.set("d", "d", 1, local.epoch)
+    assert local.get("b") is None
+    assert [local.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_size_limit_evicts_oldest(local):
+    local.set("a", "a", 60, local.epoch)
+    local.set("b", "b", 30, local.epoch)
+    local.set("c", "c", 30, local.epoch)
+    assert local.get("a") is None
+    assert local.get("b") == "b"
+    assert local.get("c") == "c"
+
+
+def test_oversized_value_is_not_cached(local):
+    local.set("a", "a", 101, local.epoch)
+    assert local.get("a") is None
+
+
+def test_replacing_a_key_updates_its_size(local):
+    local.set("a", "a", 90, local.epoch)
+    local.set("a", "b", 10, local.epoch)
+    local.set("b", "b", 80, local.epoch)
+    assert local.get("a") == "b"
+    assert local.get("b") == "b"
+
+
+def test_value_read_before_invalidation_is_dropped(local):
+    # Значение прочитали из Redis, а сброс пришёл раньше, чем его положили
+    epoch = local.epoch
+    local.discard("a")
+    local.set("a", "stale", 1, epoch)
+    assert local.get("a") is None
+    local.set("a", "fresh", 1, local.epoch)
+    assert local.get("a") == "fresh"
+
+
+def test_discard_and_clear(local):
+    local.set("a", "a", 1, local.epoch)
+    local.set("b", "b", 1, local.epoch)
+    local.discard("a", "unknown")
+    assert local.get("a") is None
+    assert local.get("b") == "b"
+    local.clear()
+    assert local.get("b") is None
+    local.set("c", "c", 100, local.epoch)
+    assert local.get("c") == "c"
+
+
+def test_waiters_share_one_recompute_after_the_leader_fails():
+    # Redis не подключён: get_or_compute держится на объединении в процессе
+    redis = RedisCache(settings.redis)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise RuntimeError("database is down")
+        return "42"
+
+    async def main():
+        return await asyncio.gather(
+            *(redis.get_or_compute("events", compute, ex=60) for _ in range(4)),
+            return_exceptions=True,
+        )
+
+    leader, *waiters = asyncio.run(main())
+    assert isinstance(leader, RuntimeError)
+    assert waiters == ["42", "42", "42"]
+    assert calls == 2
+    assert redis._flights == {}
@@ -0,0 +1,215 @@
+import asyncio
+import io
+import json
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+from core.judge_config import JudgeConfig
+from tasks.judge.backends import CHECKER_CONTAINER_MEMORY, DockerBackend, ProcessBackend
+from tasks.judge.checkers import (
+    CheckerError,
+    CheckerSpec,
+    ExactChecker,
+    FloatChecker,
+    TokenChecker,
+    check_output,
+    create_checker,
+)
+from tasks.judge.testdata import JudgeTest
+
+
+def split(data: bytes, size: int) -> list[bytes]:
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+def feed_all(checker, chunks: list[bytes]) -> bool:
+    for chunk in chunks:
+        if not checker.feed(chunk):
+            return False
+    return checker.finish()
+
+
+def test_exact_checker_every_chunk_size():
+    expected = b"1 2 3\nhello world\n\n42\n"
+    outputs = (
+        expected,
+        b"1 2 3  \nhello world\n\n42",
+        b"1 2 3\nhello world\n\n42\n\n\n",
+    )
+    for output in outputs:
+        for size in range(1, len(output) + 1):
+            assert feed_all(ExactChecker(expected), split(output, size)), size
+
+
+def test_exact_checker_mismatch_across_chunks():
+    expected = b"abcdef\nxyz\n"
+    outputs = (b"abcdeF\nxyz\n", b"abcdef\nxy\n", b"abcdef\nxyz\nextra\n", b"abc\n")
+    for output in outputs:
+        for size in range(1, len(output) + 1):
+            assert not feed_all(ExactChecker(expected), split(output, size)), (
+                output,
+                size,
+            )
+
+
+def test_exact_checker_blank_line_inside_output():
+    assert not feed_all(ExactChecker(b"a\nb\n"), [b"a\n\nb\n"])
+    assert feed_all(ExactChecker(b"a\n\nb\n"), [b"a\n", b"\n", b"b"])
+
+
+def test_exact_checker_stops_on_overlong_line():
+    checker = ExactChecker(b"ab\n")
+    # Незаконченная строка длиннее эталонной уже не совпадёт
+    assert not checker.feed(b"abc")
+    assert not checker.finish()
+
+
+def test_token_checker_every_chunk_size():
+    expected = b"10 20\n30\n"
+    output = b"  10\t\t20   30  \n"
+    for size in range(1, len(output) + 1):
+        assert feed_all(TokenChecker(expected), split(output, size)), size
+        assert not feed_all(TokenChecker(expected), split(output + b"40", size)), size
+
+
+def test_token_checker_token_split_between_chunks():
+    checker = TokenChecker(b"12345")
+    assert checker.feed(b"12")
+    assert checker.feed(b"345")
+    assert checker.finish()
+
+    checker = TokenChecker(b"12345")
+    assert checker.feed(b"123")
+    assert not checker.feed(b"456")
+
+
+def test_float_checker_tolerance_across_chunks():
+    expected = b"0.3 1.5\n"
+    output = b"0.30000000000000004 1.4999999\n"
+    for size in range(1, len(output) + 1):
+        assert feed_all(FloatChecker(expected, 1e-6), split(output, size)), size
+    assert not feed_all(FloatChecker(expected, 1e-6), [b"0.31 1.5"])
+    assert not feed_all(FloatChecker(b"abc", 1e-6), [b"abd"])
+
+
+def test_preview_is_kept_across_chunks():
+    checker = ExactChecker(b"x" * 10, preview=4)
+    checker.feed(b"xx")
+    checker.feed(b"xxxx")
+    assert checker.preview == "xxxx"
+
+
+def test_check_output_reads_until_first_mismatch():
+    test = JudgeTest(id=1, input=b"", expected_output=b"1\n2\n")
+    assert check_output(io.BytesIO(b"1\n2\n"), test) == (True, "1\n2\n")
+    assert check_output(io.BytesIO(b"1\n3\n"), test)[0] is False
+
+
+def test_create_checker_rejects_unknown_and_unbound_custom():
+    with pytest.raises(CheckerError):
+        create_checker(CheckerSpec(kind="NOPE"), b"", b"")
+    with pytest.raises(CheckerError):
+        create_checker(CheckerSpec(kind="CUSTOM"), b"", b"")
+    with pytest.raises(CheckerError):
+        create_checker(CheckerSpec(kind="CUSTOM", code="pass"), b"", b"")
+
+
+CUSTOM_CHECKER = """
+import sys
+
+output = open(sys.argv[2]).read().split()
+answer = open(sys.argv[3]).read().split()
+print("sorted" if sorted(output) == sorted(answer) else "differs")
+sys.exit(0 if sorted(output) == sorted(answer) else 1)
+"""
+
+
+@pytest.fixture
+def process_backend():
+    backend = ProcessBackend(JudgeConfig(backend="process"), python=sys.executable)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="confine.py needs Linux rlimits")
+def test_custom_checker_in_process_sandbox(process_backend):
+    spec = CheckerSpec(kind="CUSTOM", code=CUSTOM_CHECKER, sandbox=process_backend)
+    test = JudgeTest(id=1, input=b"", expected_output=b"1 2 3\n")
+
+    checker = create_checker(spec, test.input, test.expected_output)
+    assert feed_all(checker, split(b"3 1 2\n", 2))
+    assert checker.comment.strip() == "sorted"
+
+    checker = create_checker(spec, test.input, test.expected_output)
+    assert not feed_all(checker, [b"3 1\n"])
+    assert checker.comment.strip() == "differs"
+
+    checker = create_checker(spec, test.input, test.expected_output)
+    checker.feed(b"1 2 3")
+    assert asyncio.run(checker.finish_async())
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="confine.py needs Linux rlimits")
+def test_crashing_custom_checker_is_a_checker_error(process_backend):
+    spec = CheckerSpec(
+        kind="CUSTOM", code="raise SystemExit(3)", sandbox=process_backend
+    )
+    checker = create_checker(spec, b"", b"1\n")
+    checker.feed(b"1\n")
+    with pytest.raises(CheckerError):
+        checker.finish()
+
+
+class FakeCheckerContainer:
+    def __init__(self):
+        self.files = []
+
+    def put_archive(self, path, archive):
+        self.files.append(path)
+
+    def exec_run(self, command, demux=False):
+        verdict = {
+            "index": 0,
+            "status": "OK",
+            "exit_code": 0,
+            "output_bytes": 2,
+            "stderr": "",
+        }
+        return 0, (json.dumps(verdict).encode() + b"\nok", None)
+
+
+class FakePool:
+    def __init__(self):
+        self.leases = []
+        self.released = []
+
+    @contextmanager
+    def lease(self, image, memory):
+        container = FakeCheckerContainer()
+        self.leases.append((image, memory))
+        try:
+            yield container
+        finally:
+            self.released.append(container)
+
+
+def test_docker_custom_checker_leases_one_container_per_chunk():
+    backend = object.__new__(DockerBackend)
+    backend.config = JudgeConfig(checker_image="checker:latest")
+    backend.pool = FakePool()
+    spec = CheckerSpec(kind="CUSTOM", code=CUSTOM_CHECKER, sandbox=backend)
+
+    with backend.chunk_checker(spec) as chunk_spec:
+        for _ in range(3):
+            checker = create_checker(chunk_spec, b"", b"1\n")
+            assert feed_all(checker, [b"1\n"])
+            assert checker.comment == "ok"
+    assert backend.pool.leases == [("checker:latest", CHECKER_CONTAINER_MEMORY)]
+    assert len(backend.pool.released) == 1
+    assert len(backend.pool.released[0].files) == 3
+
+    with backend.chunk_checker(CheckerSpec()) as chunk_spec:
+        assert chunk_spec == CheckerSpec()
+    assert len(backend.pool.leases) == 1
@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+import json
+
+import pytest
+from redis.exceptions import RedisError
+
+from core import entity_cache as entity_cache_module
+from core.cache import INVALIDATE_CHANNEL, RedisCache
+from core.config import settings
+from core.entity_cache import PENDING, EntityCache
+from core.models import Contest
+from core.models.contest import ContestStatus
+
+START = datetime.datetime(2026, 5, 1, 10, tzinfo=datetime.UTC)
+
+
+def contest(**values) -> Contest:
+    row = {
+        "id": 7,
+        "title": "Весенний контест",
+        "description": "",
+        "start_time": START,
+        "end_time": START + datetime.timedelta(hours=4),
+        "status": ContestStatus.ACTIVE,
+        "max_participants": 100,
+        "current_participants": 1,
+        "created_at": START,
+        "updated_at": None,
+        "allow_teams": False,
+        "creator_id": 1,
+        "logo_url": None,
+        "is_archived": False,
+    }
+    return Contest(**{**row, **values})
+
+
+class FakeRedis:
+    """То немногое из Redis, чем пользуется EntityCache."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.down = False
+
+    async def eval(self, script, numkeys, key, schema):
+        if self.down:
+            raise RedisError("down")
+        version = self.data.get(key, "0")
+        payload = self.data.get(f"{key}:{version}:{schema}")
+        return [version, payload] if payload is not None else [version]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+
+
+class FakeSession:
+    def __init__(self, rows: dict[int, Contest]):
+        self.rows = rows
+        self.identity_map = {}
+        self.info = {}
+        self.reads = 0
+
+    async def get(self, model, entity_id, options=None):
+        self.reads += 1
+        return self.rows.get(entity_id)
+
+    async def merge(self, obj, load=True):
+        return obj
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(redis):
+    redis_cache = RedisCache(settings.redis)
+    redis_cache.client = redis
+    cache = EntityCache(redis_cache, ttl=60, stale_ttl=60)
+    cache.register("contest", Contest)
+    return cache
+
+
+def test_row_survives_dump_and_load(cache):
+    entity = cache.entities[Contest]
+    row = json.loads(json.dumps(entity.dump(contest())))
+    assert row["status"] == "ACTIVE"
+    loaded = entity.load(row)
+    assert loaded.status == ContestStatus.ACTIVE
+    assert loaded.start_time == START
+    assert loaded.updated_at is None
+    assert loaded.title == "Весенний контест"
+
+
+def test_miss_reads_database_once(cache):
+    session = FakeSession({7: contest()})
+
+    async def read_twice():
+        first = await cache.get(session, Contest, 7)
+        second = await cache.get(FakeSession({}), Contest, 7)
+        return first, second
+
+    first, second = asyncio.run(read_twice())
+    assert session.reads == 1
+    assert second.id == first.id == 7
+    assert second.status == ContestStatus.ACTIVE
+
+
+def test_version_bump_hides_old_data(cache, redis):
+    asyncio.run(cache.get(FakeSession({7: contest()}), Contest, 7))
+    for key in cache.version_keys(Contest, [7]):
+        redis.incr(key)
+
+    session = FakeSession({7: contest(status=ContestStatus.COMPLETED)})
+    assert asyncio.run(cache.get(session, Contest, 7)).status == (
+        ContestStatus.COMPLETED
+    )
+    assert session.reads == 1
+
+
+def test_unavailable_redis_falls_back_to_database(cache, redis):
+    redis.down = True
+    session = FakeSession({7: contest()})
+    assert asyncio.run(cache.get(session, Contest, 7)).id == 7
+    assert session.reads == 1
+
+
+def test_fresh_entity_is_served_from_memory(cache, redis):
+    cache.redis.local.enabled = True
+    asyncio.run(cache.get(FakeSession({7: contest()}), Contest, 7))
+    redis.down = True
+
+    session = FakeSession({})
+    assert asyncio.run(cache.get(session, Contest, 7)).id == 7
+    assert session.reads == 0
+
+
+def test_sync_commit_bumps_versions_and_drops_lists(cache, monkeypatch):
+    calls = []
+
+    class Pipeline:
+        def __getattr__(self, name):
+            return lambda *args: calls.append((name, *args))
+
+    class Client:
+        def pipeline(self, transaction=True):
+            return Pipeline()
+
+    monkeypatch.setattr(entity_cache_module, "redis_client", Client())
+    key = cache.version_keys(Contest, [7])[0]
+    session = FakeSession({})
+    session.info[PENDING] = ({key}, {"contests"})
+
+    cache.committed(session)
+
+    assert calls == [
+        ("incr", key),
+        ("delete", "contests"),
+        ("publish", INVALIDATE_CHANNEL, f"{key} contests"),
+        ("execute",),
+    ]
+    assert PENDING not in session.info
@@ -0,0 +1,174 @@
+import os
+import signal
+import sys
+import tempfile
+
+import pytest
+
+from tasks.judge import harness
+from tasks.judge.batch import check_verdicts
+from tasks.judge.streams import iter_frames
+from tasks.judge.testdata import JudgeTest
+
+pytestmark = pytest.mark.skipif(
+    sys.platform != "linux", reason="harness relies on wait4 and Linux rlimits"
+)
+
+MEMORY = 256 * 1024 * 1024
+
+
+def run(
+    source: str, stdin: bytes = b"", time_limit: float = 2, output_limit: int = 4096
+):
+    with tempfile.TemporaryDirectory() as workdir, tempfile.TemporaryFile() as feed:
+        with open(os.path.join(workdir, harness.CODE_FILE), "w") as code:
+            code.write(source)
+        feed.write(stdin)
+        feed.seek(0)
+        with tempfile.TemporaryFile() as output:
+            verdict = harness.run_test(
+                0,
+                feed,
+                output,
+                time_limit,
+                MEMORY,
+                output_limit,
+                preexec_fn=harness.limit_resources(time_limit, MEMORY, output_limit),
+                cwd=workdir,
+            )
+            output.seek(0)
+            return verdict, output.read()
+
+
+def test_ok_reads_stdin_and_measures():
+    verdict, output = run("print(sum(map(int, input().split())))", b"2 3\n")
+    assert verdict["status"] == "OK"
+    assert output == b"5\n"
+    assert verdict["output_bytes"] == 2
+    assert verdict["memory_kb"] > 0
+
+
+def test_runtime_error_keeps_stderr_tail():
+    verdict, _ = run("raise ValueError('boom')")
+    assert verdict["status"] == "RE"
+    assert verdict["exit_code"] == 1
+    assert "ValueError: boom" in verdict["stderr"]
+
+
+def test_time_limit_kills_the_process_group():
+    verdict, _ = run("while True:\n    pass\n", time_limit=0.3)
+    assert verdict["status"] == "TLE"
+    assert verdict["exit_code"] == -signal.SIGKILL
+
+
+def test_address_space_limit_is_memory_limit():
+    verdict, _ = run("data = bytearray(512 * 1024 * 1024)\n")
+    assert verdict["status"] == "MLE"
+
+
+def test_output_limit():
+    verdict, _ = run("import sys\nsys.stdout.write('x' * 100000)\n", output_limit=1000)
+    assert verdict["status"] == "OLE"
+
+
+@pytest.mark.parametrize(
+    "kwargs, status",
+    [
+        ({}, "OK"),
+        ({"exit_code": 2}, "RE"),
+        ({"timed_out": True}, "TLE"),
+        ({"cpu_time": 1.5}, "TLE"),
+        ({"exit_code": -signal.SIGXCPU}, "TLE"),
+        ({"output_bytes": 100}, "OLE"),
+        ({"memory_kb": 1024}, "MLE"),
+        ({"exit_code": 1, "stderr": b"MemoryError"}, "MLE"),
+        ({"exit_code": -signal.SIGKILL}, "MLE"),
+    ],
+)
+def test_classify(kwargs, status):
+    arguments = {
+        "exit_code": 0,
+        "timed_out": False,
+        "cpu_time": 0.1,
+        "time_limit": 1,
+        "memory_kb": 10,
+        "memory": 1024 * 1024,
+        "output_bytes": 10,
+        "output_limit": 100,
+        "stderr": b"",
+        **kwargs,
+    }
+    assert harness.classify(**arguments) == status
+
+
+def test_sandbox_user_only_drops_root(monkeypatch):
+    monkeypatch.setattr(os, "geteuid", lambda: 0)
+    assert harness.sandbox_user() == {
+        "user": harness.SANDBOX_UID,
+        "group": harness.SANDBOX_GID,
+        "extra_groups": [],
+    }
+    monkeypatch.setattr(os, "geteuid", lambda: 1000)
+    assert harness.sandbox_user() == {}
+
+
+def test_main_streams_frames_for_every_test(tmp_path, monkeypatch, capsysbinary):
+    # Смена пользователя проверена отдельно; интерпретатор тестов может
+    # быть недоступен nobody
+    monkeypatch.setattr(harness, "sandbox_user", lambda: {})
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / harness.CODE_FILE).write_text("print(int(input()) * 2)\n")
+    (tmp_path / harness.TESTS_DIR).mkdir()
+    inputs = [b"1\n", b"21\n", b"oops\n"]
+    for index, data in enumerate(inputs):
+        (tmp_path / harness.input_file(index)).write_bytes(data)
+    monkeypatch.setattr(
+        sys, "argv", ["harness.py", "2000", str(MEMORY), str(MEMORY), "4096"]
+    )
+
+    harness.main()
+
+    # Входы удалены с диска, чтобы решение не видело чужих тестов
+    assert not (tmp_path / harness.TESTS_DIR).exists()
+    stdout = capsysbinary.readouterr().out
+    frames = [(verdict, body.read()) for verdict, body in iter_frames([stdout])]
+    assert [(verdict["index"], verdict["status"]) for verdict, _ in frames] == [
+        (0, "OK"),
+        (1, "OK"),
+        (2, "RE"),
+    ]
+    assert [output for _, output in frames[:2]] == [b"2\n", b"42\n"]
+
+    test_case = [
+        JudgeTest(id=index, input=data, expected_output=expected)
+        for index, (data, expected) in enumerate(zip(inputs, [b"2", b"42", b""]))
+    ]
+    result = check_verdicts(iter_frames([stdout]), test_case)
+    assert result["verdict"] == "RUNTIME_ERROR"
+    assert result["failed_test"] == 2
+    assert len(result["tests"]) == 3
+
+    # Оборванный поток стенда — ошибка проверки, а не вердикт
+    cut = stdout[: stdout.index(b'{"index": 2')]
+    result = check_verdicts(iter_frames([cut]), test_case)
+    assert result["error"] == "Execution error"
+
+    # Если стенд убил OOM killer контейнера, непройденный тест получает MLE
+    result = check_verdicts(iter_frames([cut]), test_case, oom_killed=lambda: True)
+    assert result["verdict"] == "MEMORY_LIMIT_EXCEEDED"
+    assert result["failed_test"] == 2
+    assert len(result["tests"]) == 3
+
+
+OOM_SCORE_SOURCE = """
+import os, time
+
+time.sleep(0.2)
+print(open(f"/proc/{os.getpid()}/oom_score_adj").read())
+"""
+
+
+def test_solution_is_the_first_oom_victim():
+    verdict, output = run(OOM_SCORE_SOURCE)
+    assert verdict["status"] == "OK"
+    assert output.strip() == str(harness.OOM_SCORE_ADJ).encode()
@@ -0,0 +1,123 @@
+import datetime
+import gzip
+
+from fastapi import Request, Response
+
+from core.http_cache import (
+    PRIVATE,
+    PUBLIC,
+    CachedBody,
+    body_etag,
+    is_fresh,
+    json_response,
+    not_modified,
+)
+
+
+def request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+BODY = b'{"items": []}'
+ETAG = body_etag(BODY)
+MODIFIED = datetime.datetime(2025, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.UTC)
+
+
+def test_etag_depends_on_body_and_is_weak():
+    assert ETAG.startswith('W/"')
+    assert ETAG == body_etag(BODY)
+    assert ETAG != body_etag(BODY + b" ")
+
+
+def test_if_none_match():
+    assert is_fresh(request(if_none_match=ETAG), ETAG)
+    # Сравнение слабое: клиент может прислать тег без W/
+    assert is_fresh(request(if_none_match=ETAG.removeprefix("W/")), ETAG)
+    assert is_fresh(request(if_none_match=f'"other", {ETAG}'), ETAG)
+    assert is_fresh(request(if_none_match="*"), ETAG)
+    assert not is_fresh(request(if_none_match='"other"'), ETAG)
+    assert not is_fresh(request(), ETAG)
+
+
+def test_if_modified_since():
+    def since(moment: datetime.datetime) -> Request:
+        return request(if_modified_since=moment.strftime("%a, %d %b %Y %H:%M:%S GMT"))
+
+    assert is_fresh(since(MODIFIED), ETAG, MODIFIED)
+    assert is_fresh(since(MODIFIED + datetime.timedelta(hours=1)), ETAG, MODIFIED)
+    assert not is_fresh(since(MODIFIED - datetime.timedelta(seconds=1)), ETAG, MODIFIED)
+    assert not is_fresh(request(if_modified_since="garbage"), ETAG, MODIFIED)
+    assert not is_fresh(since(MODIFIED), ETAG)
+
+
+def test_if_none_match_takes_precedence():
+    stale = request(
+        if_none_match='"other"',
+        if_modified_since="Thu, 01 May 2025 13:00:00 GMT",
+    )
+    assert not is_fresh(stale, ETAG, MODIFIED)
+
+
+def test_not_modified_sets_validators_or_answers_304():
+    response = Response()
+    assert not_modified(request(), response, ETAG, MODIFIED) is None
+    assert response.headers["etag"] == ETAG
+    assert response.headers["cache-control"] == PRIVATE
+    assert response.headers["last-modified"] == "Thu, 01 May 2025 12:30:15 GMT"
+
+    answer = not_modified(request(if_none_match=ETAG), Response(), ETAG, MODIFIED)
+    assert answer.status_code == 304
+    assert answer.headers["etag"] == ETAG
+    assert not answer.body
+
+
+def test_json_response():
+    response = json_response(request(), BODY)
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == ETAG
+
+    response = json_response(request(if_none_match=ETAG), BODY, cache_control=PUBLIC)
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == PUBLIC
+
+
+def test_cached_body_gzip_only_when_worth_it():
+    small = CachedBody.from_text('{"a": 1}')
+    assert small.gzipped is None
+    response = small.response(request(accept_encoding="gzip"))
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"a": 1}'
+
+    text = "[" + ", ".join(f'{{"id": {index}}}' for index in range(200)) + "]"
+    large = CachedBody.from_text(text)
+    assert gzip.decompress(large.gzipped) == text.encode()
+    assert large.etag == body_etag(text.encode())
+
+    response = large.response(request(accept_encoding="gzip, deflate"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.body == large.gzipped
+
+    response = large.response(request())
+    assert "content-encoding" not in response.headers
+    assert response.body == text.encode()
+
+
+def test_cached_body_304_for_either_encoding():
+    large = CachedBody.from_text("x" * 2000)
+    response = large.response(request(if_none_match=large.etag, accept_encoding="gzip"))
+    assert response.status_code == 304
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == PUBLIC
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tasks.judge.parallel import (
+    CANCELLED,
+    HostSlots,
+    merge_results,
+    run_in_parallel,
+    split_tests,
+)
+
+
+def test_split_tests_keeps_order_and_balance():
+    assert split_tests(list(range(10)), 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_tests([1, 2], 4) == [[1], [2]]
+    assert split_tests([], 4) == [[]]
+
+
+def passed(chunk: list) -> dict:
+    return {"success": True, "tests": [{"test": test} for test in chunk]}
+
+
+def failed(chunk: list, at: int) -> dict:
+    return {
+        "success": False,
+        "verdict": "WRONG_ANSWER",
+        "failed_test": at,
+        "tests": [{"test": test} for test in chunk[: at + 1]],
+    }
+
+
+def test_all_chunks_pass():
+    result = run_in_parallel(lambda chunk, _: passed(chunk), list(range(7)), 3)
+    assert result["success"]
+    assert [test["test"] for test in result["tests"]] == list(range(7))
+
+
+def test_first_failure_in_test_order_wins():
+    def run_chunk(chunk, cancelled):
+        if chunk[0] == 0:
+            # Первый кусок падает последним, но его падение раньше по тестам
+            time.sleep(0.1)
+            return failed(chunk, 1)
+        if 4 in chunk:
+            return failed(chunk, chunk.index(4))
+        return passed(chunk)
+
+    result = run_in_parallel(run_chunk, list(range(9)), 3)
+    assert result["verdict"] == "WRONG_ANSWER"
+    assert result["failed_test"] == 1
+    assert [test["test"] for test in result["tests"]] == [0, 1]
+
+
+def test_failure_offset_is_global():
+    def run_chunk(chunk, cancelled):
+        return failed(chunk, 1) if 7 in chunk else passed(chunk)
+
+    result = run_in_parallel(run_chunk, list(range(9)), 3)
+    assert result["failed_test"] == 7
+    assert [test["test"] for test in result["tests"]] == list(range(8))
+
+
+def test_later_chunks_are_cancelled():
+    seen_cancel = threading.Event()
+
+    def run_chunk(chunk, cancelled):
+        if chunk[0] == 0:
+            return failed(chunk, 0)
+        if cancelled.wait(2):
+            seen_cancel.set()
+            return CANCELLED
+        return passed(chunk)
+
+    started = time.monotonic()
+    result = run_in_parallel(run_chunk, list(range(6)), 3)
+    assert result["failed_test"] == 0
+    assert time.monotonic() - started < 1
+    assert seen_cancel.wait(1)
+
+
+def test_merge_results_takes_verdict_from_last():
+    merged = merge_results([passed([0, 1]), failed([2, 3], 1)], 2)
+    assert merged["failed_test"] == 3
+    assert len(merged["tests"]) == 4
+
+
+def test_host_slots_cap_concurrency(tmp_path):
+    slots = HostSlots(str(tmp_path / "slots"), 2)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with slots:
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+
+def test_host_slots_are_shared_between_instances(tmp_path):
+    # Два экземпляра над одним каталогом — как два процесса воркера
+    first = HostSlots(str(tmp_path), 1)
+    second = HostSlots(str(tmp_path), 1)
+    fd = first.acquire()
+    assert second._try_lock(0) is None
+    first.release(fd)
+    fd = second._try_lock(0)
+    assert fd is not None
+    second.release(fd)
+
+
+def test_host_slots_release_on_error(tmp_path):
+    slots = HostSlots(str(tmp_path), 1)
+    with pytest.raises(RuntimeError):
+        with slots:
+            raise RuntimeError
+    with slots:
+        pass
+
+
+def test_async_acquire_waits_for_a_slot_held_by_the_worker(tmp_path):
+    # Асинхронный бэкенд и синхронный воркер делят одни слоты
+    worker = HostSlots(str(tmp_path), 1)
+    backend = HostSlots(str(tmp_path), 1)
+    fd = worker.acquire()
+
+    async def lease():
+        task = asyncio.create_task(backend.acquire_async())
+        await asyncio.sleep(HostSlots.POLL_INTERVAL * 3)
+        assert not task.done()
+        worker.release(fd)
+        backend.release(await asyncio.wait_for(task, timeout=5))
+
+    asyncio.run(lease())
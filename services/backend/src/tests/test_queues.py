@@ -0,0 +1,55 @@
+from celery import Celery
+
+from tasks import queues
+from tasks.queues import (
+    CONTEST_QUEUE,
+    PRIORITY_SEP,
+    QUEUES,
+    configure_queues,
+    queue_depth,
+    queue_keys,
+    queue_stats,
+)
+
+
+class FakeRedis:
+    def __init__(self, lists=None):
+        self.lists = lists or {}
+        self.calls = []
+
+    def pipeline(self):
+        return self
+
+    def llen(self, key):
+        self.calls.append(key)
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])
+
+    def execute(self):
+        return [len(self.lists.get(key, [])) for key in self.calls]
+
+
+def test_queue_keys_follow_the_configured_priority_steps():
+    app = Celery(broker="redis://127.0.0.1:6379/0")
+    configure_queues(app)
+    options = app.conf.broker_transport_options
+    assert options["sep"] == PRIORITY_SEP
+    steps = options["priority_steps"]
+    assert queue_keys(CONTEST_QUEUE) == [
+        CONTEST_QUEUE,
+        *(f"{CONTEST_QUEUE}{PRIORITY_SEP}{step}" for step in steps[1:]),
+    ]
+
+
+def test_queue_depth_sums_every_priority_list():
+    keys = queue_keys(CONTEST_QUEUE)
+    broker = FakeRedis({keys[0]: ["a", "b"], keys[-1]: ["c"]})
+    assert queue_depth(broker, CONTEST_QUEUE) == 3
+
+
+def test_queue_depth_is_unknown_for_other_brokers(monkeypatch):
+    monkeypatch.setattr(queues, "redis_client", FakeRedis())
+    stats = queue_stats(Celery(broker="memory://"))
+    assert [entry["queue"] for entry in stats] == list(QUEUES)
+    assert all(entry["depth"] is None for entry in stats)
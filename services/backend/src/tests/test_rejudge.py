@@ -0,0 +1,144 @@
+import pytest
+
+from tasks import celery_app, rejudge
+
+
+class FakeRedis:
+    """Хеши и списки Redis в памяти; COMPLETE_SCRIPT исполняется как есть."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+    def expire(self, key, ttl):
+        pass
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.hashes.setdefault(key, {})
+        fields.update(mapping or {field: value})
+
+    def hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return str(value) if value is not None else None
+
+    def hmget(self, key, *fields):
+        return [self.hget(key, field) for field in fields]
+
+    def hgetall(self, key):
+        return {field: str(value) for field, value in self.hashes.get(key, {}).items()}
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = int(fields.get(field, 0)) + amount
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(str(value) for value in values)
+
+    def lpop(self, key):
+        values = self.lists.get(key)
+        return values.pop(0) if values else None
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.lists.pop(key, None)
+
+    def eval(self, script, numkeys, key, expected, new):
+        assert script == rejudge.COMPLETE_SCRIPT
+        state, total, done = self.hmget(key, "state", "total", "done")
+        if state == expected and int(done) >= int(total):
+            self.hset(key, "state", new)
+            return 1
+        return 0
+
+
+class FailingSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def scalars(self, statement):
+        raise RuntimeError("database is gone")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(rejudge, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def lanes(monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(
+        celery_app.rejudge_lane,
+        "apply_async",
+        lambda args, queue, countdown=None: enqueued.append((args, countdown)),
+    )
+    return enqueued
+
+
+def test_failed_planning_marks_the_rejudge_failed(redis, lanes, monkeypatch):
+    rejudge_id = rejudge.start_rejudge({"task_id": 1, "contest_id": 2})
+    monkeypatch.setattr(celery_app, "SessionLocal", FailingSession)
+
+    with pytest.raises(RuntimeError):
+        celery_app.plan_rejudge(rejudge_id, [1])
+
+    progress = rejudge.get_progress(rejudge_id)
+    assert progress["state"] == rejudge.FAILED
+    assert progress["error"] == "database is gone"
+    # Дорожка больше не ставит себя в очередь
+    celery_app.rejudge_lane(rejudge_id)
+    assert lanes == []
+
+
+def test_lane_waits_only_while_planning(redis, lanes):
+    rejudge_id = rejudge.start_rejudge({"task_id": 1, "contest_id": 2})
+
+    celery_app.rejudge_lane(rejudge_id)
+    assert lanes == [([rejudge_id], 1)]
+
+    rejudge.finish_planning(rejudge_id)
+    celery_app.rejudge_lane(rejudge_id)
+    assert len(lanes) == 1
+    assert rejudge.get_progress(rejudge_id)["state"] == rejudge.DONE
+
+
+def test_lanes_drain_the_queue_and_complete(redis, lanes, monkeypatch):
+    rejudge_id = rejudge.start_rejudge({"task_id": 1, "contest_id": 2})
+    rejudge.push_batch(rejudge_id, [10, 11])
+    rejudge.finish_planning(rejudge_id)
+    verdicts = {10: "GRADED", 11: "WRONG_ANSWER"}
+    monkeypatch.setattr(
+        celery_app,
+        "judge_submission",
+        lambda submission_id, use_cache: {
+            "verdict": "GRADED",
+            "previous_verdict": verdicts[submission_id],
+        },
+    )
+
+    for _ in range(3):
+        celery_app.rejudge_lane(rejudge_id)
+
+    progress = rejudge.get_progress(rejudge_id)
+    assert progress["state"] == rejudge.DONE
+    assert (progress["total"], progress["done"], progress["changed"]) == (2, 2, 1)
+    assert len(lanes) == 2
+
+
+def test_failed_rejudge_is_not_completed(redis):
+    rejudge_id = rejudge.start_rejudge({"task_id": 1, "contest_id": 2})
+    rejudge.fail_planning(rejudge_id, "boom")
+    rejudge.mark_done(rejudge_id, changed=False)
+    assert rejudge.get_progress(rejudge_id)["state"] == rejudge.FAILED
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+
+from tasks.judge.streams import aiter_frames, iter_frames
+
+
+def frame(index: int, output: bytes) -> bytes:
+    header = {"index": index, "status": "OK", "output_bytes": len(output)}
+    return json.dumps(header).encode() + b"\n" + output
+
+
+OUTPUTS = [b"first\n", b"", b"line\nwith\nnewlines\n", b"{\"index\": 99}\n" * 3]
+STREAM = b"".join(frame(index, output) for index, output in enumerate(OUTPUTS))
+
+
+def split(data: bytes, size: int) -> list[bytes]:
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+def read_frames(chunks) -> list[tuple[int, bytes]]:
+    frames = []
+    for verdict, body in iter_frames(chunks):
+        output = bytearray()
+        while data := body.read(3):
+            output += data
+        frames.append((verdict["index"], bytes(output)))
+    return frames
+
+
+async def aread_frames(chunks) -> list[tuple[int, bytes]]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    frames = []
+    async for verdict, body in aiter_frames(stream()):
+        output = bytearray()
+        while data := await body.read(3):
+            output += data
+        frames.append((verdict["index"], bytes(output)))
+    return frames
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, len(STREAM)])
+def test_frames_survive_any_chunking(size):
+    expected = list(enumerate(OUTPUTS))
+    chunks = split(STREAM, size)
+    assert read_frames(chunks) == expected
+    assert asyncio.run(aread_frames(chunks)) == expected
+
+
+def test_empty_chunks_are_skipped():
+    chunks = [b"", *split(STREAM, 4), b""]
+    assert read_frames(chunks) == list(enumerate(OUTPUTS))
+
+
+def test_unread_body_is_skipped():
+    indexes = [verdict["index"] for verdict, _ in iter_frames(split(STREAM, 7))]
+    assert indexes == list(range(len(OUTPUTS)))
+
+
+def test_truncated_body_ends_the_stream():
+    # Стенд умер посреди вывода: тело короче заявленного в заголовке
+    truncated = frame(0, b"complete") + frame(1, b"cut short")[:-4]
+    expected = [(0, b"complete"), (1, b"cut s")]
+    for size in (1, 3, len(truncated)):
+        assert read_frames(split(truncated, size)) == expected
+        assert asyncio.run(aread_frames(split(truncated, size))) == expected
+
+
+def test_truncated_header_is_an_error():
+    truncated = frame(0, b"ok") + frame(1, b"lost")[:10]
+    with pytest.raises(ValueError):
+        read_frames(split(truncated, 4))
+    with pytest.raises(ValueError):
+        asyncio.run(aread_frames(split(truncated, 4)))
+
+
+def test_blank_lines_between_frames_are_ignored():
+    stream = b"\n" + frame(0, b"a") + b"\n\n" + frame(1, b"b")
+    assert read_frames([stream]) == [(0, b"a"), (1, b"b")]
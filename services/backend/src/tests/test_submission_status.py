@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from api_v1.contest_submissions import crud
+from core.types.submission_status import SubmissionStatus2
+
+
+class RowSession:
+    """Сессия, у которой каждый refresh отдаёт следующий статус строки."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.refreshes = 0
+
+    async def refresh(self, submission):
+        self.refreshes += 1
+        submission.status = self.statuses.pop(0)
+
+
+def submission():
+    return SimpleNamespace(id=7, status=None, failed_test=None, graded_at=None)
+
+
+def progress(monkeypatch, state, *statuses):
+    asked = []
+
+    def async_result(task_id):
+        asked.append(task_id)
+        return SimpleNamespace(state=state)
+
+    monkeypatch.setattr(crud.celery_app, "AsyncResult", async_result)
+    session = RowSession(*statuses)
+    result = asyncio.run(crud.get_submission_status(session, submission()))
+    return result["progress"], asked
+
+
+def test_persisted_verdict_skips_the_result_backend(monkeypatch):
+    assert progress(monkeypatch, "PENDING", SubmissionStatus2.WRONG_ANSWER) == (
+        "DONE",
+        [],
+    )
+
+
+def test_waiting_submission_follows_the_judge_task(monkeypatch):
+    waiting = SubmissionStatus2.SUBMITTED
+    assert progress(monkeypatch, "PENDING", waiting)[0] == "QUEUED"
+    assert progress(monkeypatch, "STARTED", waiting)[0] == "JUDGING"
+    assert progress(monkeypatch, "SUCCESS", waiting, waiting)[0] == "ERROR"
+
+
+def test_verdict_saved_while_asking_the_backend_is_done(monkeypatch):
+    assert progress(
+        monkeypatch, "SUCCESS", SubmissionStatus2.SUBMITTED, SubmissionStatus2.GRADED
+    )[0] == "DONE"
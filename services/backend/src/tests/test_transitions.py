@@ -0,0 +1,91 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from core.cache import INVALIDATE_CHANNEL
+from core.models.contest import ContestStatus
+from core.models.hackathon import HackathonStatus
+from tasks import transitions
+from tasks.transitions import apply_due_transitions, next_transition, on_transitions
+
+START = datetime.datetime(2026, 5, 1, 10, tzinfo=datetime.UTC)
+END = datetime.datetime(2026, 5, 1, 14, tzinfo=datetime.UTC)
+
+
+class RecordingSession:
+    """Сессия, которая запоминает запросы и отдаёт заготовленные строки."""
+
+    def __init__(self, *results):
+        self.statements = []
+        self._results = list(results)
+
+    def execute(self, statement, execution_options=None):
+        self.statements.append(statement.compile(dialect=postgresql.dialect()))
+        return self._results.pop(0)
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, *args))
+
+
+def test_next_transition_follows_status():
+    assert next_transition("hackathon", HackathonStatus.PLANNED, START, END) == START
+    assert next_transition("hackathon", HackathonStatus.ACTIVE, START, END) == END
+    # Без времени начала следующая смена — сразу завершение
+    assert next_transition("contest", ContestStatus.PLANNED, None, END) == END
+    for status in (ContestStatus.COMPLETED, ContestStatus.CANCELED):
+        assert next_transition("contest", status, START, END) is None
+
+
+def test_due_transitions_complete_before_starting():
+    completed = SimpleNamespace(id=1, status=ContestStatus.COMPLETED)
+    started = SimpleNamespace(id=2, status=ContestStatus.ACTIVE)
+    session = RecordingSession([completed], [started])
+
+    changed = apply_due_transitions(session, "contest", END)
+
+    assert changed == [completed, started]
+    finish, start = session.statements
+    # Завершение идёт первым, чтобы пропущенный старт не оживил событие
+    assert ContestStatus.COMPLETED in finish.params.values()
+    assert "end_time <=" in str(finish) and "RETURNING" in str(finish)
+    assert ContestStatus.ACTIVE in start.params.values()
+    assert "start_time <=" in str(start) and "RETURNING" in str(start)
+    assert "contests.id =" not in str(finish)
+
+
+def test_eta_transition_touches_one_event():
+    session = RecordingSession([], [])
+    apply_due_transitions(session, "hackathon", START, event_id=7)
+    assert all("hackathons.id =" in str(statement) for statement in session.statements)
+
+
+def test_transitions_drop_list_cache_and_publish(monkeypatch):
+    pipe = RecordingPipeline()
+    monkeypatch.setattr(
+        transitions, "redis_client", SimpleNamespace(pipeline=lambda: pipe)
+    )
+
+    on_transitions("hackathon", [])
+    assert pipe.calls == []
+
+    on_transitions("hackathon", [SimpleNamespace(id=3, status=HackathonStatus.ACTIVE)])
+    assert pipe.calls[0] == ("delete", "hackathons")
+    # UPDATE прошёл мимо ORM, поэтому версию сущности сбрасывает сам переход
+    assert pipe.calls[1] == ("incr", "entity:hackathon:3")
+    # Процессы API выбрасывают те же ключи из кеша в памяти
+    assert pipe.calls[2] == (
+        "publish",
+        INVALIDATE_CHANNEL,
+        "hackathons entity:hackathon:3",
+    )
+    name, channel, message = pipe.calls[3]
+    assert (name, channel) == ("publish", transitions.STATUS_CHANNEL)
+    assert json.loads(message) == {"kind": "hackathon", "id": 3, "status": "ACTIVE"}
+    assert pipe.calls[-1] == ("execute",)
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.models.contest_task import CheckerType
+from tasks import verdict_cache
+from tasks.verdict_cache import (
+    cache_verdict,
+    code_hash,
+    get_cached_verdict,
+    normalize_code,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(verdict_cache, "redis_client", redis)
+    return redis
+
+
+class DigestSession:
+    """Сессия, у которой Postgres уже посчитал дайджест тестов."""
+
+    def __init__(self, digest: str | None):
+        self.digest = digest
+
+    def scalar(self, statement):
+        return self.digest
+
+
+def task(**values):
+    row = {
+        "id": 1,
+        "time_limit": 1000,
+        "memory_limit": 256,
+        "checker": CheckerType.EXACT,
+        "checker_tolerance": None,
+        "checker_code": None,
+    }
+    return SimpleNamespace(**{**row, **values})
+
+
+def test_line_endings_and_trailing_space_do_not_matter():
+    code = "print(1)\r\nprint(2)\n\n"
+    assert normalize_code(code) == "print(1)\nprint(2)"
+    assert code_hash("python3.9", code) == code_hash("python3.9", "print(1)\nprint(2)")
+    # Пробелы внутри строк значимы
+    assert code_hash("python3.9", "print(' ')") != code_hash("python3.9", "print('')")
+
+
+def test_hash_depends_on_language():
+    assert code_hash("python3.9", "x") != code_hash("python3.12", "x")
+
+
+def test_tests_version_changes_with_tests_limits_and_checker():
+    def version_of(task, digest: str = "abc") -> str:
+        return verdict_cache.tests_version(DigestSession(digest), task)
+
+    version = version_of(task())
+    assert version == version_of(task())
+    assert version != version_of(task(), digest="abd")
+    assert version != version_of(task(time_limit=2000))
+    assert version != version_of(task(memory_limit=512))
+    assert version != version_of(task(checker=CheckerType.TOKENS))
+    custom = task(checker=CheckerType.CUSTOM, checker_code="exit(0)")
+    changed = task(checker=CheckerType.CUSTOM, checker_code="exit(1)")
+    assert version_of(custom) != version_of(changed)
+
+
+def test_verdict_round_trip(redis):
+    result = {"success": False, "verdict": "WRONG_ANSWER", "failed_test": 2}
+    cache_verdict("python3.9", "print(1)", "v1", result)
+    assert get_cached_verdict("python3.9", "print(1)\n", "v1") == result
+    assert get_cached_verdict("python3.9", "print(1)", "v2") is None
+
+
+def test_load_dependent_verdicts_are_not_cached(redis):
+    for verdict in ("TIME_LIMIT_EXCEEDED", "MEMORY_LIMIT_EXCEEDED", None):
+        cache_verdict("python3.9", "x", "v1", {"success": False, "verdict": verdict})
+    assert redis.data == {}